@@ -7,6 +7,7 @@ import logging
 import time
 import uuid
 
+import click
 from flask import Flask, g, jsonify, request
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
@@ -21,6 +22,7 @@ from celery import Celery
 from celery.schedules import crontab
 
 from app.config import config as config_map, Config
+from app.json_provider import init_json_provider
 
 # Initialize extensions
 db = SQLAlchemy()
@@ -71,6 +73,12 @@ def create_app(config_name_or_class='development'):
         },
     }
 
+    celery.conf.task_routes = {
+        'app.tasks.write_audit_logs': {'queue': 'audit'},
+        'app.tasks.notify_incident': {'queue': 'notifications'},
+        'app.tasks.notify_client': {'queue': 'notifications'},
+    }
+
     # Define the Celery task context
     class ContextTask(celery.Task):
         def __call__(self, *args, **kwargs):
@@ -86,6 +94,7 @@ def create_app(config_name_or_class='development'):
     limiter.init_app(app)
     metrics.init_app(app)
     cache.init_app(app)
+    init_json_provider(app)
 
     # --- CORS: allow frontend -> API with proper preflight handling ---
     allowed_origins = app.config.get('CORS_ORIGINS') or []
@@ -162,6 +171,13 @@ def create_app(config_name_or_class='development'):
     )
     app.register_blueprint(olt_bp, url_prefix='/api/v1/olt', name='olt_v1')
 
+    @app.cli.command('import-legacy-staff-meta')
+    def import_legacy_staff_meta_command():
+        """One-time move of cached staff metadata blobs into staff_meta rows."""
+        from app.routes.main_routes import import_legacy_staff_meta
+
+        click.echo(f"Imported {import_legacy_staff_meta()} staff_meta rows.")
+
     # Explicit OPTIONS responder so CORS preflights never 404/405
     @app.route('/api/<path:any_path>', methods=['OPTIONS'])
     def api_options(any_path):
@@ -72,6 +72,7 @@ class User(db.Model):
     client = db.relationship('Client', back_populates='user', uselist=False, cascade="all, delete-orphan")
     tenant = db.relationship('Tenant', back_populates='users')
     tickets = db.relationship('Ticket', back_populates='user')
+    staff_meta = db.relationship('StaffMeta', back_populates='user', uselist=False, cascade="all, delete-orphan")
 
     def set_password(self, password):
         """Hashes and sets the user's password."""
@@ -102,6 +103,9 @@ class User(db.Model):
 
 class Subscription(db.Model):
     __tablename__ = 'subscriptions'
+    __table_args__ = (
+        db.Index('ix_subscriptions_tenant_status_next_charge', 'tenant_id', 'status', 'next_charge'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     customer = db.Column(db.String(150), nullable=False)
@@ -215,6 +219,7 @@ class MikroTikRouter(db.Model):
     __tablename__ = 'mikrotik_routers'
     __table_args__ = (
         db.UniqueConstraint('tenant_id', 'ip_address', name='uq_router_tenant_ip'),
+        db.Index('ix_routers_tenant_active', 'tenant_id', 'is_active'),
     )
 
     id = db.Column(db.Integer, primary_key=True)
@@ -354,6 +359,9 @@ class TicketComment(db.Model):
 
 class Invoice(db.Model):
     __tablename__ = 'invoices'
+    __table_args__ = (
+        db.Index('ix_invoices_status_due_date', 'status', 'due_date'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     subscription_id = db.Column(db.Integer, db.ForeignKey('subscriptions.id'), index=True, nullable=False)
@@ -388,6 +396,9 @@ class Invoice(db.Model):
 
 class PaymentRecord(db.Model):
     __tablename__ = 'payments'
+    __table_args__ = (
+        db.Index('ix_payments_status_created_at', 'status', 'created_at'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     invoice_id = db.Column(db.Integer, db.ForeignKey('invoices.id'), index=True, nullable=False)
@@ -667,6 +678,38 @@ class AdminSystemJob(db.Model):
         }
 
 
+class ProcessedWebhookEvent(db.Model):
+    __tablename__ = 'processed_webhook_events'
+
+    event_id = db.Column(db.String(255), primary_key=True)
+    event_type = db.Column(db.String(120), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+
+class StaffMeta(db.Model):
+    __tablename__ = 'staff_meta'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    tenant_id = db.Column(db.Integer, db.ForeignKey('tenants.id'), index=True, nullable=True)
+    zone = db.Column(db.String(120), nullable=False, default='general')
+    phone = db.Column(db.String(40), nullable=False, default='')
+    status = db.Column(db.String(20), nullable=False, default='active')
+    shift = db.Column(db.String(20), nullable=False, default='day')
+    last_seen_at = db.Column(db.DateTime, nullable=True)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    user = db.relationship('User', back_populates='staff_meta')
+
+    def to_dict(self):
+        return {
+            "zone": self.zone,
+            "phone": self.phone,
+            "status": self.status,
+            "shift": self.shift,
+            "last_seen_at": f"{self.last_seen_at.isoformat()}Z" if self.last_seen_at else None,
+        }
+
+
 class RolePermission(db.Model):
     __tablename__ = 'role_permissions'
 
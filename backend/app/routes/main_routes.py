@@ -1,15 +1,26 @@
-﻿from datetime import datetime, timedelta
-from functools import wraps
+﻿from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from functools import lru_cache, wraps
+from itertools import islice
+from operator import countOf
+from types import MappingProxyType
+from typing import Mapping
 import csv
 import hashlib
+import heapq
 import hmac
 import io
 import json
+import queue
+import re
 import secrets
 import string
+import threading
 import time
 
-from flask import Blueprint, jsonify, request, Response, current_app
+from flask import Blueprint, g, has_request_context, jsonify, request, Response, current_app
 from flask_jwt_extended import create_access_token, get_jwt_identity, jwt_required
 
 from app.models import (
@@ -27,7 +38,9 @@ from app.models import (
     NocMaintenanceWindow,
     PaymentRecord,
     Plan,
+    ProcessedWebhookEvent,
     RolePermission,
+    StaffMeta,
     Subscription,
     Tenant,
     Ticket,
@@ -36,14 +49,16 @@ from app.models import (
 )
 from app import limiter, cache, db, mail
 import pyotp
+import redis
 import requests
 from app.services.mikrotik_service import MikroTikService
 from app.services.monitoring_service import MonitoringService
 from app.tenancy import current_tenant_id, tenant_access_allowed
 from datetime import date
 from werkzeug.exceptions import BadRequest
-from sqlalchemy.orm import joinedload
-from sqlalchemy import or_
+from sqlalchemy.orm import joinedload, raiseload, selectinload
+from sqlalchemy import Float, case, cast, extract, func, or_, select, true, update
+from sqlalchemy.exc import IntegrityError
 import subprocess
 import os
 from flask_mail import Message
@@ -59,8 +74,21 @@ def _current_user_id():
         return None
 
 
+def _email_in_use(email, exclude_user_id=None) -> bool:
+    """EXISTS probe on the unique users.email index; no User row is loaded."""
+    query = db.session.query(User.id).filter(User.email == email)
+    if exclude_user_id is not None:
+        query = query.filter(User.id != exclude_user_id)
+    return db.session.query(query.exists()).scalar()
+
+
+# Matches every character str.isalnum() rejects; runs are not collapsed so
+# existing slugs and PPPoE usernames keep their shape.
+_SLUG_SEPARATOR_RE = re.compile(r'[\W_]')
+
+
 def _slugify(text: str) -> str:
-    return ''.join(ch.lower() if ch.isalnum() else '-' for ch in text).strip('-')
+    return _SLUG_SEPARATOR_RE.sub('-', text).lower().strip('-')
 
 
 def _parse_iso_datetime(value) -> datetime | None:
@@ -414,16 +442,36 @@ def _get_plan_for_request(data, tenant_id):
     return plan
 
 
-def _client_invoice_payload(invoice: Invoice) -> dict:
-    payload = invoice.to_dict()
+# Money columns are cast in SQL so rows arrive as floats instead of Decimals.
+CLIENT_INVOICE_COLUMNS = (
+    Invoice.id,
+    Invoice.subscription_id,
+    cast(Invoice.amount, Float).label("amount"),
+    Invoice.currency,
+    cast(Invoice.tax_percent, Float).label("tax_percent"),
+    cast(Invoice.total_amount, Float).label("total_amount"),
+    Invoice.status,
+    Invoice.due_date,
+    Invoice.country,
+    Invoice.created_at,
+    Invoice.updated_at,
+)
+
+
+def _client_invoice_payload(row) -> dict:
+    """Invoice.to_dict() shape built from a CLIENT_INVOICE_COLUMNS row."""
+    payload = dict(row._mapping)
+    for field in ("due_date", "created_at", "updated_at"):
+        value = payload[field]
+        payload[field] = value.isoformat() if value else None
     # Backward-compatible aliases consumed by existing client portal UI.
-    payload["due"] = payload.get("due_date")
-    payload["total"] = payload.get("total_amount")
+    payload["due"] = payload["due_date"]
+    payload["total"] = payload["total_amount"]
     return payload
 
 
 def _get_user_invoice_items(user: User, tenant_id) -> list[dict]:
-    query = Invoice.query.join(Subscription, Invoice.subscription_id == Subscription.id)
+    query = db.session.query(*CLIENT_INVOICE_COLUMNS).join(Subscription, Invoice.subscription_id == Subscription.id)
     if tenant_id is not None:
         query = query.filter(Subscription.tenant_id == tenant_id)
 
@@ -438,12 +486,12 @@ def _get_user_invoice_items(user: User, tenant_id) -> list[dict]:
         query = query.filter(Subscription.email == user.email)
 
     return [
-        _client_invoice_payload(invoice)
-        for invoice in query.order_by(Invoice.created_at.desc()).all()
+        _client_invoice_payload(row)
+        for row in query.order_by(Invoice.created_at.desc()).yield_per(500)
     ]
 
 
-STAFF_ALLOWED_ROLES = {"admin", "tech", "support", "billing", "noc", "operator"}
+STAFF_ALLOWED_ROLES = frozenset({"admin", "tech", "support", "billing", "noc", "operator"})
 PLATFORM_ADMIN_ROLE = "platform_admin"
 TENANT_BILLING_ALLOWED_STATUS = {"trial", "active", "past_due", "suspended", "cancelled"}
 TENANT_BILLING_ALLOWED_CYCLES = {"monthly", "quarterly", "yearly"}
@@ -473,24 +521,56 @@ TENANT_PLAN_TEMPLATES = {
         "max_clients": 50000,
     },
 }
-STAFF_ALLOWED_STATUS = {"active", "on_leave", "inactive"}
-STAFF_ALLOWED_SHIFTS = {"day", "night", "mixed"}
-INSTALLATION_ALLOWED_STATUS = {"pending", "scheduled", "in_progress", "completed", "cancelled"}
-SCREEN_ALERT_ALLOWED_STATUS = {"draft", "active", "paused", "expired"}
-SCREEN_ALERT_ALLOWED_SEVERITY = {"info", "warning", "critical", "success"}
-SCREEN_ALERT_ALLOWED_AUDIENCE = {"all", "active", "overdue", "suspended"}
-EXTRA_SERVICE_ALLOWED_STATUS = {"active", "disabled"}
-HOTSPOT_VOUCHER_ALLOWED_STATUS = {"generated", "sold", "used", "expired", "cancelled"}
-SYSTEM_ALLOWED_JOBS = {
+CONNECTION_STATUS_BY_TYPE = {"pppoe": "active", "dhcp": "idle", "static": "active"}
+# Upper bound on concurrent router sessions during password rotation.
+PASSWORD_ROTATION_MAX_WORKERS = 16
+# Upper bound on concurrent router reads when building the clients map.
+MAP_STATUS_MAX_WORKERS = 16
+STAFF_ALLOWED_STATUS = frozenset({"active", "on_leave", "inactive"})
+STAFF_ALLOWED_SHIFTS = frozenset({"day", "night", "mixed"})
+INSTALLATION_ALLOWED_STATUS = frozenset({"pending", "scheduled", "in_progress", "completed", "cancelled"})
+SCREEN_ALERT_ALLOWED_STATUS = frozenset({"draft", "active", "paused", "expired"})
+SCREEN_ALERT_ALLOWED_SEVERITY = frozenset({"info", "warning", "critical", "success"})
+SCREEN_ALERT_ALLOWED_AUDIENCE = frozenset({"all", "active", "overdue", "suspended"})
+NOTIFICATION_ALLOWED_CHANNELS = frozenset({"push", "email", "whatsapp", "system"})
+NOTIFICATION_ALLOWED_AUDIENCE = frozenset({"all", "active", "overdue", "suspended"})
+# Aging buckets for pending invoices: (bucket, oldest due date offset it covers).
+FINANCE_AGING_CUTOFFS = (
+    ("days_1_30", timedelta(days=30)),
+    ("days_31_60", timedelta(days=60)),
+    ("days_61_90", timedelta(days=90)),
+)
+FINANCE_AGING_BUCKETS = ("current", *(bucket for bucket, _ in FINANCE_AGING_CUTOFFS), "days_90_plus")
+
+
+def _norm_choice(value, default: str = "") -> str:
+    return str(value or default).strip().lower()
+
+
+def _allowed_values_error(field: str, allowed) -> str:
+    return f"{field} invalido. permitidos: {', '.join(sorted(allowed))}"
+
+
+# Validation errors are built once; invalid requests only return the constant.
+STAFF_STATUS_ERROR = _allowed_values_error("status", STAFF_ALLOWED_STATUS)
+STAFF_SHIFT_ERROR = _allowed_values_error("shift", STAFF_ALLOWED_SHIFTS)
+INSTALLATION_STATUS_ERROR = _allowed_values_error("status", INSTALLATION_ALLOWED_STATUS)
+SCREEN_ALERT_STATUS_ERROR = _allowed_values_error("status", SCREEN_ALERT_ALLOWED_STATUS)
+SCREEN_ALERT_SEVERITY_ERROR = _allowed_values_error("severity", SCREEN_ALERT_ALLOWED_SEVERITY)
+SCREEN_ALERT_AUDIENCE_ERROR = _allowed_values_error("audience", SCREEN_ALERT_ALLOWED_AUDIENCE)
+EXTRA_SERVICE_ALLOWED_STATUS = frozenset({"active", "disabled"})
+HOTSPOT_VOUCHER_ALLOWED_STATUS = frozenset({"generated", "sold", "used", "expired", "cancelled"})
+HOTSPOT_VOUCHER_REVENUE_STATUS = frozenset({"sold", "used"})
+SYSTEM_ALLOWED_JOBS = frozenset({
     "backup",
     "cleanup_leases",
     "rotate_passwords",
     "recalc_balances",
     "enforce_billing",
     "backup_restore_drill",
-}
-TICKET_ALLOWED_PRIORITIES = {"low", "medium", "high", "urgent"}
-OPS_CHANGE_ALLOWED_STATUS = {
+})
+TICKET_ALLOWED_PRIORITIES = frozenset({"low", "medium", "high", "urgent"})
+OPS_CHANGE_ALLOWED_STATUS = frozenset({
     "requested",
     "approved",
     "scheduled",
@@ -499,7 +579,15 @@ OPS_CHANGE_ALLOWED_STATUS = {
     "rolled_back",
     "rejected",
     "cancelled",
-}
+})
+PERMISSION_ALLOWED_ROLES = STAFF_ALLOWED_ROLES | {"admin", "client", PLATFORM_ADMIN_ROLE}
+STAFF_ROLE_ERROR = _allowed_values_error("role", STAFF_ALLOWED_ROLES)
+PERMISSION_ROLE_ERROR = _allowed_values_error("role", PERMISSION_ALLOWED_ROLES)
+EXTRA_SERVICE_STATUS_ERROR = _allowed_values_error("status", EXTRA_SERVICE_ALLOWED_STATUS)
+HOTSPOT_VOUCHER_STATUS_ERROR = _allowed_values_error("status", HOTSPOT_VOUCHER_ALLOWED_STATUS)
+TICKET_PRIORITY_ERROR = _allowed_values_error("default_ticket_priority", TICKET_ALLOWED_PRIORITIES)
+OPS_CHANGE_STATUS_ERROR = _allowed_values_error("status", OPS_CHANGE_ALLOWED_STATUS)
+SYSTEM_JOB_ERROR = f"job debe ser {' | '.join(sorted(SYSTEM_ALLOWED_JOBS))}"
 
 ROLE_BASE_PERMISSIONS: dict[str, set[str]] = {
     PLATFORM_ADMIN_ROLE: {
@@ -624,6 +712,40 @@ def _hotspot_vouchers_key(tenant_id) -> str:
     return _tenant_cache_key("admin_hotspot_vouchers", tenant_id)
 
 
+def _plans_list_key(tenant_id) -> str:
+    return _tenant_cache_key("plans_list", tenant_id)
+
+
+def _network_health_key(tenant_id) -> str:
+    return _tenant_cache_key("network_health", tenant_id)
+
+
+def _network_alerts_key(tenant_id) -> str:
+    return _tenant_cache_key("network_alerts", tenant_id)
+
+
+def _dashboard_overview_key(tenant_id) -> str:
+    return _tenant_cache_key("dashboard_overview", tenant_id)
+
+
+def _conditional_json(payload, max_age: int = 30) -> Response:
+    """JSON response with an ETag; polls that already hold the same body get a 304."""
+    response = jsonify(payload)
+    response.add_etag()
+    response.cache_control.private = True
+    response.cache_control.max_age = max_age
+    return response.make_conditional(request)
+
+
+def _cached_snapshot(key: str, builder, timeout: int):
+    """Serve a short-lived per-tenant read model, rebuilding it once the TTL lapses."""
+    snapshot = cache.get(key)
+    if snapshot is None:
+        snapshot = builder()
+        cache.set(key, snapshot, timeout=timeout)
+    return snapshot
+
+
 def _system_settings_key(tenant_id) -> str:
     return _tenant_cache_key("admin_system_settings", tenant_id)
 
@@ -640,20 +762,55 @@ def _ops_change_requests_key(tenant_id) -> str:
     return _tenant_cache_key("admin_ops_change_requests", tenant_id)
 
 
-def _load_staff_meta(tenant_id) -> dict:
-    return cache.get(_staff_meta_key(tenant_id)) or {}
+def _staff_meta_from_dict(raw: dict, tenant_id) -> StaffMeta:
+    status = _norm_choice(raw.get("status"), "active")
+    shift = _norm_choice(raw.get("shift"), "day")
+    last_seen = _parse_iso_datetime(raw.get("last_seen_at"))
+    return StaffMeta(
+        tenant_id=tenant_id,
+        zone=str(raw.get("zone") or "general").strip() or "general",
+        phone=str(raw.get("phone") or "").strip(),
+        status=status if status in STAFF_ALLOWED_STATUS else "active",
+        shift=shift if shift in STAFF_ALLOWED_SHIFTS else "day",
+        last_seen_at=last_seen.replace(tzinfo=None) if last_seen else None,
+    )
+
+
+def _import_legacy_staff_meta(tenant_id) -> int:
+    """Stage staff_meta rows from the old per-tenant cache blob; the caller commits.
+
+    One-time migration step run by the ``import-legacy-staff-meta`` CLI command,
+    never from request handlers.
+    """
+    legacy = cache.get(_staff_meta_key(tenant_id))
+    if not legacy:
+        return 0
+    user_ids = [int(raw_id) for raw_id in legacy if str(raw_id).isdigit()]
+    users = User.query.options(selectinload(User.staff_meta)).filter(User.id.in_(user_ids)).all() if user_ids else []
+    imported = 0
+    for user in users:
+        if user.staff_meta is None:
+            user.staff_meta = _staff_meta_from_dict(legacy.get(str(user.id)) or {}, user.tenant_id)
+            imported += 1
+    db.session.flush()
+    return imported
 
 
-def _save_staff_meta(tenant_id, metadata: dict) -> None:
-    cache.set(_staff_meta_key(tenant_id), metadata, timeout=86400 * 30)
+def import_legacy_staff_meta() -> int:
+    """Import every tenant's legacy staff metadata blob, then drop the blobs."""
+    tenant_ids = [None, *(tenant_id for (tenant_id,) in Tenant.query.with_entities(Tenant.id).all())]
+    imported = sum(_import_legacy_staff_meta(tenant_id) for tenant_id in tenant_ids)
+    db.session.commit()
+    cache.delete_many(*(_staff_meta_key(tenant_id) for tenant_id in tenant_ids))
+    return imported
 
 
 def _load_notification_history(tenant_id) -> list[dict]:
-    return cache.get(_notifications_history_key(tenant_id)) or []
+    return _load_cached_entries(_notifications_history_key(tenant_id))
 
 
-def _save_notification_history(tenant_id, history: list[dict]) -> None:
-    cache.set(_notifications_history_key(tenant_id), history[:200], timeout=86400 * 30)
+def _push_notification_history(tenant_id, entry: dict) -> None:
+    _push_cached_entry(_notifications_history_key(tenant_id), entry, max_items=200)
 
 
 def _load_cached_list(key: str) -> list[dict]:
@@ -664,6 +821,182 @@ def _save_cached_list(key: str, items: list[dict], max_items: int = 500) -> None
     cache.set(key, items[:max_items], timeout=86400 * 30)
 
 
+def _find_entry_index(items: list[dict], entry_id) -> int | None:
+    """Position of the entry whose id matches ``entry_id``; stops at the first hit."""
+    target = str(entry_id or "")
+    for index, item in enumerate(items):
+        if str(item.get("id") or "") == target:
+            return index
+    return None
+
+
+def _prepend_cached_list(key: str, entry: dict, max_items: int = 500, skip_id: str | None = None) -> None:
+    """Store ``entry`` ahead of at most ``max_items - 1`` existing items without shifting the full list."""
+    existing = _load_cached_list(key)
+    if skip_id is not None:
+        existing = (item for item in existing if str(item.get("id") or "") != skip_id)
+    _save_cached_list(key, [entry, *islice(existing, max_items - 1)], max_items=max_items)
+
+
+_REDIS_LIST_CLIENTS: dict[str, redis.Redis] = {}
+
+
+def _cache_is_shared() -> bool:
+    """True when the cache backend is Redis, i.e. visible to every worker process."""
+    return 'redis' in str(current_app.config.get('CACHE_TYPE') or '').lower()
+
+
+def _redis_list_client() -> redis.Redis | None:
+    """Raw Redis client for list-shaped caches, or None when the cache is not Redis-backed."""
+    if not _cache_is_shared():
+        return None
+    redis_url = current_app.config.get('CACHE_REDIS_URL') or current_app.config.get('REDIS_URL')
+    if not redis_url:
+        return None
+    client = _REDIS_LIST_CLIENTS.get(redis_url)
+    if client is None:
+        try:
+            client = redis.from_url(redis_url, decode_responses=True)
+        except Exception:
+            current_app.logger.warning('Redis unavailable for list cache; using cache fallback.')
+            return None
+        _REDIS_LIST_CLIENTS[redis_url] = client
+    return client
+
+
+def _cached_entries_index_key(key: str) -> str:
+    return f"{key}:idx"
+
+
+def _dump_cached_entry(entry: dict) -> str:
+    # Goes through the app's JSON provider (orjson when installed); insertion
+    # order is kept because the entries are read back as Python dicts.
+    return current_app.json.dumps(entry, default=str, sort_keys=False)
+
+
+def _load_cached_entries(key: str) -> list[dict]:
+    """Newest-first entries stored as a Redis LIST of ids plus an id -> JSON hash."""
+    client = _redis_list_client()
+    if client is None:
+        return _load_cached_list(key)
+    try:
+        entry_ids = client.lrange(key, 0, -1)
+        if not entry_ids:
+            return _load_cached_list(key)
+        raw_items = client.hmget(_cached_entries_index_key(key), entry_ids)
+    except Exception:
+        current_app.logger.warning('Redis list read failed for %s; using cache fallback.', key)
+        return _load_cached_list(key)
+    loads = current_app.json.loads
+    return [loads(raw) for raw in raw_items if raw]
+
+
+def _push_cached_entry(key: str, entry: dict, max_items: int = 500) -> None:
+    entry_id = str(entry.get("id") or "")
+    client = _redis_list_client()
+    if client is None or not entry_id:
+        _prepend_cached_list(key, entry, max_items=max_items, skip_id=entry_id)
+        return
+    index_key = _cached_entries_index_key(key)
+    batch = _active_side_effects_batch()
+    try:
+        if batch is not None:
+            pipe = batch.get("pipe")
+            if pipe is None:
+                pipe = batch["pipe"] = client.pipeline()
+        else:
+            pipe = client.pipeline()
+        overflow_position = len(pipe) + 2
+        pipe.lpush(key, entry_id)
+        pipe.hset(index_key, entry_id, _dump_cached_entry(entry))
+        pipe.lrange(key, max_items, -1)
+        pipe.ltrim(key, 0, max_items - 1)
+        pipe.expire(key, 86400 * 30)
+        pipe.expire(index_key, 86400 * 30)
+        if batch is not None:
+            batch["trims"].append((index_key, overflow_position))
+            return
+        overflow_ids = pipe.execute()[overflow_position]
+        if overflow_ids:
+            client.hdel(index_key, *overflow_ids)
+    except Exception:
+        current_app.logger.warning('Redis list write failed for %s', key)
+
+
+# Overwrite one entry in the id -> JSON hash only if it is already indexed,
+# so a PATCH is a single round trip keyed by id.
+_REPLACE_CACHED_ENTRY_SCRIPT = """
+if redis.call('HEXISTS', KEYS[1], ARGV[1]) == 1 then
+    redis.call('HSET', KEYS[1], ARGV[1], ARGV[2])
+    return 1
+end
+return 0
+"""
+
+
+def _update_cached_entry(key: str, entry: dict, max_items: int = 500) -> None:
+    entry_id = str(entry.get("id") or "")
+    client = _redis_list_client()
+    if client is None or not entry_id:
+        items = _load_cached_list(key)
+        index = _find_entry_index(items, entry_id) if entry_id else None
+        if index is not None:
+            items[index] = entry
+            _save_cached_list(key, items, max_items=max_items)
+            return
+        _push_cached_entry(key, entry, max_items=max_items)
+        return
+    try:
+        if client.eval(_REPLACE_CACHED_ENTRY_SCRIPT, 1, _cached_entries_index_key(key), entry_id, _dump_cached_entry(entry)):
+            return
+    except Exception:
+        current_app.logger.warning('Redis list update failed for %s', key)
+        return
+    _push_cached_entry(key, entry, max_items=max_items)
+
+
+def _active_side_effects_batch() -> dict | None:
+    return g.get('side_effects_batch')
+
+
+@contextmanager
+def _bulk_side_effects():
+    """Buffer audit rows and Redis list writes issued inside the block.
+
+    Audit rows are dispatched as one batch and Redis writes run in a single
+    pipeline when the block exits, instead of one round trip each.
+    """
+    if _active_side_effects_batch() is not None:
+        yield _active_side_effects_batch()
+        return
+    batch = {"audit": [], "pipe": None, "trims": []}
+    g.side_effects_batch = batch
+    try:
+        yield batch
+    finally:
+        g.pop('side_effects_batch', None)
+        _flush_side_effects(batch)
+
+
+def _flush_side_effects(batch: dict) -> None:
+    pipe = batch.get("pipe")
+    if pipe is not None:
+        try:
+            results = pipe.execute()
+            for index_key, position in batch["trims"]:
+                overflow_ids = results[position]
+                if overflow_ids:
+                    pipe.hdel(index_key, *overflow_ids)
+            if len(pipe):
+                pipe.execute()
+        except Exception:
+            current_app.logger.warning('Redis pipeline flush failed')
+    if batch["audit"]:
+        from app.tasks import write_audit_logs
+
+        _dispatch_side_effect(write_audit_logs, batch["audit"])
+
+
 def _load_cached_dict(key: str) -> dict:
     return cache.get(key) or {}
 
@@ -679,6 +1012,14 @@ def _tenant_scoped_query(model, tenant_id):
     return query.filter(model.tenant_id == tenant_id)
 
 
+def _user_scoped_query(model, user_id, tenant_id):
+    """Rows owned by user_id, narrowed to tenant_id when a tenant is resolved."""
+    criteria = {"user_id": user_id}
+    if tenant_id is not None:
+        criteria["tenant_id"] = tenant_id
+    return model.query.filter_by(**criteria)
+
+
 def _load_system_settings_overrides_db(tenant_id) -> dict:
     rows = _tenant_scoped_query(AdminSystemSetting, tenant_id).all()
     return {row.key: row.value for row in rows}
@@ -687,6 +1028,7 @@ def _load_system_settings_overrides_db(tenant_id) -> dict:
 def _save_system_settings_overrides_db(tenant_id, overrides: dict, updated_by=None) -> None:
     existing_rows = _tenant_scoped_query(AdminSystemSetting, tenant_id).all()
     existing_map = {row.key: row for row in existing_rows}
+    now = datetime.utcnow()
     for key_name, value in overrides.items():
         row = existing_map.get(key_name)
         if row is None:
@@ -695,12 +1037,12 @@ def _save_system_settings_overrides_db(tenant_id, overrides: dict, updated_by=No
                 key=key_name,
                 value=value,
                 updated_by=updated_by,
-                updated_at=datetime.utcnow(),
+                updated_at=now,
             )
         else:
             row.value = value
             row.updated_by = updated_by
-            row.updated_at = datetime.utcnow()
+            row.updated_at = now
         db.session.add(row)
     db.session.commit()
 
@@ -813,14 +1155,28 @@ def _save_ops_change_requests(tenant_id, items: list[dict], updated_by=None) ->
     _save_cached_list(_ops_change_requests_key(tenant_id), cleaned, max_items=500)
 
 
-def _load_system_jobs_db(tenant_id, status_filter: str = '', job_filter: str = '') -> list[dict]:
+def _system_jobs_db_query(tenant_id, status_filter: str = '', job_filter: str = ''):
     query = _tenant_scoped_query(AdminSystemJob, tenant_id)
     if status_filter:
         query = query.filter(AdminSystemJob.status == status_filter)
     if job_filter:
         query = query.filter(AdminSystemJob.job == job_filter)
-    rows = query.order_by(AdminSystemJob.started_at.desc()).all()
-    return [row.to_dict() for row in rows]
+    return query
+
+
+def _load_system_jobs_db(
+    tenant_id,
+    status_filter: str = '',
+    job_filter: str = '',
+    limit: int | None = None,
+    offset: int = 0,
+) -> list[dict]:
+    query = _system_jobs_db_query(tenant_id, status_filter, job_filter).order_by(AdminSystemJob.started_at.desc())
+    if offset:
+        query = query.offset(offset)
+    if limit is not None:
+        query = query.limit(limit)
+    return [row.to_dict() for row in query.all()]
 
 
 def _role_permissions_with_overrides(role: str, tenant_id) -> set[str]:
@@ -851,7 +1207,13 @@ def _is_permission_allowed(user: User | None, permission: str, tenant_id) -> boo
 
 
 def _iso_utc_now() -> str:
-    return datetime.utcnow().replace(microsecond=0).isoformat() + "Z"
+    """Second-resolution UTC timestamp, formatted once per request and reused."""
+    if not has_request_context():
+        return datetime.utcnow().replace(microsecond=0).isoformat() + "Z"
+    now = g.get('iso_utc_now')
+    if now is None:
+        now = g.iso_utc_now = datetime.utcnow().replace(microsecond=0).isoformat() + "Z"
+    return now
 
 
 def _actor_default_name(actor_id) -> str:
@@ -897,9 +1259,9 @@ def _ensure_operational_entry_metadata(entry: dict) -> bool:
     return changed
 
 
-def _apply_operational_entry_create_metadata(entry: dict, actor: dict | None = None) -> None:
+def _apply_operational_entry_create_metadata(entry: dict, actor: dict | None = None, now: str | None = None) -> None:
     actor = actor or _current_actor_snapshot()
-    now = _iso_utc_now()
+    now = now or _iso_utc_now()
     actor_name = str(actor.get("name") or _actor_default_name(actor.get("id")))
     actor_email = actor.get("email")
 
@@ -914,13 +1276,13 @@ def _apply_operational_entry_create_metadata(entry: dict, actor: dict | None = N
         entry["updated_by_email"] = actor_email
 
 
-def _apply_operational_entry_update_metadata(entry: dict, actor: dict | None = None) -> None:
+def _apply_operational_entry_update_metadata(entry: dict, actor: dict | None = None, now: str | None = None) -> None:
     actor = actor or _current_actor_snapshot()
     _ensure_operational_entry_metadata(entry)
     actor_name = str(actor.get("name") or _actor_default_name(actor.get("id")))
     actor_email = actor.get("email")
 
-    entry["updated_at"] = _iso_utc_now()
+    entry["updated_at"] = now or _iso_utc_now()
     entry["updated_by"] = actor.get("id")
     entry["updated_by_name"] = actor_name
     if actor_email:
@@ -975,71 +1337,121 @@ def _serialize_staff_member(user: User, metadata: dict, assigned_counts: dict[st
     }
 
 
+_BACKGROUND_JOBS: queue.Queue | None = None
+_BACKGROUND_JOBS_LOCK = threading.Lock()
+# Bounded so a stalled database cannot grow memory: once full, audit rows are
+# written inline (back-pressure) and other side effects are shed.
+_BACKGROUND_JOBS_MAX = 10000
+_BACKGROUND_DRAIN_BATCH = 200
+# Tasks whose single argument is a list of rows; queued calls are merged into one.
+_MERGEABLE_SIDE_EFFECTS = frozenset({'app.tasks.write_audit_logs'})
+
+
+def _background_jobs() -> queue.Queue:
+    global _BACKGROUND_JOBS
+    with _BACKGROUND_JOBS_LOCK:
+        if _BACKGROUND_JOBS is None:
+            _BACKGROUND_JOBS = queue.Queue(maxsize=_BACKGROUND_JOBS_MAX)
+            threading.Thread(
+                target=_drain_background_jobs,
+                args=(_BACKGROUND_JOBS,),
+                name='side-effects',
+                daemon=True,
+            ).start()
+        return _BACKGROUND_JOBS
+
+
+def _drain_background_jobs(jobs: queue.Queue) -> None:
+    while True:
+        pending = [jobs.get()]
+        while len(pending) < _BACKGROUND_DRAIN_BATCH:
+            try:
+                pending.append(jobs.get_nowait())
+            except queue.Empty:
+                break
+        try:
+            for app, task, args in _merge_background_jobs(pending):
+                try:
+                    with app.app_context():
+                        task.run(*args)
+                except Exception:
+                    app.logger.warning('Background side effect failed: %s', task.name)
+        finally:
+            for _ in pending:
+                jobs.task_done()
+
+
+def _merge_background_jobs(pending: list[tuple]) -> list[tuple]:
+    """Fold row-list tasks for the same app into one call so they insert as a batch."""
+    merged: list[tuple] = []
+    rows_by_key: dict[tuple, list] = {}
+    for app, task, args in pending:
+        if task.name not in _MERGEABLE_SIDE_EFFECTS:
+            merged.append((app, task, args))
+            continue
+        key = (id(app), task.name)
+        rows = rows_by_key.get(key)
+        if rows is None:
+            rows = rows_by_key[key] = []
+            merged.append((app, task, (rows,)))
+        rows.extend(args[0])
+    return merged
+
+
+def _dispatch_side_effect(task, *args) -> None:
+    """Run a side-effect task according to SIDE_EFFECTS_DISPATCH (celery, thread or sync).
+
+    Celery publishing failures fall back to the in-process background thread so
+    single-node deployments without a reachable broker keep auditing.
+    """
+    mode = str(current_app.config.get('SIDE_EFFECTS_DISPATCH') or 'sync').strip().lower()
+    if mode == 'celery':
+        try:
+            task.apply_async(args=args, retry_policy={'max_retries': 1})
+            return
+        except Exception:
+            current_app.logger.warning('Celery dispatch failed for %s; using in-process queue', task.name)
+            mode = 'thread'
+    if mode == 'thread':
+        try:
+            _background_jobs().put_nowait((current_app._get_current_object(), task, args))
+        except queue.Full:
+            if task.name not in _MERGEABLE_SIDE_EFFECTS:
+                current_app.logger.warning('Background queue full; dropping %s', task.name)
+                return
+            current_app.logger.warning('Background queue full; writing %s inline', task.name)
+            task.run(*args)
+        return
+    task.run(*args)
+
+
 def _audit(action: str, entity_type: str = None, entity_id: str = None, metadata=None):
     try:
-        tenant_id = current_tenant_id()
-        user_id = _current_user_id()
-        entry = AuditLog(
-            tenant_id=tenant_id,
-            user_id=user_id,
-            action=action,
-            entity_type=entity_type,
-            entity_id=str(entity_id) if entity_id is not None else None,
-            meta=metadata,
-            ip_address=getattr(request, "remote_addr", None),
-        )
-        from app import db
-        db.session.add(entry)
-        db.session.commit()
+        row = {
+            "tenant_id": current_tenant_id(),
+            "user_id": _current_user_id(),
+            "action": action,
+            "entity_type": entity_type,
+            "entity_id": str(entity_id) if entity_id is not None else None,
+            "meta": metadata,
+            "ip_address": getattr(request, "remote_addr", None),
+        }
+        batch = _active_side_effects_batch()
+        if batch is not None:
+            batch["audit"].append(row)
+            return
+        from app.tasks import write_audit_logs
+
+        _dispatch_side_effect(write_audit_logs, [row])
     except Exception:
         pass
 
 
 def _notify_incident(message: str, severity: str = "info"):
     """Send push notification to PagerDuty/Telegram if configured."""
-    pd_key = current_app.config.get('PAGERDUTY_ROUTING_KEY')
-    tg_token = current_app.config.get('TELEGRAM_BOT_TOKEN')
-    tg_chat = current_app.config.get('TELEGRAM_CHAT_ID')
-    wp_token = current_app.config.get('WONDERPUSH_ACCESS_TOKEN')
-    wp_app = current_app.config.get('WONDERPUSH_APPLICATION_ID')
-    if pd_key:
-        try:
-            import requests
-            payload = {
-                "routing_key": pd_key,
-                "event_action": "trigger",
-                "payload": {
-                    "summary": message,
-                    "severity": "critical" if severity == "critical" else "warning" if severity == "warning" else "info",
-                    "source": "ispfast-api",
-                },
-            }
-            requests.post("https://events.pagerduty.com/v2/enqueue", json=payload, timeout=5)
-        except Exception:
-            current_app.logger.warning("PagerDuty notify failed")
-    if tg_token and tg_chat:
-        try:
-            import requests
-            requests.post(f"https://api.telegram.org/bot{tg_token}/sendMessage",
-                          data={"chat_id": tg_chat, "text": message[:4000]}, timeout=5)
-        except Exception:
-            current_app.logger.warning("Telegram notify failed")
-    if wp_token and wp_app:
-        try:
-            import requests
-            payload = {
-                "targetSegmentIds": ["all"],
-                "notification": {"alert": message, "url": current_app.config.get('FRONTEND_URL')}
-            }
-            requests.post(
-                "https://api.wonderpush.com/v1/deliveries",
-                params={"applicationId": wp_app},
-                headers={"Authorization": f"Bearer {wp_token}"},
-                json=payload,
-                timeout=5
-            )
-        except Exception:
-            current_app.logger.warning("WonderPush notify failed")
+    from app.tasks import notify_incident
+
+    _dispatch_side_effect(notify_incident, message, severity)
 
 # Helper para verificar rol de admin
 def admin_required():
@@ -1229,8 +1641,9 @@ def _parse_money_value(value) -> float | None:
 
 
 def _build_network_alert_items(tenant_id) -> list[dict]:
-    routers_q = MikroTikRouter.query
-    subs_q = Subscription.query
+    # Only the columns rendered into the alert are fetched.
+    routers_q = db.session.query(MikroTikRouter.id, MikroTikRouter.name).filter_by(is_active=False)
+    subs_q = db.session.query(Subscription.id, Subscription.customer).filter_by(status='past_due')
     if tenant_id is not None:
         routers_q = routers_q.filter_by(tenant_id=tenant_id)
         subs_q = subs_q.filter_by(tenant_id=tenant_id)
@@ -1238,7 +1651,7 @@ def _build_network_alert_items(tenant_id) -> list[dict]:
     alerts: list[dict] = []
     now_iso = _iso_utc_now()
 
-    for router in routers_q.filter_by(is_active=False).all():
+    for router in routers_q.all():
         alerts.append(
             {
                 "id": f"AL-R-{router.id}",
@@ -1250,7 +1663,7 @@ def _build_network_alert_items(tenant_id) -> list[dict]:
             }
         )
 
-    for sub in subs_q.filter_by(status='past_due').all():
+    for sub in subs_q.all():
         alerts.append(
             {
                 "id": f"AL-S-{sub.id}",
@@ -1293,6 +1706,14 @@ def _build_network_alert_items(tenant_id) -> list[dict]:
     return alerts
 
 
+def _cached_network_health(tenant_id) -> dict:
+    return _cached_snapshot(_network_health_key(tenant_id), lambda: _build_network_health_payload(tenant_id), timeout=60)
+
+
+def _cached_network_alert_items(tenant_id) -> list[dict]:
+    return _cached_snapshot(_network_alerts_key(tenant_id), lambda: _build_network_alert_items(tenant_id), timeout=60)
+
+
 def _build_network_health_payload(tenant_id) -> dict:
     routers_q = MikroTikRouter.query
     if tenant_id is not None:
@@ -1319,32 +1740,36 @@ def _build_network_health_payload(tenant_id) -> dict:
 
     try:
         monitoring = MonitoringService()
-        resources = monitoring.query_metrics('system_resources', time_range='-30m')
-        cpu_samples = []
-        mem_usage = []
+        resources = monitoring.query_metrics(
+            'system_resources', time_range='-30m', fields=['cpu_load', 'free_memory', 'total_memory']
+        )
+        # Running totals: the averages are all that is kept from the series.
+        cpu_total = cpu_count = 0
+        mem_total = mem_count = 0
         for point in resources:
             cpu = point.get('cpu_load')
             free_mem = point.get('free_memory')
             total_mem = point.get('total_memory')
             if cpu is not None:
                 try:
-                    cpu_samples.append(float(str(cpu).replace('%', '').strip()))
+                    cpu_total += float(str(cpu).replace('%', '').strip())
+                    cpu_count += 1
                 except Exception:
                     pass
             if free_mem is not None and total_mem not in (None, 0):
                 try:
-                    usage = (float(total_mem) - float(free_mem)) / float(total_mem) * 100
-                    mem_usage.append(usage)
+                    mem_total += (float(total_mem) - float(free_mem)) / float(total_mem) * 100
+                    mem_count += 1
                 except Exception:
                     pass
 
         score = 95 - (routers_down * 8)
-        if cpu_samples:
-            cpu_avg = sum(cpu_samples) / len(cpu_samples)
+        if cpu_count:
+            cpu_avg = cpu_total / cpu_count
             health["cpu_avg"] = round(cpu_avg, 1)
             score -= max(0, cpu_avg - 70) * 0.2
-        if mem_usage:
-            mem_avg = sum(mem_usage) / len(mem_usage)
+        if mem_count:
+            mem_avg = mem_total / mem_count
             health["memory_avg"] = round(mem_avg, 1)
             score -= max(0, mem_avg - 80) * 0.15
 
@@ -1437,54 +1862,79 @@ def api_health():
 @staff_required()
 def dashboard_overview():
     tenant_id = current_tenant_id()
+    payload = _cached_snapshot(_dashboard_overview_key(tenant_id), lambda: _build_dashboard_overview(tenant_id), timeout=30)
+    _audit("dashboard_view", entity_type="dashboard", metadata={"tenant_id": tenant_id, "routers_down": payload["routers"]["down"]})
+    return _conditional_json(payload)
 
-    clients_q = Client.query
-    if tenant_id is not None:
-        clients_q = clients_q.filter_by(tenant_id=tenant_id)
-    clients_count = clients_q.count()
 
-    routers_q = MikroTikRouter.query
-    if tenant_id is not None:
-        routers_q = routers_q.filter_by(tenant_id=tenant_id)
-    routers_ok = routers_q.filter_by(is_active=True).count()
-    routers_down = routers_q.filter_by(is_active=False).count()
-
-    subs_q = Subscription.query
+def _build_dashboard_overview(tenant_id) -> dict:
+    clients_q = select(func.count(Client.id))
+    routers_q = select(
+        func.count(case((MikroTikRouter.is_active.is_(True), 1))),
+        func.count(case((MikroTikRouter.is_active.is_(False), 1))),
+    )
+    # Totals leave the database already rounded to cents.
+    subs_q = select(
+        func.round(func.coalesce(func.sum(case((Subscription.status == 'active', Subscription.amount), else_=0)), 0), 2),
+        func.round(
+            func.coalesce(func.sum(case((Subscription.status.in_(('past_due', 'trial')), Subscription.amount), else_=0)), 0),
+            2,
+        ),
+    )
     if tenant_id is not None:
-        subs_q = subs_q.filter_by(tenant_id=tenant_id)
-    paid_today = sum(float(s.amount) for s in subs_q.filter_by(status='active').all())
-    pending_amount = sum(float(s.amount) for s in subs_q.filter(Subscription.status.in_(['past_due', 'trial'])).all())
+        clients_q = clients_q.where(Client.tenant_id == tenant_id)
+        routers_q = routers_q.where(MikroTikRouter.tenant_id == tenant_id)
+        subs_q = subs_q.where(Subscription.tenant_id == tenant_id)
+
+    # Each aggregate SELECT yields exactly one row, so cross-joining them
+    # returns every figure in a single round trip.
+    clients_sq, routers_sq, subs_sq = (q.subquery() for q in (clients_q, routers_q, subs_q))
+    row = db.session.execute(
+        select(clients_sq, routers_sq, subs_sq).select_from(
+            clients_sq.join(routers_sq, true()).join(subs_sq, true())
+        )
+    ).one()
+    clients_count, routers_ok, routers_down = (int(value or 0) for value in row[:3])
+    paid_today, pending_amount = (float(total) for total in row[3:])
 
+    # Counts are integers, so the two decimals are always zero.
     overview = {
         "uptime": "99.9%",
         "currentSpeed": f"{max(30, routers_ok*5 + 50)} Mbps",
-        "totalDownload": f"{clients_count * 120:.2f} GiB",
-        "totalUpload": f"{clients_count * 45:.2f} GiB"
+        "totalDownload": f"{clients_count * 120}.00 GiB",
+        "totalUpload": f"{clients_count * 45}.00 GiB"
     }
-    tickets = {"today": routers_down, "pending": max(routers_down, 0), "month": routers_down * 3}
-    finance = {"paid_today": round(paid_today, 2), "pending": round(pending_amount, 2)}
-    _audit("dashboard_view", entity_type="dashboard", metadata={"tenant_id": tenant_id, "routers_down": routers_down})
-    return jsonify({"overview": overview, "tickets": tickets, "finance": finance, "clients": clients_count, "routers": {"ok": routers_ok, "down": routers_down}}), 200
+    tickets = {"today": routers_down, "pending": routers_down, "month": routers_down * 3}
+    finance = {"paid_today": paid_today, "pending": pending_amount}
+    return {"overview": overview, "tickets": tickets, "finance": finance, "clients": clients_count, "routers": {"ok": routers_ok, "down": routers_down}}
 
 
 @main_bp.route('/billing', methods=['GET'])
 @staff_required()
 def billing_summary():
     tenant_id = current_tenant_id()
-    subs = Subscription.query
+    subs = db.session.query(
+        Subscription.id,
+        cast(Subscription.amount, Float).label('amount'),
+        cast(func.coalesce(Subscription.tax_percent, 0), Float).label('tax_percent'),
+        Subscription.currency,
+        Subscription.next_charge.label('due'),
+        Subscription.status,
+        Subscription.method,
+    )
     if tenant_id is not None:
-        subs = subs.filter_by(tenant_id=tenant_id)
+        subs = subs.filter(Subscription.tenant_id == tenant_id)
 
     invoices = []
-    for s in subs.all():
-        inv_total = float(s.amount) * (1 + float(s.tax_percent or 0) / 100)
+    # Plain tuples fetched in chunks; no Subscription objects are built.
+    for s in subs.yield_per(500):
         invoices.append({
             "id": f"SUB-{s.id}",
-            "amount": float(s.amount),
-            "tax_percent": float(s.tax_percent or 0),
-            "total": round(inv_total, 2),
+            "amount": s.amount,
+            "tax_percent": s.tax_percent,
+            "total": round(s.amount * (1 + s.tax_percent / 100), 2),
             "currency": s.currency,
-            "due": s.next_charge.isoformat() if s.next_charge else datetime.utcnow().date().isoformat(),
+            "due": s.due.isoformat(),
             "status": "paid" if s.status == 'active' else ("overdue" if s.status == 'past_due' else "pending"),
             "method": s.method,
         })
@@ -1495,29 +1945,32 @@ def billing_summary():
 @staff_required()
 def connections_summary():
     tenant_id = current_tenant_id()
-    query = Client.query
+    # Router state comes from the same SELECT instead of one lazy load per client.
+    query = db.session.query(
+        Client.id,
+        Client.ip_address,
+        Client.mac_address,
+        Client.connection_type,
+        MikroTikRouter.id,
+        MikroTikRouter.is_active,
+    ).outerjoin(MikroTikRouter, Client.router_id == MikroTikRouter.id)
     if tenant_id is not None:
-        query = query.filter_by(tenant_id=tenant_id)
+        query = query.filter(Client.tenant_id == tenant_id)
 
-    items = []
-    for client in query.all():
-        status = 'active'
-        if client.connection_type == 'pppoe':
-            status = 'active'
-        elif client.connection_type == 'dhcp':
-            status = 'idle'
-        elif client.connection_type == 'static':
-            status = 'active'
-        if client.router and not client.router.is_active:
-            status = 'offline'
-
-        items.append({
-            "id": str(client.id),
-            "ip": client.ip_address or '',
-            "mac": client.mac_address or '',
-            "status": status
-        })
-    return jsonify({"items": items, "count": len(items)}), 200
+    items = [
+        {
+            "id": str(client_id),
+            "ip": ip_address or '',
+            "mac": mac_address or '',
+            "status": (
+                'offline'
+                if router_id is not None and not router_active
+                else CONNECTION_STATUS_BY_TYPE.get(connection_type, 'active')
+            ),
+        }
+        for client_id, ip_address, mac_address, connection_type, router_id, router_active in query.all()
+    ]
+    return _conditional_json({"items": items, "count": len(items)})
 
 
 @main_bp.route('/notifications', methods=['GET'])
@@ -1535,7 +1988,7 @@ def notifications_feed():
         return jsonify({"error": "Acceso denegado para este tenant."}), 403
 
     if user.role in STAFF_ALLOWED_ROLES:
-        alerts = _build_network_alert_items(tenant_id)
+        alerts = _cached_network_alert_items(tenant_id)
         now = _iso_utc_now()
         feed = []
         for idx, alert in enumerate(alerts[:5], start=1):
@@ -1741,7 +2194,7 @@ def platform_bootstrap():
     valid_password, password_error = _validate_password_policy(password, tenant_id=None)
     if not valid_password:
         return jsonify({"error": password_error}), 400
-    if User.query.filter_by(email=email).first():
+    if _email_in_use(email):
         return jsonify({"error": "email ya existe."}), 409
 
     user = User(
@@ -1895,7 +2348,7 @@ def platform_create_tenant():
     admin_email = str(data.get('admin_email') or '').strip().lower()
     admin_name = str(data.get('admin_name') or 'Admin ISP').strip() or 'Admin ISP'
     if admin_email:
-        if User.query.filter_by(email=admin_email).first():
+        if _email_in_use(admin_email):
             db.session.rollback()
             return jsonify({"error": "admin_email ya existe"}), 409
         if int(tenant.max_admins or 0) < 1:
@@ -2042,7 +2495,7 @@ def platform_create_tenant_admin(tenant_id):
     name = str(data.get('name') or 'Admin ISP').strip() or 'Admin ISP'
     if not email:
         return jsonify({"error": "email es requerido"}), 400
-    if User.query.filter_by(email=email).first():
+    if _email_in_use(email):
         return jsonify({"error": "email ya existe"}), 409
 
     password = str(data.get('password') or '').strip() or secrets.token_urlsafe(12)
@@ -2367,8 +2820,7 @@ def update_profile():
         return jsonify({"error": "Acceso denegado para este tenant."}), 403
 
     # Verificar colision de correo
-    existing = User.query.filter(User.email == email, User.id != user.id).first()
-    if existing:
+    if _email_in_use(email, exclude_user_id=user.id):
         return jsonify({"error": "El correo ya esta en uso."}), 400
 
     user.name = name
@@ -2484,6 +2936,37 @@ def mfa_disable():
     return jsonify({"success": True}), 200
 
 
+SUBSCRIPTION_LIST_COLUMNS = (
+    Subscription.id,
+    Subscription.customer,
+    Subscription.email,
+    Subscription.plan,
+    Subscription.cycle_months,
+    Subscription.amount,
+    Subscription.status,
+    Subscription.currency,
+    Subscription.country,
+    Subscription.tax_percent,
+    Subscription.next_charge,
+    Subscription.method,
+    Subscription.tenant_id,
+    Subscription.client_id,
+    Subscription.created_at,
+    Subscription.updated_at,
+)
+
+
+def _subscription_row_payload(row) -> dict:
+    """Same shape as Subscription.to_dict() built from a column projection."""
+    payload = dict(row._mapping)
+    payload["amount"] = float(row.amount)
+    payload["tax_percent"] = float(row.tax_percent)
+    for field in ("next_charge", "created_at", "updated_at"):
+        value = payload[field]
+        payload[field] = value.isoformat() if value else None
+    return payload
+
+
 @main_bp.route('/subscriptions', methods=['GET'])
 @staff_required()
 def list_subscriptions():
@@ -2491,28 +2974,28 @@ def list_subscriptions():
     query = Subscription.query
     if tenant_id is not None:
         query = query.filter_by(tenant_id=tenant_id)
-    items = [s.to_dict() for s in query.order_by(Subscription.next_charge.asc()).all()]
+    rows = query.with_entities(*SUBSCRIPTION_LIST_COLUMNS).order_by(Subscription.next_charge.asc()).all()
+    items = [_subscription_row_payload(row) for row in rows]
     return jsonify({"items": items, "count": len(items)}), 200
 
 
+def _build_plans_list(tenant_id) -> list[dict]:
+    query = Plan.query
+    if tenant_id is not None:
+        query = query.filter_by(tenant_id=tenant_id)
+    query = query.with_entities(Plan.id, Plan.name, Plan.download_speed, Plan.upload_speed, Plan.price)
+    return [dict(row._mapping) for row in query.order_by(Plan.name.asc()).all()]
+
+
 @main_bp.route('/plans', methods=['GET'])
 @staff_required()
 def list_plans():
     tenant_id = current_tenant_id()
-    query = Plan.query
-    if tenant_id is not None:
-        query = query.filter_by(tenant_id=tenant_id)
-    plans = [
-        {
-            "id": p.id,
-            "name": p.name,
-            "download_speed": p.download_speed,
-            "upload_speed": p.upload_speed,
-            "price": p.price
-        }
-        for p in query.order_by(Plan.name.asc()).all()
-    ]
-    return jsonify({"items": plans, "count": len(plans)}), 200
+    # Plan writes drop this key only in the cache they run against; a per-process
+    # cache keeps the short TTL so other workers pick up new plans within a minute.
+    timeout = 300 if _cache_is_shared() else 60
+    plans = _cached_snapshot(_plans_list_key(tenant_id), lambda: _build_plans_list(tenant_id), timeout=timeout)
+    return _conditional_json({"items": plans, "count": len(plans)})
 
 
 @main_bp.route('/plans', methods=['POST'])
@@ -2534,6 +3017,7 @@ def create_plan():
     from app import db
     db.session.add(plan)
     db.session.commit()
+    cache.delete(_plans_list_key(tenant_id))
     return jsonify({"plan": plan.to_dict(), "success": True}), 201
 
 
@@ -2547,7 +3031,7 @@ def create_client():
         return jsonify({"error": f"Faltan campos: {', '.join(missing)}"}), 400
 
     tenant_id = current_tenant_id()
-    if User.query.filter_by(email=data['email']).first():
+    if _email_in_use(data['email']):
         return jsonify({"error": "El correo ya esta registrado."}), 400
 
     plan = _get_plan_for_request(data, tenant_id)
@@ -2587,19 +3071,25 @@ def create_client():
         user=user
     )
     from app import db
-    db.session.add(user)
-    db.session.add(client)
-    if plan and plan.id is None:
-        db.session.add(plan)
+    created_plan = bool(plan and plan.id is None)
+    db.session.add_all([user, client, plan] if created_plan else [user, client])
     db.session.commit()
+    cache.delete(_dashboard_overview_key(tenant_id))
+    if created_plan:
+        cache.delete(_plans_list_key(tenant_id))
 
+    # The client is already committed; a router failure is reported, not raised.
     provision_result = None
     if data.get('provision') and client.router_id and plan:
-        with MikroTikService(client.router_id) as mk:
-            if mk.api or mk.connect_to_router(client.router_id):
-                provision_result = mk.provision_client(client, plan, data.get('config') or {})
-            else:
-                provision_result = {"success": False, "error": "No se pudo conectar al router."}
+        try:
+            with MikroTikService(client.router_id) as mk:
+                if mk.api or mk.connect_to_router(client.router_id):
+                    provision_result = mk.provision_client(client, plan, data.get('config') or {})
+                else:
+                    provision_result = {"success": False, "error": "No se pudo conectar al router."}
+        except Exception as exc:
+            current_app.logger.error("Error aprovisionando cliente %s: %s", client.id, exc)
+            provision_result = {"success": False, "error": "No se pudo aprovisionar el cliente en el router."}
 
     payload = {"client": client.to_dict(), "user": user.to_dict(), "success": True, "password": password}
     if provision_result:
@@ -2629,10 +3119,9 @@ def create_subscription():
         client_id=int(data['client_id']) if data.get('client_id') else None,
         tenant_id=tenant_id,
     )
-    from app import db
-
     db.session.add(subscription)
     db.session.commit()
+    cache.delete(_dashboard_overview_key(tenant_id))
     return jsonify({"subscription": subscription.to_dict(), "success": True}), 201
 
 
@@ -2640,7 +3129,8 @@ def create_subscription():
 @admin_required()
 def update_subscription(subscription_id):
     data = request.get_json() or {}
-    sub = db.session.get(Subscription, subscription_id)
+    # The linked client rides along for the router sync below.
+    sub = db.session.get(Subscription, subscription_id, options=(joinedload(Subscription.client),))
     if not sub:
         return jsonify({"error": "Suscripcion no encontrada"}), 404
     tenant_id = current_tenant_id()
@@ -2657,13 +3147,12 @@ def update_subscription(subscription_id):
     if 'next_charge' in data:
         sub.next_charge = datetime.fromisoformat(data['next_charge']).date()
 
-    from app import db
-
+    client = sub.client
     db.session.add(sub)
     db.session.commit()
+    cache.delete(_dashboard_overview_key(tenant_id))
 
     # Sincronizar estado con router si hay cliente asociado
-    client = sub.client or (db.session.get(Client, sub.client_id) if sub.client_id else None)
     if client and client.router_id and sub.status != prev_status:
         with MikroTikService(client.router_id) as mk:
             if sub.status == 'active':
@@ -2677,7 +3166,7 @@ def update_subscription(subscription_id):
 @main_bp.route('/subscriptions/<int:subscription_id>/charge', methods=['POST'])
 @admin_required()
 def charge_subscription(subscription_id):
-    sub = db.session.get(Subscription, subscription_id)
+    sub = db.session.get(Subscription, subscription_id, options=(joinedload(Subscription.client),))
     if not sub:
         return jsonify({"error": "Suscripcion no encontrada"}), 404
     tenant_id = current_tenant_id()
@@ -2687,11 +3176,10 @@ def charge_subscription(subscription_id):
     # avanzar proxima fecha segun ciclo
     days = sub.cycle_months * 30
     sub.next_charge = sub.next_charge + timedelta(days=days)
-    from app import db
-
+    client = sub.client
     db.session.add(sub)
     db.session.commit()
-    client = sub.client or (db.session.get(Client, sub.client_id) if sub.client_id else None)
+    cache.delete(_dashboard_overview_key(tenant_id))
     if client and client.router_id:
         with MikroTikService(client.router_id) as mk:
             mk.activate_client(client)
@@ -2702,28 +3190,47 @@ def charge_subscription(subscription_id):
 @admin_required()
 def run_subscription_reminders():
     today = datetime.utcnow().date()
+    overdue_cutoff = today - timedelta(days=10)
     tenant_id = current_tenant_id()
     query = Subscription.query
     if tenant_id is not None:
         query = query.filter_by(tenant_id=tenant_id)
 
+    # Solo se cargan las filas que cambian; el resto queda en la base.
+    changing = (
+        query.options(joinedload(Subscription.client))
+        .filter(
+            or_(
+                (Subscription.status == 'active') & (Subscription.next_charge < today),
+                (Subscription.status == 'past_due') & (Subscription.next_charge <= overdue_cutoff),
+            )
+        )
+        .order_by(Subscription.id.asc())
+        .all()
+    )
     updated = []
-    for sub in query.all():
-        days_overdue = (today - sub.next_charge).days if sub.next_charge else 0
-        if sub.next_charge < today and sub.status == 'active':
-            sub.status = 'past_due'
-            updated.append(sub.to_dict())
+    by_router = defaultdict(list)
+    for sub in changing:
+        payload = sub.to_dict()
+        if sub.status == 'active':
+            updated.append({**payload, "status": 'past_due'})
         # autosuspender si lleva mas de 10 dias vencido
-        if days_overdue >= 10 and sub.status == 'past_due':
-            sub.status = 'suspended'
-            updated.append(sub.to_dict())
-            client = sub.client or (db.session.get(Client, sub.client_id) if sub.client_id else None)
-            if client and client.router_id:
-                with MikroTikService(client.router_id) as mk:
-                    mk.suspend_client(client, reason='billing')
-    if updated:
-        from app import db
+        if sub.next_charge <= overdue_cutoff:
+            updated.append({**payload, "status": 'suspended'})
+            if sub.client and sub.client.router_id:
+                by_router[sub.client.router_id].append(sub.client)
+
+    if changing:
+        query.filter(
+            Subscription.status.in_(('active', 'past_due')), Subscription.next_charge <= overdue_cutoff
+        ).update({Subscription.status: 'suspended'}, synchronize_session=False)
+        query.filter(Subscription.status == 'active', Subscription.next_charge < today).update(
+            {Subscription.status: 'past_due'}, synchronize_session=False
+        )
         db.session.commit()
+    for router_id, clients in by_router.items():
+        with MikroTikService(router_id) as mk:
+            mk.suspend_clients(clients)
     return jsonify({"updated": updated, "count": len(updated)}), 200
 
 
@@ -2737,17 +3244,14 @@ def enforce_subscription_status():
     if tenant_id is not None:
         query = query.filter_by(tenant_id=tenant_id)
 
-    suspended = 0
-    reactivated = 0
-    for sub in query.all():
-        days_overdue = (today - sub.next_charge).days if sub.next_charge else 0
-        if sub.status == 'past_due' and days_overdue >= 10:
-            sub.status = 'suspended'
-            suspended += 1
-        if sub.status in ('past_due', 'suspended') and days_overdue <= 0:
-            sub.status = 'active'
-            reactivated += 1
-    from app import db
+    suspended = query.filter(
+        Subscription.status == 'past_due', Subscription.next_charge <= today - timedelta(days=10)
+    ).update({Subscription.status: 'suspended'}, synchronize_session=False)
+    # Sin proxima fecha de cobro cuenta como al dia, igual que antes.
+    reactivated = query.filter(
+        Subscription.status.in_(('past_due', 'suspended')),
+        or_(Subscription.next_charge.is_(None), Subscription.next_charge >= today),
+    ).update({Subscription.status: 'active'}, synchronize_session=False)
     db.session.commit()
     _audit("subscriptions_auto_enforce", entity_type="subscription", metadata={"suspended": suspended, "reactivated": reactivated})
     return jsonify({"success": True, "suspended": suspended, "reactivated": reactivated}), 200
@@ -2757,7 +3261,7 @@ def enforce_subscription_status():
 @staff_required()
 def network_health():
     tenant_id = current_tenant_id()
-    return jsonify(_build_network_health_payload(tenant_id)), 200
+    return _conditional_json(_cached_network_health(tenant_id))
 
 
 @main_bp.route('/monitoring/metrics', methods=['GET'])
@@ -2798,9 +3302,9 @@ def monitoring_metrics():
 @staff_required()
 def network_alerts():
     tenant_id = current_tenant_id()
-    alerts = _build_network_alert_items(tenant_id)
+    alerts = _cached_network_alert_items(tenant_id)
     _audit("network_alerts", entity_type="network", metadata={"count": len(alerts)})
-    return jsonify({"alerts": alerts, "count": len(alerts)}), 200
+    return _conditional_json({"alerts": alerts, "count": len(alerts)})
 
 
 @main_bp.route('/network/noc-summary', methods=['GET'])
@@ -2838,7 +3342,13 @@ def client_portal_overview():
     current_user_id = _current_user_id()
     if current_user_id is None:
         return jsonify({"error": "Token de usuario invalido."}), 401
-    user = db.session.get(User, current_user_id)
+    # Client, plan and router come back with the user instead of three lazy loads.
+    client_path = joinedload(User.client)
+    user = db.session.get(
+        User,
+        current_user_id,
+        options=(client_path.joinedload(Client.plan), client_path.joinedload(Client.router)),
+    )
     if not user:
         return jsonify({"error": "Usuario no encontrado"}), 404
     client = user.client
@@ -2887,9 +3397,7 @@ def client_tickets_list():
     if current_user_id is None:
         return jsonify({"error": "Token de usuario invalido."}), 401
     tenant_id = current_tenant_id()
-    query = Ticket.query.filter_by(user_id=current_user_id)
-    if tenant_id is not None:
-        query = query.filter_by(tenant_id=tenant_id)
+    query = _user_scoped_query(Ticket, current_user_id, tenant_id)
     tickets = query.order_by(Ticket.created_at.desc()).all()
     return jsonify({"items": [t.to_dict() for t in tickets], "count": len(tickets)}), 200
 
@@ -2908,19 +3416,17 @@ def client_tickets_create():
     if not subject or not description:
         return jsonify({"error": "Asunto y descripción requeridos."}), 400
     tenant_id = current_tenant_id()
-    client = Client.query.filter_by(user_id=current_user_id).first()
+    client_id = db.session.query(Client.id).filter_by(user_id=current_user_id).limit(1).scalar()
     ticket = Ticket(
         tenant_id=tenant_id,
         user_id=current_user_id,
-        client_id=client.id if client else None,
+        client_id=client_id,
         subject=subject,
         description=description,
         priority=priority if priority in {'low', 'medium', 'high', 'urgent'} else 'medium',
         status='open',
         sla_due_at=datetime.utcnow() + timedelta(hours=24 if priority != 'urgent' else 4),
     )
-    from app import db
-
     db.session.add(ticket)
     db.session.commit()
     _notify_incident(f"Nuevo ticket #{ticket.id}: {subject}", severity="warning")
@@ -2935,10 +3441,7 @@ def client_diagnostics():
         return jsonify({"error": "Token de usuario invalido."}), 401
     tenant_id = current_tenant_id()
 
-    client_query = Client.query.filter_by(user_id=current_user_id)
-    if tenant_id is not None:
-        client_query = client_query.filter_by(tenant_id=tenant_id)
-    client = client_query.first_or_404("Cliente no encontrado.")
+    client = _user_scoped_query(Client, current_user_id, tenant_id).first_or_404("Cliente no encontrado.")
 
     ping_gateway_ms = None
     ping_internet_ms = None
@@ -3122,6 +3625,9 @@ def ticket_list_comments(ticket_id):
     return jsonify({"items": [c.to_dict() for c in comments], "count": len(comments)}), 200
 
 
+NOTIFICATION_PREFERENCE_DEFAULTS = MappingProxyType({"email": True, "whatsapp": False, "push": False})
+
+
 @main_bp.route('/client/notifications/preferences', methods=['GET', 'POST'])
 @jwt_required()
 def client_notification_preferences():
@@ -3131,16 +3637,15 @@ def client_notification_preferences():
     key = f"notif_pref_{current_user_id}"
     if request.method == 'POST':
         data = request.get_json() or {}
-        defaults = {"email": True, "whatsapp": False, "push": False}
         prefs = {}
-        for channel, default_value in defaults.items():
+        for channel, default_value in NOTIFICATION_PREFERENCE_DEFAULTS.items():
             parsed = _parse_bool(data.get(channel, default_value))
             if parsed is None:
                 return jsonify({"error": f"{channel} debe ser booleano"}), 400
             prefs[channel] = parsed
         cache.set(key, prefs, timeout=86400)
         return jsonify({"success": True, "preferences": prefs}), 200
-    prefs = cache.get(key) or {"email": True, "whatsapp": False, "push": False}
+    prefs = cache.get(key) or dict(NOTIFICATION_PREFERENCE_DEFAULTS)
     return jsonify({"preferences": prefs}), 200
 
 
@@ -3160,13 +3665,13 @@ def run_background_job():
 @limiter.limit("20/hour")
 @jwt_required()
 def payments_checkout():
-    data = request.get_json() or {}
     current_user_id = _current_user_id()
     if current_user_id is None:
         return jsonify({"error": "Token de usuario invalido."}), 401
     user = db.session.get(User, current_user_id)
     if not user:
         return jsonify({"error": "Usuario no autenticado."}), 401
+    data = request.get_json() or {}
 
     amount = float(data.get('amount') or 0)
     currency = (data.get('currency') or 'USD').upper()
@@ -3255,25 +3760,19 @@ def payments_checkout():
 
     return jsonify({"error": "Método de pago no soportado"}), 400
 
-@main_bp.route('/payments/webhook', methods=['POST'])
-def payments_webhook():
-    webhook_secret = (current_app.config.get('STRIPE_WEBHOOK_SECRET') or '').strip()
-    if not webhook_secret:
-        return jsonify({"success": False, "error": "Stripe webhook secret no configurado"}), 503
 
-    payload = request.get_data(cache=False, as_text=False) or b""
-    signature_header = request.headers.get('Stripe-Signature', '')
-    if not _verify_stripe_signature(payload, signature_header, webhook_secret):
-        return jsonify({"success": False, "error": "Firma de webhook invalida"}), 400
+def _apply_webhook_payment(ctx: dict) -> dict:
+    """Persist a verified Stripe payment event; safe to call from a worker.
 
-    try:
-        event = json.loads(payload.decode('utf-8'))
-    except Exception:
-        return jsonify({"success": False, "error": "Payload JSON invalido"}), 400
-    if not isinstance(event, dict):
-        return jsonify({"success": False, "error": "Evento de webhook invalido"}), 400
+    The event id is recorded in the same transaction as the payment, so a
+    replayed event is a no-op and a failed attempt leaves it retryable.
+    """
+    event_id = ctx.get("event_id")
+    if event_id:
+        if db.session.get(ProcessedWebhookEvent, event_id) is not None:
+            return {"duplicate": True}
+        db.session.add(ProcessedWebhookEvent(event_id=event_id, event_type=ctx.get("event_type")))
 
-    ctx = _extract_webhook_payment_context(event)
     status = ctx.get("normalized_status")
     invoice_id = ctx.get("invoice_id")
     sub_id = ctx.get("subscription_id")
@@ -3333,15 +3832,60 @@ def payments_webhook():
             )
             db.session.add(payment)
 
-    db.session.commit()
-    return jsonify(
-        {
-            "success": True,
-            "event_type": ctx.get("event_type"),
-            "invoice_found": bool(invoice),
-            "payment_record_id": payment.id if payment else None,
-        }
-    ), 200
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # A concurrent delivery of the same event committed first.
+        db.session.rollback()
+        if event_id and db.session.get(ProcessedWebhookEvent, event_id) is not None:
+            return {"duplicate": True}
+        raise
+    return {
+        "invoice_found": bool(invoice),
+        "payment_record_id": payment.id if payment else None,
+    }
+
+
+@main_bp.route('/payments/webhook', methods=['POST'])
+def payments_webhook():
+    webhook_secret = (current_app.config.get('STRIPE_WEBHOOK_SECRET') or '').strip()
+    if not webhook_secret:
+        return jsonify({"success": False, "error": "Stripe webhook secret no configurado"}), 503
+
+    payload = request.get_data(cache=False, as_text=False) or b""
+    signature_header = request.headers.get('Stripe-Signature', '')
+    if not _verify_stripe_signature(payload, signature_header, webhook_secret):
+        return jsonify({"success": False, "error": "Firma de webhook invalida"}), 400
+
+    try:
+        # Parse the raw bytes directly; Stripe events with charge objects are large.
+        event = current_app.json.loads(payload)
+    except Exception:
+        return jsonify({"success": False, "error": "Payload JSON invalido"}), 400
+    if not isinstance(event, dict):
+        return jsonify({"success": False, "error": "Evento de webhook invalido"}), 400
+
+    ctx = _extract_webhook_payment_context(event)
+    # Stripe redelivers on slow acks; skip events whose payment is already applied.
+    if ctx.get("event_id") and db.session.get(ProcessedWebhookEvent, ctx["event_id"]) is not None:
+        return jsonify({"success": True, "event_type": ctx.get("event_type"), "duplicate": True}), 200
+
+    mode = str(current_app.config.get('PAYMENT_WEBHOOK_DISPATCH') or 'sync').strip().lower()
+    if mode == 'celery':
+        from app.tasks import apply_webhook_payment
+
+        try:
+            apply_webhook_payment.apply_async(args=(ctx,), retry_policy={'max_retries': 1})
+            return jsonify({"success": True, "event_type": ctx.get("event_type"), "queued": True}), 200
+        except Exception:
+            current_app.logger.warning('Celery dispatch failed for webhook %s; applying inline', ctx.get("event_id"))
+
+    try:
+        result = _apply_webhook_payment(ctx)
+    except Exception:
+        db.session.rollback()
+        raise
+    return jsonify({"success": True, "event_type": ctx.get("event_type"), **result}), 200
 
 
 @main_bp.route('/billing/electronic/send', methods=['POST'])
@@ -3398,7 +3942,8 @@ def billing_electronic_status():
         return jsonify({"error": "Acceso denegado para este tenant."}), 403
 
     status = "accepted" if invoice.status == "paid" else ("rejected" if invoice.status == "cancelled" else "processing")
-    return jsonify(
+    # Polled until accepted: revalidate every time, but answer unchanged status with a 304.
+    return _conditional_json(
         {
             "invoice_id": invoice.id,
             "country": invoice.country or (invoice.subscription.country if invoice.subscription else None),
@@ -3406,34 +3951,50 @@ def billing_electronic_status():
             "message": "Factura electronica aceptada" if status == "accepted" else (
                 "Factura electronica en proceso" if status == "processing" else "Factura electronica rechazada"
             ),
-        }
-    ), 200
+        },
+        max_age=0,
+    )
+
+
+RUNBOOKS = (
+    {"id": "RB-001", "title": "Cliente sin navegacion", "steps": ["Ping gateway", "Reiniciar CPE", "Verificar colas", "Abrir ticket si persiste"]},
+    {"id": "RB-002", "title": "Alto uso de CPU en RouterOS", "steps": ["Export stats", "Revisar firewall rules", "Limitar conexiones", "Programar mantenimiento"]},
+)
+# The catalog never changes at runtime, so serialize it once at import.
+RUNBOOKS_BODY = json.dumps({"items": RUNBOOKS, "count": len(RUNBOOKS)}, separators=(",", ":")) + "\n"
+RUNBOOKS_ETAG = hashlib.sha1(RUNBOOKS_BODY.encode("utf-8")).hexdigest()
 
 
 @main_bp.route('/runbooks', methods=['GET'])
 @staff_required()
 def runbooks():
-    books = [
-        {"id": "RB-001", "title": "Cliente sin navegacion", "steps": ["Ping gateway", "Reiniciar CPE", "Verificar colas", "Abrir ticket si persiste"]},
-        {"id": "RB-002", "title": "Alto uso de CPU en RouterOS", "steps": ["Export stats", "Revisar firewall rules", "Limitar conexiones", "Programar mantenimiento"]},
-    ]
-    return jsonify({"items": books, "count": len(books)}), 200
+    response = Response(RUNBOOKS_BODY, mimetype='application/json')
+    response.set_etag(RUNBOOKS_ETAG)
+    # Staff-only, so browsers may keep it but shared caches must not.
+    response.cache_control.private = True
+    response.cache_control.max_age = 3600
+    return response.make_conditional(request)
+
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+PROMETHEUS_METRICS_TEMPLATE = (
+    "# HELP ispfast_network_health_score Health score\n"
+    "# TYPE ispfast_network_health_score gauge\n"
+    "ispfast_network_health_score {score}\n"
+    "# HELP ispfast_alerts_total Total alertas activas\n"
+    "# TYPE ispfast_alerts_total gauge\n"
+    "ispfast_alerts_total {alerts}\n"
+)
 
 
 @main_bp.route('/prometheus/metrics', methods=['GET'])
 def prometheus_metrics():
     tenant_id = current_tenant_id()
-    data = _build_network_health_payload(tenant_id)
-    alerts_count = len(_build_network_alert_items(tenant_id))
-    content = [
-        "# HELP ispfast_network_health_score Health score",
-        "# TYPE ispfast_network_health_score gauge",
-        f"ispfast_network_health_score {data.get('score', 0)}",
-        "# HELP ispfast_alerts_total Total alertas activas",
-        "# TYPE ispfast_alerts_total gauge",
-        f"ispfast_alerts_total {alerts_count}",
-    ]
-    return Response("\n".join(content) + "\n", mimetype="text/plain")
+    # Scrapes share the per-tenant snapshots behind /network/health and /network/alerts.
+    data = _cached_network_health(tenant_id)
+    alerts_count = len(_cached_network_alert_items(tenant_id))
+    body = PROMETHEUS_METRICS_TEMPLATE.format(score=data.get('score', 0), alerts=alerts_count)
+    return Response(body, content_type=PROMETHEUS_CONTENT_TYPE)
 
 
 @main_bp.route('/dashboard/stats', methods=['GET'])
@@ -3444,11 +4005,7 @@ def get_dashboard_stats():
         return jsonify({"error": "Token de usuario invalido."}), 401
     tenant_id = current_tenant_id()
 
-    query = Client.query.filter_by(user_id=current_user_id)
-    if tenant_id is not None:
-        query = query.filter_by(tenant_id=tenant_id)
-
-    client = query.first_or_404()
+    client = _user_scoped_query(Client, current_user_id, tenant_id).first_or_404()
     with MikroTikService(client.router_id) as mikrotik:
         stats = mikrotik.get_client_dashboard_stats(client)
         return jsonify(stats), 200
@@ -3457,29 +4014,88 @@ def get_dashboard_stats():
 @main_bp.route('/clients/map-data', methods=['GET'])
 @staff_required()
 def get_clients_for_map():
-    mikrotik = MikroTikService()
-    client_data = mikrotik.get_all_clients_with_location()
+    tenant_id = current_tenant_id()
+    # Plan names come from the same SELECT instead of one lazy load per client.
+    query = (
+        db.session.query(
+            Client.id,
+            Client.full_name,
+            Client.ip_address,
+            Client.mac_address,
+            Client.connection_type,
+            Client.tenant_id,
+            Client.router_id,
+            Client.latitude,
+            Client.longitude,
+            Plan.name.label('plan_name'),
+        )
+        .outerjoin(Plan, Client.plan_id == Plan.id)
+        .filter(Client.latitude.isnot(None), Client.longitude.isnot(None))
+    )
+    if tenant_id is not None:
+        query = query.filter(Client.tenant_id == tenant_id)
+    clients = query.all()
+
+    # Each router is asked for its live sessions from its own worker, so the
+    # RouterOS round trips overlap instead of adding up.
+    router_ids = sorted({c.router_id for c in clients if c.router_id})
+    active_by_router = {}
+    if router_ids:
+        app = current_app._get_current_object()
+        workers = min(MAP_STATUS_MAX_WORKERS, len(router_ids))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            addresses = executor.map(lambda router_id: _router_active_addresses(app, router_id), router_ids)
+            active_by_router = dict(zip(router_ids, addresses))
+
+    client_data = []
+    for client in clients:
+        online = client.ip_address in active_by_router.get(client.router_id, ())
+        client_data.append({
+            'id': client.id,
+            'name': client.full_name,
+            'ip_address': client.ip_address,
+            'mac_address': client.mac_address,
+            'connection_type': client.connection_type,
+            'plan_name': client.plan_name,
+            'tenant_id': client.tenant_id,
+            'status': 'active' if online else 'offline',
+            'lat': client.latitude,
+            'lng': client.longitude,
+        })
     return jsonify(client_data), 200
 
 
+def _router_active_addresses(app, router_id: int) -> set:
+    """Addresses with a bound lease or PPPoE session on one router, read from a worker thread."""
+    with app.app_context():
+        try:
+            with MikroTikService(router_id) as service:
+                return {conn['address'] for conn in service.get_active_connections() if conn.get('address')}
+        except Exception as exc:
+            app.logger.warning("No se pudo leer sesiones del router %s: %s", router_id, exc)
+            return set()
+
+
 @main_bp.route('/clients/<int:client_id>/reboot-cpe', methods=['POST'])
 @jwt_required()
 def reboot_client_cpe(client_id):
     current_user_id = _current_user_id()
     if current_user_id is None:
         return jsonify({"error": "Token de usuario invalido."}), 401
-    user = db.session.get(User, current_user_id)
-    if not user:
-        return jsonify({"error": "Usuario no autenticado."}), 401
-
     client = db.session.get(Client, client_id)
     if not client:
         return jsonify({"error": "Cliente no encontrado"}), 404
     if not tenant_access_allowed(client.tenant_id):
         return jsonify({"error": "Acceso denegado para este tenant."}), 403
 
-    if user.role != 'admin' and client.user_id != current_user_id:
-        return jsonify({"error": "No tienes permiso para reiniciar este equipo."}), 403
+    # Owners may always reboot their CPE; only other callers need the role,
+    # read from the database so revoked admins lose access immediately.
+    if client.user_id != current_user_id:
+        role = db.session.query(User.role).filter_by(id=current_user_id).scalar()
+        if role is None:
+            return jsonify({"error": "Usuario no autenticado."}), 401
+        if role != 'admin':
+            return jsonify({"error": "No tienes permiso para reiniciar este equipo."}), 403
 
     if not client.router_id:
         return jsonify({"error": "El cliente no tiene un router asociado."}), 400
@@ -3495,8 +4111,18 @@ def reboot_client_cpe(client_id):
 @admin_required()
 def get_client_history(client_id):
     with MikroTikService() as mikrotik:
-        history = mikrotik.get_client_event_history(client_id)
-        return jsonify(sorted(history, key=lambda x: x['timestamp'], reverse=True)), 200
+        # The service already returns the timeline newest first.
+        return jsonify(mikrotik.get_client_event_history(client_id)), 200
+
+
+BYTES_PER_GB = 1024 ** 3
+USAGE_RANGE_DAYS = MappingProxyType({'7d': 7, '30d': 30, '90d': 90})
+
+
+@lru_cache(maxsize=8)
+def _usage_day_labels(today: date, days: int) -> tuple[str, ...]:
+    """Chart labels only change with the date, so every caller that day shares them."""
+    return tuple((today - timedelta(days=i)).strftime('%b %d') for i in range(days - 1, -1, -1))
 
 
 @main_bp.route('/clients/usage-history', methods=['GET'])
@@ -3507,35 +4133,28 @@ def get_usage_history():
         return jsonify({"error": "Token de usuario invalido."}), 401
     tenant_id = current_tenant_id()
 
-    query = Client.query.filter_by(user_id=current_user_id)
-    if tenant_id is not None:
-        query = query.filter_by(tenant_id=tenant_id)
-    query.first_or_404("Cliente no encontrado.")
+    # Only the router id feeds the telemetry tags; skip hydrating the client.
+    query = _user_scoped_query(Client, current_user_id, tenant_id).with_entities(Client.router_id)
+    router_id = query.first_or_404("Cliente no encontrado.").router_id
 
-    range_str = request.args.get('range', '30d')
-    days = 30
-    if range_str == '7d':
-        days = 7
-    elif range_str == '90d':
-        days = 90
+    days = USAGE_RANGE_DAYS.get(request.args.get('range', '30d'), 30)
 
     today = datetime.utcnow().date()
-    labels = [(today - timedelta(days=i)).strftime('%b %d') for i in range(days - 1, -1, -1)]
+    labels = list(_usage_day_labels(today, days))
 
     data_points = [0.0] * days
     try:
-        client = query.first()
-        tags = {}
-        if client and client.router_id:
-            tags['router_id'] = str(client.router_id)
+        tags = {'router_id': str(router_id)} if router_id else None
         monitoring = MonitoringService()
-        series = monitoring.query_metrics('interface_traffic', time_range=f'-{days}d', tags=tags or None)
+        series = monitoring.query_metrics(
+            'interface_traffic', time_range=f'-{days}d', tags=tags, fields=['rx_bytes', 'tx_bytes']
+        )
         # Aggregate bytes to GB per day if available
         for point in series:
             ts = point.get('_time') or point.get('time')
             rx = float(point.get('rx_bytes', 0) or 0)
             tx = float(point.get('tx_bytes', 0) or 0)
-            total_gb = (rx + tx) / (1024**3)
+            total_gb = (rx + tx) / BYTES_PER_GB
             parsed_ts = _parse_iso_datetime(ts)
             if parsed_ts:
                 day_idx = (today - parsed_ts.date()).days
@@ -3769,7 +4388,7 @@ def admin_create_client():
     if create_portal_access:
         if not email:
             return jsonify({"error": "email es requerido cuando create_portal_access=true"}), 400
-        if User.query.filter_by(email=email).first():
+        if _email_in_use(email):
             return jsonify({"error": "email ya existe"}), 409
         generated_password = requested_password or secrets.token_urlsafe(12)
         user = User(
@@ -3894,7 +4513,7 @@ def _normalize_bulk_client_row(raw_row, tenant_id, seen_emails: set[str]) -> tup
             return None, "email es requerido cuando create_portal_access=true"
         if email in seen_emails:
             return None, "email duplicado en el lote"
-        if User.query.filter_by(email=email).first():
+        if _email_in_use(email):
             return None, "email ya existe"
         seen_emails.add(email)
 
@@ -4038,8 +4657,7 @@ def _normalize_bulk_update_row(raw_row, tenant_id, seen_target_emails: set[str])
         portal_mode = 'create'
     elif existing_user is not None:
         if portal_email and portal_email != existing_user.email:
-            duplicate = User.query.filter(User.email == portal_email, User.id != existing_user.id).first()
-            if duplicate:
+            if _email_in_use(portal_email, exclude_user_id=existing_user.id):
                 return None, "portal_email ya existe"
             if portal_email in seen_target_emails:
                 return None, "portal_email duplicado en el lote"
@@ -4347,7 +4965,7 @@ def admin_manage_client_portal_access(client_id):
     if user is None:
         if not email:
             return jsonify({"error": "email es requerido para crear acceso al portal"}), 400
-        if User.query.filter_by(email=email).first():
+        if _email_in_use(email):
             return jsonify({"error": "email ya existe"}), 409
         user = User(
             name=client.full_name or 'Cliente',
@@ -4360,8 +4978,7 @@ def admin_manage_client_portal_access(client_id):
         created = True
     else:
         if email and email != user.email:
-            duplicate = User.query.filter(User.email == email, User.id != user.id).first()
-            if duplicate:
+            if _email_in_use(email, exclude_user_id=user.id):
                 return jsonify({"error": "email ya existe"}), 409
             user.email = email
         user.name = user.name or client.full_name or 'Cliente'
@@ -4743,14 +5360,12 @@ def admin_staff_list():
     query = User.query.filter(User.role != 'client')
     if tenant_id is not None:
         query = query.filter_by(tenant_id=tenant_id)
-    users = query.order_by(User.name.asc()).all()
-
-    metadata_map = _load_staff_meta(tenant_id)
+    users = query.options(selectinload(User.staff_meta)).order_by(User.name.asc()).all()
     assigned_counts = _ticket_assignee_counts(tenant_id)
 
     items = []
     for user in users:
-        meta = metadata_map.get(str(user.id), {})
+        meta = user.staff_meta.to_dict() if user.staff_meta else {}
         items.append(_serialize_staff_member(user, meta, assigned_counts))
 
     role_filter = (request.args.get('role') or '').strip().lower()
@@ -4785,8 +5400,8 @@ def admin_staff_create():
     if not name or not email:
         return jsonify({"error": "name y email son requeridos"}), 400
     if role not in STAFF_ALLOWED_ROLES:
-        return jsonify({"error": f"role invalido. permitidos: {', '.join(sorted(STAFF_ALLOWED_ROLES))}"}), 400
-    if User.query.filter_by(email=email).first():
+        return jsonify({"error": STAFF_ROLE_ERROR}), 400
+    if _email_in_use(email):
         return jsonify({"error": "Ya existe un usuario con ese email"}), 409
 
     supplied_password = (data.get('password') or '').strip()
@@ -4809,23 +5424,13 @@ def admin_staff_create():
     if user.mfa_enabled:
         user.mfa_secret = pyotp.random_base32()
     user.set_password(temporary_password)
+    user.staff_meta = _staff_meta_from_dict(data, tenant_id)
+    user.staff_meta.last_seen_at = datetime.utcnow().replace(microsecond=0)
 
     db.session.add(user)
     db.session.commit()
 
-    status = str(data.get('status') or 'active').strip().lower()
-    shift = str(data.get('shift') or 'day').strip().lower()
-    metadata_map = _load_staff_meta(tenant_id)
-    metadata_map[str(user.id)] = {
-        "zone": str(data.get('zone') or 'general').strip() or 'general',
-        "phone": str(data.get('phone') or '').strip(),
-        "status": status if status in STAFF_ALLOWED_STATUS else "active",
-        "shift": shift if shift in STAFF_ALLOWED_SHIFTS else "day",
-        "last_seen_at": _iso_utc_now(),
-    }
-    _save_staff_meta(tenant_id, metadata_map)
-
-    item = _serialize_staff_member(user, metadata_map[str(user.id)], {})
+    item = _serialize_staff_member(user, user.staff_meta.to_dict(), {})
     response = {"staff": item, "success": True}
     if not supplied_password:
         response["temporary_password"] = temporary_password
@@ -4853,7 +5458,7 @@ def admin_staff_update(staff_id):
     if 'role' in data:
         role = str(data.get('role') or '').strip().lower()
         if role not in STAFF_ALLOWED_ROLES:
-            return jsonify({"error": f"role invalido. permitidos: {', '.join(sorted(STAFF_ALLOWED_ROLES))}"}), 400
+            return jsonify({"error": STAFF_ROLE_ERROR}), 400
         user.role = role
 
     if 'mfa_enabled' in data:
@@ -4873,32 +5478,29 @@ def admin_staff_update(staff_id):
             return jsonify({"error": password_error}), 400
         user.set_password(proposed_password)
 
-    metadata_map = _load_staff_meta(tenant_id)
-    current_meta = metadata_map.get(str(user.id), {})
+    meta = user.staff_meta or StaffMeta(tenant_id=user.tenant_id)
     if 'zone' in data:
-        current_meta['zone'] = str(data.get('zone') or '').strip() or 'general'
+        meta.zone = str(data.get('zone') or '').strip() or 'general'
     if 'phone' in data:
-        current_meta['phone'] = str(data.get('phone') or '').strip()
+        meta.phone = str(data.get('phone') or '').strip()
     if 'status' in data:
-        status = str(data.get('status') or '').strip().lower()
+        status = _norm_choice(data.get('status'))
         if status not in STAFF_ALLOWED_STATUS:
-            return jsonify({"error": f"status invalido. permitidos: {', '.join(sorted(STAFF_ALLOWED_STATUS))}"}), 400
-        current_meta['status'] = status
+            return jsonify({"error": STAFF_STATUS_ERROR}), 400
+        meta.status = status
     if 'shift' in data:
-        shift = str(data.get('shift') or '').strip().lower()
+        shift = _norm_choice(data.get('shift'))
         if shift not in STAFF_ALLOWED_SHIFTS:
-            return jsonify({"error": f"shift invalido. permitidos: {', '.join(sorted(STAFF_ALLOWED_SHIFTS))}"}), 400
-        current_meta['shift'] = shift
+            return jsonify({"error": STAFF_SHIFT_ERROR}), 400
+        meta.shift = shift
     if data.get('touch_last_seen'):
-        current_meta['last_seen_at'] = _iso_utc_now()
-
-    metadata_map[str(user.id)] = current_meta
-    _save_staff_meta(tenant_id, metadata_map)
+        meta.last_seen_at = datetime.utcnow().replace(microsecond=0)
+    user.staff_meta = meta
 
     db.session.add(user)
     db.session.commit()
 
-    item = _serialize_staff_member(user, current_meta, _ticket_assignee_counts(tenant_id))
+    item = _serialize_staff_member(user, meta.to_dict(), _ticket_assignee_counts(tenant_id))
     _audit("staff_update", entity_type="staff", entity_id=user.id, metadata={"changes": list(data.keys())})
     return jsonify({"staff": item, "success": True}), 200
 
@@ -4908,15 +5510,15 @@ def admin_staff_update(staff_id):
 def admin_inventory_summary():
     tenant_id = current_tenant_id()
 
-    clients_query = Client.query.options(joinedload(Client.plan))
+    clients_query = Client.query
     routers_query = MikroTikRouter.query
     if tenant_id is not None:
         clients_query = clients_query.filter_by(tenant_id=tenant_id)
         routers_query = routers_query.filter_by(tenant_id=tenant_id)
 
-    clients = clients_query.all()
     routers_count = routers_query.count()
-    clients_count = len(clients)
+    clients_count = clients_query.count()
+    now_iso = _iso_utc_now()
 
     defaults = [
         {
@@ -4971,7 +5573,7 @@ def admin_inventory_summary():
             **raw,
             "available": available,
             "status": level,
-            "updated_at": _iso_utc_now(),
+            "updated_at": now_iso,
         }
         items.append(item)
         if level != "ok":
@@ -4983,14 +5585,17 @@ def admin_inventory_summary():
                 "reorder_point": raw["reorder_point"],
             })
 
-    plan_distribution_map: dict[str, int] = {}
-    for client in clients:
-        plan_name = client.plan.name if client.plan else "Sin plan"
-        plan_distribution_map[plan_name] = plan_distribution_map.get(plan_name, 0) + 1
-    plan_distribution = [
-        {"plan": plan, "clients": count}
-        for plan, count in sorted(plan_distribution_map.items(), key=lambda item: item[1], reverse=True)[:8]
-    ]
+    plan_name = func.coalesce(Plan.name, "Sin plan")
+    plan_clients = func.count(Client.id)
+    plan_rows = (
+        clients_query.outerjoin(Plan, Client.plan_id == Plan.id)
+        .with_entities(plan_name, plan_clients)
+        .group_by(plan_name)
+        .order_by(plan_clients.desc(), plan_name)
+        .limit(8)
+        .all()
+    )
+    plan_distribution = [{"plan": plan, "clients": count} for plan, count in plan_rows]
 
     summary = {
         "clients_total": clients_count,
@@ -4998,7 +5603,7 @@ def admin_inventory_summary():
         "stock_items": len(items),
         "low_stock_items": len(alerts),
         "available_units": round(sum(float(item["available"]) for item in items), 1),
-        "updated_at": _iso_utc_now(),
+        "updated_at": now_iso,
     }
     _audit("inventory_summary", entity_type="inventory", metadata=summary)
     return jsonify({
@@ -5098,7 +5703,7 @@ def admin_permissions_list():
         .all()
     )
     overrides = [row.to_dict() for row in rows]
-    roles = sorted(set(STAFF_ALLOWED_ROLES | {"admin", "client", PLATFORM_ADMIN_ROLE}))
+    roles = sorted(PERMISSION_ALLOWED_ROLES)
     role_matrix = []
     for role in roles:
         resolved = _role_permissions_with_overrides(role, tenant_id)
@@ -5134,9 +5739,8 @@ def admin_permissions_upsert():
     permission = str(data.get('permission') or '').strip()
     allowed = _parse_bool(data.get('allowed'))
 
-    allowed_roles = set(STAFF_ALLOWED_ROLES | {"admin", "client", PLATFORM_ADMIN_ROLE})
-    if role not in allowed_roles:
-        return jsonify({"error": f"role invalido. permitidos: {', '.join(sorted(allowed_roles))}"}), 400
+    if role not in PERMISSION_ALLOWED_ROLES:
+        return jsonify({"error": PERMISSION_ROLE_ERROR}), 400
     if not permission:
         return jsonify({"error": "permission es requerido"}), 400
     if allowed is None:
@@ -5177,12 +5781,12 @@ def admin_notifications_send():
     if not title or not message:
         return jsonify({"error": "title y message son requeridos"}), 400
 
-    channel = (data.get('channel') or 'push').strip().lower()
-    if channel not in {'push', 'email', 'whatsapp', 'system'}:
+    channel = _norm_choice(data.get('channel'), 'push')
+    if channel not in NOTIFICATION_ALLOWED_CHANNELS:
         return jsonify({"error": "channel invalido: push | email | whatsapp | system"}), 400
 
-    audience = (data.get('audience') or 'all').strip().lower()
-    if audience not in {'all', 'active', 'overdue', 'suspended'}:
+    audience = _norm_choice(data.get('audience'), 'all')
+    if audience not in NOTIFICATION_ALLOWED_AUDIENCE:
         return jsonify({"error": "audience invalido: all | active | overdue | suspended"}), 400
 
     router_id_raw = data.get('router_id')
@@ -5194,18 +5798,24 @@ def admin_notifications_send():
             return jsonify({"error": "router_id debe ser numerico"}), 400
     plan_name = (data.get('plan') or '').strip().lower()
 
-    clients_query = Client.query.options(joinedload(Client.plan), joinedload(Client.subscriptions))
+    # selectinload batches subscription fetches without duplicating client rows
+    # per subscription; raiseload guards against accidental lazy loads in the loop.
+    clients_query = Client.query.options(
+        selectinload(Client.subscriptions),
+        raiseload('*'),
+    )
     if tenant_id is not None:
         clients_query = clients_query.filter_by(tenant_id=tenant_id)
     if router_id:
         clients_query = clients_query.filter_by(router_id=router_id)
+    if plan_name:
+        clients_query = clients_query.join(Plan, Client.plan_id == Plan.id).filter(
+            func.lower(func.trim(Plan.name)) == plan_name
+        )
 
-    selected_clients = []
-    for client in clients_query.all():
-        if plan_name:
-            client_plan = (client.plan.name if client.plan else "").strip().lower()
-            if client_plan != plan_name:
-                continue
+    # Stream clients in chunks; only the matched count is kept, not the rows.
+    target_count = 0
+    for client in clients_query.yield_per(500):
         status = "active"
         if client.subscriptions:
             status = (client.subscriptions[0].status or "active").strip().lower()
@@ -5215,7 +5825,7 @@ def admin_notifications_send():
             continue
         if audience == 'suspended' and status != 'suspended':
             continue
-        selected_clients.append(client)
+        target_count += 1
 
     actor = _current_actor_snapshot()
     entry = {
@@ -5226,18 +5836,17 @@ def admin_notifications_send():
         "audience": audience,
         "plan": plan_name or None,
         "router_id": router_id,
-        "target_count": len(selected_clients),
+        "target_count": target_count,
         "status": "sent",
         "created_by": actor.get("id"),
         "created_by_name": actor.get("name"),
         "sent_at": _iso_utc_now(),
     }
 
-    history = _load_notification_history(tenant_id)
-    history.insert(0, entry)
-    _save_notification_history(tenant_id, history)
-    _notify_incident(f"Notificacion masiva ({channel}) enviada: {title} -> {len(selected_clients)} destinos", severity="info")
-    _audit("notification_send", entity_type="notification", entity_id=entry["id"], metadata=entry)
+    with _bulk_side_effects():
+        _push_notification_history(tenant_id, entry)
+        _audit("notification_send", entity_type="notification", entity_id=entry["id"], metadata=entry)
+    _notify_incident(f"Notificacion masiva ({channel}) enviada: {title} -> {target_count} destinos", severity="info")
 
     return jsonify({"success": True, "notification": entry}), 201
 
@@ -5251,49 +5860,95 @@ def admin_finance_summary():
     now = datetime.utcnow()
     today = now.date()
 
-    subscriptions_query = Subscription.query
-    invoices_query = Invoice.query.join(Subscription, Invoice.subscription_id == Subscription.id)
-    payments_query = PaymentRecord.query.join(Invoice, PaymentRecord.invoice_id == Invoice.id).join(
-        Subscription, Invoice.subscription_id == Subscription.id
+    # Reporting only needs a handful of columns; project them as plain rows
+    # instead of materializing full ORM objects (and their lazy relationships).
+    subscriptions_query = db.session.query(
+        Subscription.id,
+        Subscription.customer,
+        Subscription.amount,
+        Subscription.status,
+        Subscription.next_charge,
+    )
+    invoices_query = (
+        db.session.query(
+            Invoice.id,
+            Invoice.status,
+            Invoice.due_date,
+            Invoice.total_amount,
+            Invoice.created_at,
+            Invoice.currency,
+            Invoice.amount,
+            Subscription.customer.label('customer'),
+        )
+        .select_from(Invoice)
+        .join(Subscription, Invoice.subscription_id == Subscription.id)
     )
 
     if tenant_id is not None:
         subscriptions_query = subscriptions_query.filter(Subscription.tenant_id == tenant_id)
         invoices_query = invoices_query.filter(Subscription.tenant_id == tenant_id)
-        payments_query = payments_query.filter(Subscription.tenant_id == tenant_id)
 
     subscriptions = subscriptions_query.all()
-    invoices = invoices_query.order_by(Invoice.created_at.desc()).all()
-    payments = payments_query.order_by(PaymentRecord.created_at.desc()).all()
+    # Only the latest 20 invoices are rendered; totals come from aggregates below.
+    invoices_total = invoices_query.with_entities(func.count(Invoice.id)).scalar() or 0
+    invoices = invoices_query.order_by(Invoice.created_at.desc()).limit(20).all()
 
     active_status = {"active", "trial"}
     mrr = round(sum(float(sub.amount or 0) for sub in subscriptions if sub.status in active_status), 2)
     arr = round(mrr * 12, 2)
 
-    pending_invoices = [invoice for invoice in invoices if invoice.status == 'pending']
-    overdue_invoices = [invoice for invoice in pending_invoices if invoice.due_date and invoice.due_date < today]
-    pending_balance = round(sum(float(invoice.total_amount or 0) for invoice in pending_invoices), 2)
-    overdue_balance = round(sum(float(invoice.total_amount or 0) for invoice in overdue_invoices), 2)
+    cursor = date(today.year, today.month, 1)
+    months: list[date] = []
+    for _ in range(6):
+        months.append(cursor)
+        prev_year = cursor.year
+        prev_month = cursor.month - 1
+        if prev_month == 0:
+            prev_month = 12
+            prev_year -= 1
+        cursor = date(prev_year, prev_month, 1)
+    months.reverse()
+
+    cashflow_map: dict[str, dict] = {}
+    for month_point in months:
+        key = month_point.strftime('%Y-%m')
+        cashflow_map[key] = {"label": month_point.strftime('%b %Y'), "paid": 0.0, "pending": 0.0}
 
-    paid_this_month = round(
-        sum(
-            float(payment.amount or 0)
-            for payment in payments
-            if payment.status == 'paid'
-            and payment.created_at
-            and payment.created_at.year == now.year
-            and payment.created_at.month == now.month
-        ),
-        2,
+    # Cashflow totals come back as one row per (year, month) from the database
+    # rather than walking every payment and pending invoice in Python.
+    paid_year = extract('year', PaymentRecord.created_at)
+    paid_month = extract('month', PaymentRecord.created_at)
+    paid_by_month_query = (
+        db.session.query(paid_year, paid_month, func.sum(PaymentRecord.amount))
+        .select_from(PaymentRecord)
+        .join(Invoice, PaymentRecord.invoice_id == Invoice.id)
+        .join(Subscription, Invoice.subscription_id == Subscription.id)
+        .filter(PaymentRecord.status == 'paid', PaymentRecord.created_at >= datetime.combine(months[0], datetime.min.time()))
     )
-    pending_this_month = round(
-        sum(
-            float(invoice.total_amount or 0)
-            for invoice in pending_invoices
-            if invoice.due_date and invoice.due_date.year == now.year and invoice.due_date.month == now.month
-        ),
-        2,
+    due_year = extract('year', Invoice.due_date)
+    due_month = extract('month', Invoice.due_date)
+    pending_by_month_query = (
+        db.session.query(due_year, due_month, func.sum(Invoice.total_amount))
+        .select_from(Invoice)
+        .join(Subscription, Invoice.subscription_id == Subscription.id)
+        .filter(Invoice.status == 'pending', Invoice.due_date >= months[0])
     )
+    if tenant_id is not None:
+        paid_by_month_query = paid_by_month_query.filter(Subscription.tenant_id == tenant_id)
+        pending_by_month_query = pending_by_month_query.filter(Subscription.tenant_id == tenant_id)
+
+    for field, rows in (
+        ("paid", paid_by_month_query.group_by(paid_year, paid_month).all()),
+        ("pending", pending_by_month_query.group_by(due_year, due_month).all()),
+    ):
+        for year_value, month_value, month_total in rows:
+            key = f"{int(year_value):04d}-{int(month_value):02d}"
+            if key in cashflow_map:
+                cashflow_map[key][field] += float(month_total or 0)
+
+    current_month = cashflow_map[months[-1].strftime('%Y-%m')]
+    paid_this_month = round(current_month["paid"], 2)
+    pending_this_month = round(current_month["pending"], 2)
     denominator = paid_this_month + pending_this_month
     collection_rate = round((paid_this_month / denominator) * 100, 2) if denominator > 0 else 100.0
 
@@ -5307,77 +5962,43 @@ def admin_finance_summary():
             "status": sub.status,
             "next_charge": sub.next_charge.isoformat() if sub.next_charge else None,
         }
-        for sub in sorted(overdue_clients + suspended_clients, key=lambda row: float(row.amount or 0), reverse=True)[:10]
+        for sub in heapq.nlargest(10, overdue_clients + suspended_clients, key=lambda row: float(row.amount or 0))
     ]
 
-    aging = {
-        "current": 0.0,
-        "days_1_30": 0.0,
-        "days_31_60": 0.0,
-        "days_61_90": 0.0,
-        "days_90_plus": 0.0,
-    }
-    for invoice in pending_invoices:
-        amount = float(invoice.total_amount or 0)
-        if not invoice.due_date:
-            aging["current"] += amount
-            continue
-        days_overdue = (today - invoice.due_date).days
-        if days_overdue <= 0:
-            aging["current"] += amount
-        elif days_overdue <= 30:
-            aging["days_1_30"] += amount
-        elif days_overdue <= 60:
-            aging["days_31_60"] += amount
-        elif days_overdue <= 90:
-            aging["days_61_90"] += amount
-        else:
-            aging["days_90_plus"] += amount
+    aging = dict.fromkeys(FINANCE_AGING_BUCKETS, 0.0)
+    # Bucketize in SQL by comparing due_date against precomputed cutoffs so the
+    # aging report is a single grouped scan instead of a loop over ORM rows.
+    aging_bucket = case(
+        (Invoice.due_date.is_(None), "current"),
+        (Invoice.due_date >= today, "current"),
+        *((Invoice.due_date >= today - max_age, bucket) for bucket, max_age in FINANCE_AGING_CUTOFFS),
+        else_="days_90_plus",
+    ).label("bucket")
+    aging_query = (
+        db.session.query(aging_bucket, func.sum(Invoice.total_amount))
+        .join(Subscription, Invoice.subscription_id == Subscription.id)
+        .filter(Invoice.status == 'pending')
+    )
+    if tenant_id is not None:
+        aging_query = aging_query.filter(Subscription.tenant_id == tenant_id)
+    for bucket, bucket_total in aging_query.group_by(aging_bucket).all():
+        aging[bucket] = aging.get(bucket, 0.0) + float(bucket_total or 0)
+    # Every pending invoice lands in exactly one bucket and only "current" is not overdue.
+    pending_balance = round(sum(aging.values()), 2)
+    overdue_balance = round(sum(value for bucket, value in aging.items() if bucket != "current"), 2)
     aging = {bucket: round(value, 2) for bucket, value in aging.items()}
 
-    cursor = date(today.year, today.month, 1)
-    months: list[date] = []
-    for _ in range(6):
-        months.append(cursor)
-        prev_year = cursor.year
-        prev_month = cursor.month - 1
-        if prev_month == 0:
-            prev_month = 12
-            prev_year -= 1
-        cursor = date(prev_year, prev_month, 1)
-    months.reverse()
-
-    cashflow_map: dict[str, dict] = {}
-    for month_point in months:
-        key = month_point.strftime('%Y-%m')
-        cashflow_map[key] = {"label": month_point.strftime('%b %Y'), "paid": 0.0, "pending": 0.0}
-
-    for payment in payments:
-        if payment.status != 'paid' or not payment.created_at:
-            continue
-        key = payment.created_at.strftime('%Y-%m')
-        if key in cashflow_map:
-            cashflow_map[key]["paid"] += float(payment.amount or 0)
-
-    for invoice in pending_invoices:
-        if not invoice.due_date:
-            continue
-        key = invoice.due_date.strftime('%Y-%m')
-        if key in cashflow_map:
-            cashflow_map[key]["pending"] += float(invoice.total_amount or 0)
-
     cashflow = [
         {"label": row["label"], "paid": round(row["paid"], 2), "pending": round(row["pending"], 2)}
         for row in cashflow_map.values()
     ]
 
     recent_invoices = []
-    for invoice in invoices[:20]:
-        subscription = invoice.subscription
+    for invoice in invoices:
         recent_invoices.append(
             {
                 "id": invoice.id,
-                "customer": subscription.customer if subscription else None,
+                "customer": invoice.customer,
                 "status": invoice.status,
                 "currency": invoice.currency,
                 "amount": float(invoice.amount or 0),
@@ -5396,7 +6017,7 @@ def admin_finance_summary():
         "pending_this_month": pending_this_month,
         "collection_rate": collection_rate,
         "subscriptions_total": len(subscriptions),
-        "invoices_total": len(invoices),
+        "invoices_total": invoices_total,
         "overdue_clients": len(overdue_clients),
         "suspended_clients": len(suspended_clients),
         "updated_at": _iso_utc_now(),
@@ -5428,12 +6049,8 @@ def admin_billing_promises_list():
         query = query.filter(BillingPromise.subscription_id == subscription_id)
 
     items = [row.to_dict() for row in query.order_by(BillingPromise.created_at.desc()).limit(300).all()]
-    summary = {
-        "pending": sum(1 for row in items if row.get("status") == "pending"),
-        "kept": sum(1 for row in items if row.get("status") == "kept"),
-        "broken": sum(1 for row in items if row.get("status") == "broken"),
-        "cancelled": sum(1 for row in items if row.get("status") == "cancelled"),
-    }
+    statuses = [row.get("status") for row in items]
+    summary = {status: countOf(statuses, status) for status in ("pending", "kept", "broken", "cancelled")}
     return jsonify({"items": items, "count": len(items), "summary": summary}), 200
 
 
@@ -5628,6 +6245,7 @@ def admin_network_maintenance_create():
     db.session.add(row)
     db.session.commit()
     payload = row.to_dict()
+    cache.delete(_network_alerts_key(tenant_id))
     _audit("maintenance_window_create", entity_type="maintenance_window", entity_id=row.id, metadata=payload)
     return jsonify({"success": True, "item": payload}), 201
 
@@ -5674,6 +6292,7 @@ def admin_network_maintenance_update(window_id):
     db.session.add(row)
     db.session.commit()
     payload = row.to_dict()
+    cache.delete(_network_alerts_key(tenant_id))
     _audit("maintenance_window_update", entity_type="maintenance_window", entity_id=row.id, metadata={"changes": list(data.keys())})
     return jsonify({"success": True, "item": payload}), 200
 
@@ -5792,7 +6411,7 @@ def _hotspot_voucher_model_from_entry(entry: dict, tenant_id) -> AdminHotspotVou
 
 
 def _default_installations(tenant_id) -> list[dict]:
-    clients_query = Client.query.options(joinedload(Client.plan), joinedload(Client.router))
+    clients_query = Client.query.options(selectinload(Client.plan), selectinload(Client.router))
     if tenant_id is not None:
         clients_query = clients_query.filter_by(tenant_id=tenant_id)
     clients = clients_query.order_by(Client.id.asc()).limit(12).all()
@@ -5806,6 +6425,7 @@ def _default_installations(tenant_id) -> list[dict]:
 
     statuses = ["pending", "scheduled", "in_progress", "completed"]
     now = datetime.utcnow()
+    now_iso = now.replace(microsecond=0).isoformat() + "Z"
     system_actor = {"id": None, "name": "system", "email": None}
     items: list[dict] = []
     for index, client in enumerate(clients, start=1):
@@ -5831,7 +6451,7 @@ def _default_installations(tenant_id) -> list[dict]:
             "notes": "Instalacion programada automaticamente",
             "checklist": checklist,
         }
-        _apply_operational_entry_create_metadata(entry, actor=system_actor)
+        _apply_operational_entry_create_metadata(entry, actor=system_actor, now=now_iso)
         items.append(entry)
     return items
 
@@ -5841,29 +6461,31 @@ def _default_installations(tenant_id) -> list[dict]:
 def admin_installations_list():
     tenant_id = current_tenant_id()
     key = _installations_key(tenant_id)
-    rows = _tenant_scoped_query(AdminInstallation, tenant_id).order_by(AdminInstallation.created_at.desc()).all()
-    if not rows:
-        cached_items = _load_cached_list(key)
+    query = _tenant_scoped_query(AdminInstallation, tenant_id)
+    if query.with_entities(AdminInstallation.id).first() is None:
+        cached_items = _load_cached_entries(key)
         seed_items = cached_items or _default_installations(tenant_id)
         for entry in seed_items:
             db.session.add(_installation_model_from_entry(entry, tenant_id))
         db.session.commit()
-        rows = _tenant_scoped_query(AdminInstallation, tenant_id).order_by(AdminInstallation.created_at.desc()).all()
-    items = [row.to_dict() for row in rows]
 
     status_filter = (request.args.get('status') or '').strip().lower()
     technician_filter = (request.args.get('technician') or '').strip().lower()
     if status_filter:
-        items = [item for item in items if str(item.get("status", "")).lower() == status_filter]
+        query = query.filter(AdminInstallation.status == status_filter)
     if technician_filter:
-        items = [
-            item for item in items if technician_filter in str(item.get("technician", "")).lower()
-        ]
+        query = query.filter(
+            func.lower(AdminInstallation.technician).contains(technician_filter, autoescape=True)
+        )
 
-    summary = {status: 0 for status in INSTALLATION_ALLOWED_STATUS}
-    for item in items:
-        state = str(item.get("status") or "pending")
-        summary[state] = summary.get(state, 0) + 1
+    rows = query.order_by(AdminInstallation.created_at.desc()).all()
+    items = [row.to_dict() for row in rows]
+
+    summary = dict.fromkeys(INSTALLATION_ALLOWED_STATUS, 0)
+    if rows:
+        # The filtered rows are already loaded, so count them instead of a second GROUP BY.
+        for state, total in Counter(row.status or "pending" for row in rows).items():
+            summary[state] = summary.get(state, 0) + total
     return jsonify({"items": items, "count": len(items), "summary": summary}), 200
 
 
@@ -5888,9 +6510,9 @@ def admin_installations_create():
     if not client_name:
         return jsonify({"error": "client_name o client_id es requerido"}), 400
 
-    status = (data.get('status') or 'scheduled').strip().lower()
+    status = _norm_choice(data.get('status'), 'scheduled')
     if status not in INSTALLATION_ALLOWED_STATUS:
-        return jsonify({"error": f"status invalido. permitidos: {', '.join(sorted(INSTALLATION_ALLOWED_STATUS))}"}), 400
+        return jsonify({"error": INSTALLATION_STATUS_ERROR}), 400
 
     raw_scheduled = (data.get('scheduled_for') or '').strip()
     if raw_scheduled:
@@ -5925,8 +6547,9 @@ def admin_installations_create():
     db.session.add(record)
     db.session.commit()
     payload = record.to_dict()
-    _save_cached_list(_installations_key(tenant_id), [payload], max_items=400)
-    _audit("installation_create", entity_type="installation", entity_id=record.id, metadata=payload)
+    with _bulk_side_effects():
+        _push_cached_entry(_installations_key(tenant_id), payload, max_items=400)
+        _audit("installation_create", entity_type="installation", entity_id=record.id, metadata=payload)
     return jsonify({"success": True, "installation": payload}), 201
 
 
@@ -5943,9 +6566,9 @@ def admin_installations_update(installation_id):
     _ensure_operational_entry_metadata(entry)
     data = request.get_json() or {}
     if 'status' in data:
-        status = str(data.get('status') or '').strip().lower()
+        status = _norm_choice(data.get('status'))
         if status not in INSTALLATION_ALLOWED_STATUS:
-            return jsonify({"error": f"status invalido. permitidos: {', '.join(sorted(INSTALLATION_ALLOWED_STATUS))}"}), 400
+            return jsonify({"error": INSTALLATION_STATUS_ERROR}), 400
         entry['status'] = status
     if 'priority' in data:
         entry['priority'] = str(data.get('priority') or 'normal').strip().lower() or 'normal'
@@ -5972,11 +6595,12 @@ def admin_installations_update(installation_id):
             checklist[str(key_name)] = parsed
         entry['checklist'] = checklist
 
+    now_iso = _iso_utc_now()
     if entry.get('status') == 'completed':
-        entry['completed_at'] = entry.get('completed_at') or _iso_utc_now()
+        entry['completed_at'] = entry.get('completed_at') or now_iso
         entry['completed_by'] = entry.get('completed_by') if entry.get('completed_by') is not None else actor.get("id")
         entry['completed_by_name'] = entry.get('completed_by_name') or str(actor.get("name") or _actor_default_name(actor.get("id")))
-    _apply_operational_entry_update_metadata(entry, actor=actor)
+    _apply_operational_entry_update_metadata(entry, actor=actor, now=now_iso)
     record.client_id = _parse_int(entry.get('client_id'))
     record.client_name = entry.get('client_name')
     record.plan = entry.get('plan')
@@ -6001,7 +6625,7 @@ def admin_installations_update(installation_id):
     record.updated_at = _parse_iso_datetime(entry.get('updated_at')) or datetime.utcnow()
     db.session.add(record)
     db.session.commit()
-    _save_cached_list(_installations_key(tenant_id), [record.to_dict()], max_items=400)
+    _update_cached_entry(_installations_key(tenant_id), record.to_dict(), max_items=400)
     _audit("installation_update", entity_type="installation", entity_id=installation_id, metadata={"changes": list(data.keys())})
     return jsonify({"success": True, "installation": record.to_dict()}), 200
 
@@ -6036,7 +6660,7 @@ def _default_screen_alerts() -> list[dict]:
         },
     ]
     for entry in items:
-        _apply_operational_entry_create_metadata(entry, actor=system_actor)
+        _apply_operational_entry_create_metadata(entry, actor=system_actor, now=now)
     return items
 
 
@@ -6047,7 +6671,7 @@ def admin_screen_alerts_list():
     key = _screen_alerts_key(tenant_id)
     rows = _tenant_scoped_query(AdminScreenAlert, tenant_id).order_by(AdminScreenAlert.created_at.desc()).all()
     if not rows:
-        cached_items = _load_cached_list(key)
+        cached_items = _load_cached_entries(key)
         seed_items = cached_items or _default_screen_alerts()
         for entry in seed_items:
             db.session.add(_screen_alert_model_from_entry(entry, tenant_id))
@@ -6078,18 +6702,19 @@ def admin_screen_alerts_create():
     if not title or not message:
         return jsonify({"error": "title y message son requeridos"}), 400
 
-    severity = (data.get('severity') or 'info').strip().lower()
+    severity = _norm_choice(data.get('severity'), 'info')
     if severity not in SCREEN_ALERT_ALLOWED_SEVERITY:
-        return jsonify({"error": f"severity invalido. permitidos: {', '.join(sorted(SCREEN_ALERT_ALLOWED_SEVERITY))}"}), 400
+        return jsonify({"error": SCREEN_ALERT_SEVERITY_ERROR}), 400
 
-    audience = (data.get('audience') or 'all').strip().lower()
+    audience = _norm_choice(data.get('audience'), 'all')
     if audience not in SCREEN_ALERT_ALLOWED_AUDIENCE:
-        return jsonify({"error": f"audience invalido. permitidos: {', '.join(sorted(SCREEN_ALERT_ALLOWED_AUDIENCE))}"}), 400
+        return jsonify({"error": SCREEN_ALERT_AUDIENCE_ERROR}), 400
 
-    status = (data.get('status') or 'draft').strip().lower()
+    status = _norm_choice(data.get('status'), 'draft')
     if status not in SCREEN_ALERT_ALLOWED_STATUS:
-        return jsonify({"error": f"status invalido. permitidos: {', '.join(sorted(SCREEN_ALERT_ALLOWED_STATUS))}"}), 400
+        return jsonify({"error": SCREEN_ALERT_STATUS_ERROR}), 400
 
+    now_iso = _iso_utc_now()
     entry = {
         "id": secrets.token_hex(8),
         "title": title,
@@ -6097,18 +6722,19 @@ def admin_screen_alerts_create():
         "severity": severity,
         "audience": audience,
         "status": status,
-        "starts_at": (data.get('starts_at') or _iso_utc_now()),
+        "starts_at": (data.get('starts_at') or now_iso),
         "ends_at": data.get('ends_at'),
         "impressions": 0,
         "acknowledged": 0,
     }
-    _apply_operational_entry_create_metadata(entry, actor=actor)
+    _apply_operational_entry_create_metadata(entry, actor=actor, now=now_iso)
     record = _screen_alert_model_from_entry(entry, tenant_id)
     db.session.add(record)
     db.session.commit()
     payload = record.to_dict()
-    _save_cached_list(_screen_alerts_key(tenant_id), [payload], max_items=400)
-    _audit("screen_alert_create", entity_type="screen_alert", entity_id=record.id, metadata=payload)
+    with _bulk_side_effects():
+        _push_cached_entry(_screen_alerts_key(tenant_id), payload, max_items=400)
+        _audit("screen_alert_create", entity_type="screen_alert", entity_id=record.id, metadata=payload)
     return jsonify({"success": True, "alert": payload}), 201
 
 
@@ -6135,19 +6761,19 @@ def admin_screen_alerts_update(alert_id):
             return jsonify({"error": "message no puede estar vacio"}), 400
         entry['message'] = message
     if 'severity' in data:
-        severity = str(data.get('severity') or '').strip().lower()
+        severity = _norm_choice(data.get('severity'))
         if severity not in SCREEN_ALERT_ALLOWED_SEVERITY:
-            return jsonify({"error": f"severity invalido. permitidos: {', '.join(sorted(SCREEN_ALERT_ALLOWED_SEVERITY))}"}), 400
+            return jsonify({"error": SCREEN_ALERT_SEVERITY_ERROR}), 400
         entry['severity'] = severity
     if 'audience' in data:
-        audience = str(data.get('audience') or '').strip().lower()
+        audience = _norm_choice(data.get('audience'))
         if audience not in SCREEN_ALERT_ALLOWED_AUDIENCE:
-            return jsonify({"error": f"audience invalido. permitidos: {', '.join(sorted(SCREEN_ALERT_ALLOWED_AUDIENCE))}"}), 400
+            return jsonify({"error": SCREEN_ALERT_AUDIENCE_ERROR}), 400
         entry['audience'] = audience
     if 'status' in data:
-        status = str(data.get('status') or '').strip().lower()
+        status = _norm_choice(data.get('status'))
         if status not in SCREEN_ALERT_ALLOWED_STATUS:
-            return jsonify({"error": f"status invalido. permitidos: {', '.join(sorted(SCREEN_ALERT_ALLOWED_STATUS))}"}), 400
+            return jsonify({"error": SCREEN_ALERT_STATUS_ERROR}), 400
         entry['status'] = status
     if 'starts_at' in data:
         entry['starts_at'] = data.get('starts_at')
@@ -6178,7 +6804,7 @@ def admin_screen_alerts_update(alert_id):
     record.updated_at = _parse_iso_datetime(entry.get('updated_at')) or datetime.utcnow()
     db.session.add(record)
     db.session.commit()
-    _save_cached_list(_screen_alerts_key(tenant_id), [record.to_dict()], max_items=400)
+    _update_cached_entry(_screen_alerts_key(tenant_id), record.to_dict(), max_items=400)
     _audit("screen_alert_update", entity_type="screen_alert", entity_id=alert_id, metadata={"changes": list(data.keys())})
     return jsonify({"success": True, "alert": record.to_dict()}), 200
 
@@ -6236,33 +6862,73 @@ def _default_extra_services(tenant_id) -> list[dict]:
     return items
 
 
+def _summarize_extra_services(items: list[dict]) -> dict:
+    active_services = 0
+    subscribers_total = 0
+    mrr_estimated = 0.0
+    # Single pass; each field is coerced once per item.
+    for item in items:
+        subscribers = int(item.get("subscribers") or 0)
+        subscribers_total += subscribers
+        mrr_estimated += float(item.get("monthly_price") or 0) * subscribers
+        if item.get("status") == "active":
+            active_services += 1
+    return {
+        "services_total": len(items),
+        "active_services": active_services,
+        "subscribers_total": subscribers_total,
+        "mrr_estimated": round(mrr_estimated, 2),
+    }
+
+
+def _summarize_hotspot_vouchers(query) -> dict:
+    """Status counts and sold/used revenue for a voucher query, grouped in SQL."""
+    rows = (
+        query.with_entities(
+            AdminHotspotVoucher.status,
+            func.count(AdminHotspotVoucher.id),
+            func.coalesce(func.sum(AdminHotspotVoucher.price), 0),
+        )
+        .group_by(AdminHotspotVoucher.status)
+        .all()
+    )
+    summary = dict.fromkeys(HOTSPOT_VOUCHER_ALLOWED_STATUS, 0)
+    revenue_estimated = 0.0
+    for status, count, price_total in rows:
+        state = status or "generated"
+        summary[state] = summary.get(state, 0) + int(count or 0)
+        if state in HOTSPOT_VOUCHER_REVENUE_STATUS:
+            revenue_estimated += float(price_total or 0)
+    return {"summary": summary, "revenue_estimated": round(revenue_estimated, 2)}
+
+
+def _extra_service_rows(tenant_id, status: str = '') -> list[AdminExtraService]:
+    """Load the tenant catalog, seeding it from the cache or defaults on first use."""
+    base = _tenant_scoped_query(AdminExtraService, tenant_id)
+    query = base.filter(AdminExtraService.status == status) if status else base
+    rows = query.order_by(AdminExtraService.created_at.desc()).all()
+    if rows or (status and db.session.query(base.exists()).scalar()):
+        return rows
+    cached_items = _load_cached_list(_extra_services_key(tenant_id))
+    seed_items = cached_items or _default_extra_services(tenant_id)
+    for entry in seed_items:
+        db.session.add(_extra_service_model_from_entry(entry, tenant_id))
+    db.session.commit()
+    return query.order_by(AdminExtraService.created_at.desc()).all()
+
+
+def prewarm_catalog_caches(tenant_id) -> None:
+    """Seed the extra-services catalog ahead of the first GET."""
+    _extra_service_rows(tenant_id)
+
+
 @main_bp.route('/admin/extra-services', methods=['GET'])
 @permission_required('catalog.read')
 def admin_extra_services_list():
     tenant_id = current_tenant_id()
-    key = _extra_services_key(tenant_id)
-    rows = _tenant_scoped_query(AdminExtraService, tenant_id).order_by(AdminExtraService.created_at.desc()).all()
-    if not rows:
-        cached_items = _load_cached_list(key)
-        seed_items = cached_items or _default_extra_services(tenant_id)
-        for entry in seed_items:
-            db.session.add(_extra_service_model_from_entry(entry, tenant_id))
-        db.session.commit()
-        rows = _tenant_scoped_query(AdminExtraService, tenant_id).order_by(AdminExtraService.created_at.desc()).all()
-    items = [row.to_dict() for row in rows]
-
     status_filter = (request.args.get('status') or '').strip().lower()
-    if status_filter:
-        items = [item for item in items if str(item.get("status") or "").lower() == status_filter]
-
-    summary = {
-        "services_total": len(items),
-        "active_services": sum(1 for item in items if item.get("status") == "active"),
-        "subscribers_total": sum(int(item.get("subscribers") or 0) for item in items),
-        "mrr_estimated": round(
-            sum(float(item.get("monthly_price") or 0) * int(item.get("subscribers") or 0) for item in items), 2
-        ),
-    }
+    items = [row.to_dict() for row in _extra_service_rows(tenant_id, status=status_filter)]
+    summary = _summarize_extra_services(items)
     return jsonify({"items": items, "count": len(items), "summary": summary}), 200
 
 
@@ -6278,7 +6944,7 @@ def admin_extra_services_create():
 
     status = (data.get('status') or 'active').strip().lower()
     if status not in EXTRA_SERVICE_ALLOWED_STATUS:
-        return jsonify({"error": f"status invalido. permitidos: {', '.join(sorted(EXTRA_SERVICE_ALLOWED_STATUS))}"}), 400
+        return jsonify({"error": EXTRA_SERVICE_STATUS_ERROR}), 400
 
     entry = {
         "id": secrets.token_hex(8),
@@ -6330,7 +6996,7 @@ def admin_extra_services_update(service_id):
     if 'status' in data:
         status = str(data.get('status') or '').strip().lower()
         if status not in EXTRA_SERVICE_ALLOWED_STATUS:
-            return jsonify({"error": f"status invalido. permitidos: {', '.join(sorted(EXTRA_SERVICE_ALLOWED_STATUS))}"}), 400
+            return jsonify({"error": EXTRA_SERVICE_STATUS_ERROR}), 400
         entry['status'] = status
 
     _apply_operational_entry_update_metadata(entry, actor=actor)
@@ -6361,33 +7027,29 @@ def admin_extra_services_update(service_id):
 def admin_hotspot_vouchers_list():
     tenant_id = current_tenant_id()
     key = _hotspot_vouchers_key(tenant_id)
-    rows = _tenant_scoped_query(AdminHotspotVoucher, tenant_id).order_by(AdminHotspotVoucher.created_at.desc()).all()
-    if not rows:
+    status_filter = (request.args.get('status') or '').strip().lower()
+    base = _tenant_scoped_query(AdminHotspotVoucher, tenant_id)
+    # Statuses are stored lowercase, so the filter runs in SQL.
+    query = base.filter(AdminHotspotVoucher.status == status_filter) if status_filter else base
+    total = query.count()
+    if not total and not (status_filter and db.session.query(base.exists()).scalar()):
         cached_items = _load_cached_list(key)
         if cached_items:
             for entry in cached_items:
                 db.session.add(_hotspot_voucher_model_from_entry(entry, tenant_id))
             db.session.commit()
-            rows = _tenant_scoped_query(AdminHotspotVoucher, tenant_id).order_by(AdminHotspotVoucher.created_at.desc()).all()
+            total = query.count()
+    # Only the displayed page is loaded; count and totals come from SQL aggregates.
+    rows = query.order_by(AdminHotspotVoucher.created_at.desc()).limit(300).all() if total else []
     items = [row.to_dict() for row in rows]
 
-    status_filter = (request.args.get('status') or '').strip().lower()
-    if status_filter:
-        items = [item for item in items if str(item.get("status") or "").lower() == status_filter]
-
-    summary = {status: 0 for status in HOTSPOT_VOUCHER_ALLOWED_STATUS}
-    revenue_estimated = 0.0
-    for item in items:
-        state = str(item.get("status") or "generated")
-        summary[state] = summary.get(state, 0) + 1
-        if state in {"sold", "used"}:
-            revenue_estimated += float(item.get("price") or 0)
+    totals = _summarize_hotspot_vouchers(query)
     return jsonify(
         {
-            "items": items[:300],
-            "count": len(items),
-            "summary": summary,
-            "revenue_estimated": round(revenue_estimated, 2),
+            "items": items,
+            "count": total,
+            "summary": totals["summary"],
+            "revenue_estimated": totals["revenue_estimated"],
         }
     ), 200
 
@@ -6413,13 +7075,18 @@ def admin_hotspot_vouchers_create():
     now = datetime.utcnow().replace(microsecond=0)
 
     key = _hotspot_vouchers_key(tenant_id)
-    items = []
-    created = []
-    for _ in range(quantity):
-        code_prefix = ''.join(ch for ch in profile.upper() if ch.isalnum())[:3] or 'VCH'
-        code = f"{code_prefix}-{secrets.token_hex(3).upper()}"
+    expires_at = (now + timedelta(days=expires_days)).isoformat() + "Z"
+    created_at = _iso_utc_now()
+    # 8 random bytes for the id and 3 for the code suffix, drawn in one call.
+    token_hex = secrets.token_bytes(quantity * 11).hex()
+    # The slug separator class is exactly the non-alphanumerics, so one C-level sub drops them.
+    code_prefix = _SLUG_SEPARATOR_RE.sub('', profile.upper())[:3] or 'VCH'
+    created = [None] * quantity
+    for index in range(quantity):
+        chunk = token_hex[index * 22:(index + 1) * 22]
+        code = f"{code_prefix}-{chunk[16:].upper()}"
         entry = {
-            "id": secrets.token_hex(8),
+            "id": chunk[:16],
             "code": code,
             "profile": profile,
             "duration_minutes": duration_minutes,
@@ -6427,15 +7094,13 @@ def admin_hotspot_vouchers_create():
             "price": price,
             "status": "generated",
             "assigned_to": None,
-            "expires_at": (now + timedelta(days=expires_days)).isoformat() + "Z",
+            "expires_at": expires_at,
             "used_at": None,
         }
-        _apply_operational_entry_create_metadata(entry, actor=actor)
+        _apply_operational_entry_create_metadata(entry, actor=actor, now=created_at)
         record = _hotspot_voucher_model_from_entry(entry, tenant_id)
         db.session.add(record)
-        payload = record.to_dict()
-        items.append(payload)
-        created.append(payload)
+        created[index] = record.to_dict()
 
     db.session.commit()
     _save_cached_list(key, created, max_items=1000)
@@ -6462,7 +7127,7 @@ def admin_hotspot_vouchers_update(voucher_id):
     if 'status' in data:
         status = str(data.get('status') or '').strip().lower()
         if status not in HOTSPOT_VOUCHER_ALLOWED_STATUS:
-            return jsonify({"error": f"status invalido. permitidos: {', '.join(sorted(HOTSPOT_VOUCHER_ALLOWED_STATUS))}"}), 400
+            return jsonify({"error": HOTSPOT_VOUCHER_STATUS_ERROR}), 400
         entry['status'] = status
         if status == 'used':
             entry['used_at'] = entry.get('used_at') or _iso_utc_now()
@@ -6496,13 +7161,23 @@ def admin_hotspot_vouchers_update(voucher_id):
     return jsonify({"success": True, "voucher": record.to_dict()}), 200
 
 
-def _default_system_settings() -> dict:
-    return {
+def _default_system_settings() -> Mapping:
+    return _system_settings_defaults(
+        bool(current_app.config.get('WONDERPUSH_ACCESS_TOKEN')),
+        bool(current_app.config.get('MAIL_SERVER')),
+        bool(current_app.config.get('ALLOW_SELF_SIGNUP', False)),
+    )
+
+
+@lru_cache(maxsize=4)
+def _system_settings_defaults(push_enabled: bool, email_enabled: bool, allow_self_signup: bool) -> Mapping:
+    """Built once per config combination; read-only because every caller shares it."""
+    return MappingProxyType({
         "portal_maintenance_mode": False,
         "auto_suspend_overdue": True,
-        "notifications_push_enabled": bool(current_app.config.get('WONDERPUSH_ACCESS_TOKEN')),
-        "notifications_email_enabled": bool(current_app.config.get('MAIL_SERVER')),
-        "allow_self_signup": bool(current_app.config.get('ALLOW_SELF_SIGNUP', False)),
+        "notifications_push_enabled": push_enabled,
+        "notifications_email_enabled": email_enabled,
+        "allow_self_signup": allow_self_signup,
         "default_ticket_priority": "medium",
         "backup_retention_days": 14,
         "metrics_poll_interval_sec": 60,
@@ -6514,42 +7189,37 @@ def _default_system_settings() -> dict:
         "slo_router_availability_target": 99,
         "slo_ticket_sla_target": 95,
         "slo_provision_success_target": 98,
-    }
+    })
 
 
 def _recalculate_invoice_balances(tenant_id) -> dict:
-    invoices_q = Invoice.query.options(
-        joinedload(Invoice.payments),
-        joinedload(Invoice.subscription),
+    # The expected status is derived per row in SQL and only rows that differ are
+    # rewritten, in a single UPDATE ... SET status = CASE ... statement.
+    paid_total = func.coalesce(
+        select(func.sum(PaymentRecord.amount))
+        .where(PaymentRecord.invoice_id == Invoice.id, func.lower(PaymentRecord.status) == 'paid')
+        .scalar_subquery(),
+        0,
     )
+    expected_status = case((paid_total >= func.coalesce(Invoice.total_amount, 0), 'paid'), else_='pending')
+    scope = [func.lower(Invoice.status) != 'cancelled']
     if tenant_id is not None:
-        invoices_q = invoices_q.join(Subscription, Invoice.subscription_id == Subscription.id).filter(
-            Subscription.tenant_id == tenant_id
-        )
-
-    scanned = 0
-    updated = 0
-    for invoice in invoices_q.all():
-        if str(invoice.status or '').lower() == 'cancelled':
-            continue
-
-        paid_total = 0.0
-        for payment in invoice.payments:
-            if str(payment.status or '').lower() == 'paid':
-                paid_total += float(payment.amount or 0)
-
-        expected_status = 'paid' if paid_total >= float(invoice.total_amount or 0) else 'pending'
-        if invoice.status != expected_status:
-            invoice.status = expected_status
-            updated += 1
-        scanned += 1
-
+        scope.append(Invoice.subscription_id.in_(select(Subscription.id).where(Subscription.tenant_id == tenant_id)))
+
+    scanned = db.session.query(func.count(Invoice.id)).filter(*scope).scalar() or 0
+    result = db.session.execute(
+        update(Invoice)
+        .where(*scope, Invoice.status != expected_status)
+        .values(status=expected_status)
+        .execution_options(synchronize_session=False)
+    )
     db.session.commit()
-    return {"scanned": scanned, "updated": updated, "timestamp": _iso_utc_now()}
+    return {"scanned": scanned, "updated": result.rowcount, "timestamp": _iso_utc_now()}
 
 
 def _cleanup_leases_for_tenant(tenant_id) -> dict:
     today = date.today()
+    resolved_at = datetime.utcnow()
     subscriptions_q = Subscription.query
     if tenant_id is not None:
         subscriptions_q = subscriptions_q.filter_by(tenant_id=tenant_id)
@@ -6564,7 +7234,11 @@ def _cleanup_leases_for_tenant(tenant_id) -> dict:
     overdue_invoices_total = 0
     changes = []
 
-    for sub in subscriptions_q.all():
+    # Router commands are collected per router and sent in one session each.
+    by_router = defaultdict(lambda: {"suspend": [], "activate": []})
+    scanned_subs = []
+
+    for sub in subscriptions_q.options(joinedload(Subscription.client)).all():
         scanned += 1
         original_status = sub.status
 
@@ -6601,28 +7275,19 @@ def _cleanup_leases_for_tenant(tenant_id) -> dict:
         )
         for promise in expired_promises:
             promise.status = 'broken'
-            promise.resolved_at = datetime.utcnow()
+            promise.resolved_at = resolved_at
             db.session.add(promise)
             promises_marked_broken += 1
 
-        client = sub.client or (db.session.get(Client, sub.client_id) if sub.client_id else None)
+        client = sub.client
         if sub.status in ('past_due', 'suspended') and not is_overdue:
             sub.status = 'active'
         if sub.status in ('past_due', 'suspended') and is_overdue and valid_promise is not None:
             skipped_by_promise += 1
         elif sub.status in ('past_due', 'suspended') and is_overdue and client and client.router_id:
-            try:
-                with MikroTikService(client.router_id) as service:
-                    service.suspend_client(client)
-                sub.status = 'suspended'
-            except Exception:
-                failed += 1
+            by_router[client.router_id]["suspend"].append((sub, client))
         elif sub.status == 'active' and client and client.router_id:
-            try:
-                with MikroTikService(client.router_id) as service:
-                    service.activate_client(client)
-            except Exception:
-                failed += 1
+            by_router[client.router_id]["activate"].append((sub, client))
 
         if sub.status == 'active' and original_status in ('past_due', 'suspended'):
             reactivated += 1
@@ -6632,10 +7297,27 @@ def _cleanup_leases_for_tenant(tenant_id) -> dict:
             ).all()
             for promise in kept_promises:
                 promise.status = 'kept'
-                promise.resolved_at = datetime.utcnow()
+                promise.resolved_at = resolved_at
                 db.session.add(promise)
                 promises_marked_kept += 1
 
+        scanned_subs.append((sub, original_status))
+
+    for router_id, ops in by_router.items():
+        try:
+            with MikroTikService(router_id) as service:
+                suspended = service.suspend_clients([client for _, client in ops["suspend"]])
+                for sub, client in ops["suspend"]:
+                    if suspended.get(client.id):
+                        sub.status = 'suspended'
+                    else:
+                        failed += 1
+                activated = service.activate_clients([client for _, client in ops["activate"]])
+                failed += sum(1 for _, client in ops["activate"] if not activated.get(client.id))
+        except Exception:
+            failed += len(ops["suspend"]) + len(ops["activate"])
+
+    for sub, original_status in scanned_subs:
         if sub.status != original_status:
             updated += 1
             changes.append({"subscription_id": sub.id, "from": original_status, "to": sub.status})
@@ -6657,6 +7339,16 @@ def _cleanup_leases_for_tenant(tenant_id) -> dict:
     }
 
 
+def _rotate_router_password(app, router_id: int, username: str, new_password: str) -> dict:
+    """Rotate one router's API password from a worker thread."""
+    with app.app_context():
+        try:
+            with MikroTikService(router_id) as service:
+                return service.rotate_api_password(username=username, new_password=new_password)
+        except Exception as exc:
+            return {"success": False, "error": str(exc)}
+
+
 def _rotate_mikrotik_passwords(tenant_id) -> tuple[str, dict]:
     routers_q = MikroTikRouter.query.filter_by(is_active=True)
     if tenant_id is not None:
@@ -6673,71 +7365,70 @@ def _rotate_mikrotik_passwords(tenant_id) -> tuple[str, dict]:
         }
 
     dry_run = _password_rotation_dry_run_enabled()
-    results = []
+    results: list[dict | None] = [None] * len(routers)
     rotated = 0
     failed = 0
     length = _password_rotation_length()
     default_username = str(current_app.config.get('MIKROTIK_DEFAULT_USERNAME') or '').strip()
+    planned = []
 
-    for router in routers:
+    for position, router in enumerate(routers):
         username = str(router.username or default_username).strip()
         if not username:
             failed += 1
-            results.append(
-                {
-                    "router_id": router.id,
-                    "router_name": router.name,
-                    "status": "failed",
-                    "error": "username no configurado",
-                }
-            )
+            results[position] = {
+                "router_id": router.id,
+                "router_name": router.name,
+                "status": "failed",
+                "error": "username no configurado",
+            }
             continue
 
         new_password = _generate_router_password(length)
         if dry_run:
             rotated += 1
-            results.append(
-                {
-                    "router_id": router.id,
-                    "router_name": router.name,
-                    "username": username,
-                    "status": "dry_run",
-                    "preview": _mask_secret(new_password),
-                }
-            )
+            results[position] = {
+                "router_id": router.id,
+                "router_name": router.name,
+                "username": username,
+                "status": "dry_run",
+                "preview": _mask_secret(new_password),
+            }
             continue
+        planned.append((position, router, username, new_password))
+
+    if planned:
+        # Each rotation is a network round trip; run them side by side.
+        app = current_app._get_current_object()
+        with ThreadPoolExecutor(max_workers=min(PASSWORD_ROTATION_MAX_WORKERS, len(planned))) as executor:
+            outcomes = list(
+                executor.map(
+                    lambda item: _rotate_router_password(app, item[1].id, item[2], item[3]),
+                    planned,
+                )
+            )
 
-        try:
-            with MikroTikService(router.id) as service:
-                outcome = service.rotate_api_password(username=username, new_password=new_password)
-        except Exception as exc:
-            outcome = {"success": False, "error": str(exc)}
-
-        if outcome.get("success"):
-            router.password = new_password
-            db.session.add(router)
-            db.session.commit()
-            rotated += 1
-            results.append(
-                {
+        for (position, router, username, new_password), outcome in zip(planned, outcomes):
+            if outcome.get("success"):
+                router.password = new_password
+                rotated += 1
+                results[position] = {
                     "router_id": router.id,
                     "router_name": router.name,
                     "username": username,
                     "status": "rotated",
                 }
-            )
-        else:
-            db.session.rollback()
-            failed += 1
-            results.append(
-                {
+            else:
+                failed += 1
+                results[position] = {
                     "router_id": router.id,
                     "router_name": router.name,
                     "username": username,
                     "status": "failed",
                     "error": str(outcome.get("error") or "unknown_error"),
                 }
-            )
+        if rotated:
+            db.session.commit()
 
     summary = {
         "total": len(routers),
@@ -6941,10 +7632,7 @@ def _run_system_job_request(job: str, tenant_id, requested_by) -> tuple[dict, in
     db.session.add(job_row)
     db.session.commit()
 
-    key = _system_jobs_key(tenant_id)
-    jobs = _load_cached_list(key)
-    jobs.insert(0, entry)
-    _save_cached_list(key, jobs, max_items=200)
+    _prepend_cached_list(_system_jobs_key(tenant_id), entry, max_items=200)
 
     severity_map = {
         "completed": "info",
@@ -6974,15 +7662,16 @@ def admin_system_settings_get():
             overrides = cached_overrides
     settings = {**defaults, **overrides}
 
-    routers_query = MikroTikRouter.query
+    routers_query = db.session.query(MikroTikRouter.is_active, func.count(MikroTikRouter.id))
     tickets_query = Ticket.query.filter(Ticket.status.in_(("open", "in_progress")))
     if tenant_id is not None:
-        routers_query = routers_query.filter_by(tenant_id=tenant_id)
+        routers_query = routers_query.filter(MikroTikRouter.tenant_id == tenant_id)
         tickets_query = tickets_query.filter_by(tenant_id=tenant_id)
-    routers_down = routers_query.filter_by(is_active=False).count()
-    routers_up = routers_query.filter_by(is_active=True).count()
+    router_counts = dict(routers_query.group_by(MikroTikRouter.is_active).all())
+    routers_up = router_counts.get(True, 0)
+    routers_down = router_counts.get(False, 0)
 
-    jobs = _load_system_jobs_db(tenant_id)[:20]
+    jobs = _load_system_jobs_db(tenant_id, limit=20)
     if not jobs:
         jobs = _load_cached_list(_system_jobs_key(tenant_id))[:20]
     return jsonify(
@@ -7058,9 +7747,7 @@ def admin_system_settings_update():
         else:
             text_value = str(raw_value or '').strip().lower()
             if key_name == "default_ticket_priority" and text_value not in TICKET_ALLOWED_PRIORITIES:
-                return jsonify(
-                    {"error": f"default_ticket_priority invalido. permitidos: {', '.join(sorted(TICKET_ALLOWED_PRIORITIES))}"}
-                ), 400
+                return jsonify({"error": TICKET_PRIORITY_ERROR}), 400
             overrides[key_name] = text_value
 
     _save_system_settings_overrides_db(tenant_id, overrides, updated_by=_current_user_id())
@@ -7088,24 +7775,33 @@ def admin_system_jobs_history():
     status_filter = str(request.args.get('status') or '').strip().lower()
     job_filter = str(request.args.get('job') or '').strip().lower()
 
-    filtered = _load_system_jobs_db(tenant_id, status_filter=status_filter, job_filter=job_filter)
-    if not filtered:
-        jobs = _load_cached_list(_system_jobs_key(tenant_id))
-        filtered = jobs
+    # Filters and the page window run in SQL; only the requested rows are loaded.
+    total = _system_jobs_db_query(tenant_id, status_filter, job_filter).count()
+    if total:
+        page = _load_system_jobs_db(
+            tenant_id,
+            status_filter=status_filter,
+            job_filter=job_filter,
+            limit=limit,
+            offset=offset,
+        )
+    else:
+        filtered = _load_cached_list(_system_jobs_key(tenant_id))
         if status_filter:
             filtered = [item for item in filtered if str(item.get('status') or '').lower() == status_filter]
         if job_filter:
             filtered = [item for item in filtered if str(item.get('job') or '').lower() == job_filter]
+        total = len(filtered)
+        page = filtered[offset:offset + limit]
 
-    page = filtered[offset:offset + limit]
     return jsonify(
         {
             "items": page,
             "count": len(page),
-            "total": len(filtered),
+            "total": total,
             "offset": offset,
             "limit": limit,
-            "has_more": (offset + len(page)) < len(filtered),
+            "has_more": (offset + len(page)) < total,
         }
     ), 200
 
@@ -7117,7 +7813,7 @@ def admin_system_jobs_run():
     data = request.get_json() or {}
     job = (data.get('job') or '').strip().lower()
     if job not in SYSTEM_ALLOWED_JOBS:
-        return jsonify({"error": f"job debe ser {' | '.join(sorted(SYSTEM_ALLOWED_JOBS))}"}), 400
+        return jsonify({"error": SYSTEM_JOB_ERROR}), 400
     payload, code = _run_system_job_request(job, tenant_id, _current_user_id())
     return jsonify(payload), code
 
@@ -7230,7 +7926,7 @@ def admin_ops_change_requests_create():
 
     status = str(data.get("status") or "requested").strip().lower()
     if status not in OPS_CHANGE_ALLOWED_STATUS:
-        return jsonify({"error": f"status invalido. permitidos: {', '.join(sorted(OPS_CHANGE_ALLOWED_STATUS))}"}), 400
+        return jsonify({"error": OPS_CHANGE_STATUS_ERROR}), 400
 
     checklist = data.get("checklist")
     if not isinstance(checklist, list):
@@ -7256,9 +7952,8 @@ def admin_ops_change_requests_create():
         "created_by_email": actor_user.email if actor_user else None,
     }
 
-    entries = _load_ops_change_requests(tenant_id)
-    entries.insert(0, created)
-    _save_ops_change_requests(tenant_id, entries[:500], updated_by=_current_user_id())
+    entries = [created, *_load_ops_change_requests(tenant_id)[:499]]
+    _save_ops_change_requests(tenant_id, entries, updated_by=_current_user_id())
     _audit("ops_change_request_create", entity_type="ops_change_request", entity_id=created["id"], metadata=created)
     return jsonify({"success": True, "item": created}), 201
 
@@ -7269,7 +7964,7 @@ def admin_ops_change_requests_update(change_id):
     tenant_id = current_tenant_id()
     data = request.get_json() or {}
     entries = _load_ops_change_requests(tenant_id)
-    index = next((idx for idx, item in enumerate(entries) if str(item.get("id")) == str(change_id)), None)
+    index = _find_entry_index(entries, change_id)
     if index is None:
         return jsonify({"error": "change_request no encontrado"}), 404
 
@@ -7282,7 +7977,7 @@ def admin_ops_change_requests_update(change_id):
     if "status" in data:
         status = str(data.get("status") or "").strip().lower()
         if status not in OPS_CHANGE_ALLOWED_STATUS:
-            return jsonify({"error": f"status invalido. permitidos: {', '.join(sorted(OPS_CHANGE_ALLOWED_STATUS))}"}), 400
+            return jsonify({"error": OPS_CHANGE_STATUS_ERROR}), 400
         row["status"] = status
     if "ticket_ref" in data:
         row["ticket_ref"] = str(data.get("ticket_ref") or "").strip()
@@ -7316,7 +8011,7 @@ def admin_ops_change_requests_approve(change_id):
     if approved is None:
         approved = True
     entries = _load_ops_change_requests(tenant_id)
-    index = next((idx for idx, item in enumerate(entries) if str(item.get("id")) == str(change_id)), None)
+    index = _find_entry_index(entries, change_id)
     if index is None:
         return jsonify({"error": "change_request no encontrado"}), 404
     row = dict(entries[index])
@@ -7627,33 +8322,11 @@ def create_ticket():
 
 
 def _notify_client(client: Client, subject: str, body: str):
-    """Envía correo y push si hay configuración."""
-    try:
-        mail = current_app.extensions.get('mail')
-        if mail and client.user and client.user.email:
-            msg = Message(subject=subject, recipients=[client.user.email], body=body, sender=current_app.config.get('MAIL_DEFAULT_SENDER'))
-            mail.send(msg)
-    except Exception:
-        current_app.logger.warning("No se pudo enviar correo al cliente")
+    """Envía correo y push si hay configuración, fuera del ciclo de la petición."""
+    from app.tasks import notify_client
 
-    wp_token = current_app.config.get('WONDERPUSH_ACCESS_TOKEN')
-    wp_app = current_app.config.get('WONDERPUSH_APPLICATION_ID')
-    if wp_token and wp_app:
-        try:
-            import requests
-            payload = {
-                "targetSegmentIds": ["all"],
-                "notification": {"alert": body[:120], "url": current_app.config.get('FRONTEND_URL')}
-            }
-            requests.post(
-                "https://api.wonderpush.com/v1/deliveries",
-                params={"applicationId": wp_app},
-                headers={"Authorization": f"Bearer {wp_token}"},
-                json=payload,
-                timeout=5
-            )
-        except Exception:
-            current_app.logger.warning("No se pudo enviar push al cliente")
+    email = client.user.email if client.user else None
+    _dispatch_side_effect(notify_client, email, subject, body)
 
 
 @main_bp.route('/admin/routers/<int:router_id>/remote-script', methods=['GET'])
@@ -3,6 +3,7 @@ OLT enterprise API endpoints (ZTE, Huawei, VSOL).
 """
 from __future__ import annotations
 
+import secrets
 import socket
 import ssl
 import time
@@ -615,7 +616,7 @@ def create_service_template():
     label = str(data.get("label") or "").strip()
     line_profile = str(data.get("line_profile") or "").strip()
     srv_profile = str(data.get("srv_profile") or "").strip()
-    template_id = str(data.get("id") or "").strip() or f"{vendor}-custom-{int(time.time())}"
+    template_id = str(data.get("id") or "").strip() or f"{vendor}-custom-{secrets.token_hex(4)}"
 
     if not label or not line_profile or not srv_profile:
         return jsonify({"success": False, "error": "label, line_profile y srv_profile son requeridos"}), 400
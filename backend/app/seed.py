@@ -3,7 +3,7 @@ import os
 import secrets
 
 from app import db
-from app.models import Client, MikroTikRouter, Plan, Subscription, Tenant, User
+from app.models import Client, MikroTikRouter, Plan, StaffMeta, Subscription, Tenant, User
 
 
 def seed_data():
@@ -11,6 +11,7 @@ def seed_data():
 
     print("Deleting old data...")
     db.session.query(Client).delete()
+    db.session.query(StaffMeta).delete()
     db.session.query(User).delete()
     db.session.query(Plan).delete()
     db.session.query(MikroTikRouter).delete()
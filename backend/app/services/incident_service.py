@@ -0,0 +1,102 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app
+from flask_mail import Message
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Shared keep-alive pool so repeated alerts reuse the TCP/TLS connection per host.
+# Retry only covers connection failures: urllib3 never resends a POST whose body
+# may already have been delivered, so alerts are not duplicated.
+_http_session = requests.Session()
+_http_session.mount(
+    "https://",
+    HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=Retry(total=2, backoff_factor=0.3)),
+)
+_notify_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="notify")
+
+
+def _post_quietly(logger, failure_message: str, url: str, **kwargs) -> None:
+    try:
+        _http_session.post(url, timeout=5, **kwargs)
+    except Exception:
+        logger.warning(failure_message)
+
+
+def send_incident_notification(message: str, severity: str = "info") -> None:
+    """Send push notification to PagerDuty/Telegram/WonderPush if configured.
+
+    Providers are posted to concurrently and not awaited, so one slow provider
+    does not hold up the side-effect worker that also drains audit batches.
+    """
+    pd_key = current_app.config.get('PAGERDUTY_ROUTING_KEY')
+    tg_token = current_app.config.get('TELEGRAM_BOT_TOKEN')
+    tg_chat = current_app.config.get('TELEGRAM_CHAT_ID')
+    wp_token = current_app.config.get('WONDERPUSH_ACCESS_TOKEN')
+    wp_app = current_app.config.get('WONDERPUSH_APPLICATION_ID')
+    logger = current_app.logger
+    if pd_key:
+        payload = {
+            "routing_key": pd_key,
+            "event_action": "trigger",
+            "payload": {
+                "summary": message,
+                "severity": "critical" if severity == "critical" else "warning" if severity == "warning" else "info",
+                "source": "ispfast-api",
+            },
+        }
+        _notify_pool.submit(
+            _post_quietly, logger, "PagerDuty notify failed", "https://events.pagerduty.com/v2/enqueue", json=payload
+        )
+    if tg_token and tg_chat:
+        _notify_pool.submit(
+            _post_quietly,
+            logger,
+            "Telegram notify failed",
+            f"https://api.telegram.org/bot{tg_token}/sendMessage",
+            data={"chat_id": tg_chat, "text": message[:4000]},
+        )
+    if wp_token and wp_app:
+        payload = {
+            "targetSegmentIds": ["all"],
+            "notification": {"alert": message, "url": current_app.config.get('FRONTEND_URL')}
+        }
+        _notify_pool.submit(
+            _post_quietly,
+            logger,
+            "WonderPush notify failed",
+            "https://api.wonderpush.com/v1/deliveries",
+            params={"applicationId": wp_app},
+            headers={"Authorization": f"Bearer {wp_token}"},
+            json=payload,
+        )
+
+
+def send_client_notification(email: str | None, subject: str, body: str) -> None:
+    """Send a client-facing email and WonderPush alert if configured."""
+    try:
+        mail = current_app.extensions.get('mail')
+        if mail and email:
+            msg = Message(subject=subject, recipients=[email], body=body, sender=current_app.config.get('MAIL_DEFAULT_SENDER'))
+            mail.send(msg)
+    except Exception:
+        current_app.logger.warning("No se pudo enviar correo al cliente")
+
+    wp_token = current_app.config.get('WONDERPUSH_ACCESS_TOKEN')
+    wp_app = current_app.config.get('WONDERPUSH_APPLICATION_ID')
+    if wp_token and wp_app:
+        try:
+            payload = {
+                "targetSegmentIds": ["all"],
+                "notification": {"alert": body[:120], "url": current_app.config.get('FRONTEND_URL')}
+            }
+            _http_session.post(
+                "https://api.wonderpush.com/v1/deliveries",
+                params={"applicationId": wp_app},
+                headers={"Authorization": f"Bearer {wp_token}"},
+                json=payload,
+                timeout=5
+            )
+        except Exception:
+            current_app.logger.warning("No se pudo enviar push al cliente")
@@ -4,6 +4,7 @@ Handles all MikroTik router operations for ISPMAX
 """
 from routeros_api.exceptions import RouterOsApiError
 from typing import Dict, List, Optional, Tuple
+import heapq
 import logging
 from datetime import datetime, timedelta
 from sqlalchemy import or_
@@ -869,31 +870,6 @@ class MikroTikService:
             logger.error(f"Unexpected error deleting connection with ID {connection_id}: {e}")
             return False
     
-    def get_all_clients_with_location(self) -> List[Dict]:
-        """
-        Get all clients from DB with location and enrich with live status.
-        This method is designed to feed the NetworkMap component.
-        """
-        db_clients = Client.query.filter(Client.latitude.isnot(None), Client.longitude.isnot(None)).all()
-        
-        if not db_clients:
-            return []
-
-        if not self.api:
-            logger.warning("Could not connect to router to get live client statuses.")
-            active_ips = set()
-        else:
-            active_conns = self.get_active_connections()
-            active_ips = {conn['address'] for conn in active_conns if 'address' in conn}
-        
-        client_map_data = []
-        for client in db_clients:
-            status = 'active' if client.ip_address in active_ips else 'offline'
-            # Simple logic, can be expanded (e.g., check queue stats for 'warning')
-            client_map_data.append(client.to_dict() | {'status': status, 'lat': client.latitude, 'lng': client.longitude})
-        
-        return client_map_data
-
     def get_client_dashboard_stats(self, client: Client) -> Dict:
         """
         Return client dashboard stats using available telemetry, plan and billing data.
@@ -1139,7 +1115,8 @@ class MikroTikService:
             except Exception:
                 return now
 
-        return sorted(events, key=_event_ts, reverse=True)[:60]
+        # Newest first; only the top 60 of the merged sources are returned.
+        return heapq.nlargest(60, events, key=_event_ts)
 
     def reboot_client_cpe(self, client: Client) -> Tuple[bool, str]:
         """
@@ -1506,6 +1483,91 @@ class MikroTikService:
             logger.error(f"Activate client failed: {e}")
             return False
 
+    def _index_by_name(self, path: str, names: set) -> Dict[str, str]:
+        """Map resource name -> .id with a single listing of ``path``."""
+        if not names:
+            return {}
+        rows = self.api.get_resource(path).get()
+        return {row.get('name'): row['.id'] for row in rows if row.get('name') in names}
+
+    def suspend_clients(self, clients: List[Client]) -> Dict[int, bool]:
+        """Suspend many clients reusing one API session and one listing per resource."""
+        if not clients:
+            return {}
+        if not self.api:
+            return {client.id: False for client in clients}
+        try:
+            secret_ids = self._index_by_name(
+                '/ppp/secret',
+                {c.pppoe_username for c in clients if c.connection_type == 'pppoe' and c.pppoe_username},
+            )
+            queue_ids = self._index_by_name(
+                '/queue/simple',
+                {f"client_{c.id}" for c in clients if not (c.connection_type == 'pppoe' and c.pppoe_username)},
+            )
+            secret_api = self.api.get_resource('/ppp/secret')
+            addr_api = self.api.get_resource('/ip/firewall/address-list')
+            queue_api = self.api.get_resource('/queue/simple')
+        except Exception as e:
+            logger.error(f"Suspend clients failed: {e}")
+            return {client.id: False for client in clients}
+
+        results: Dict[int, bool] = {}
+        for client in clients:
+            try:
+                if client.connection_type == 'pppoe' and client.pppoe_username:
+                    secret_id = secret_ids.get(client.pppoe_username)
+                    if secret_id:
+                        secret_api.set(id=secret_id, disabled='yes', comment='suspended')
+                else:
+                    if client.ip_address:
+                        addr_api.add(list='suspended', address=client.ip_address, comment=f"Cliente {client.full_name}")
+                    queue_id = queue_ids.get(f"client_{client.id}")
+                    if queue_id:
+                        queue_api.set(id=queue_id, max_limit="0/0", comment="suspended")
+                results[client.id] = True
+            except Exception as e:
+                logger.error(f"Suspend client {client.id} failed: {e}")
+                results[client.id] = False
+        return results
+
+    def activate_clients(self, clients: List[Client]) -> Dict[int, bool]:
+        """Reactivate many clients reusing one API session and one listing per resource."""
+        if not clients:
+            return {}
+        if not self.api:
+            return {client.id: False for client in clients}
+        try:
+            secret_ids = self._index_by_name(
+                '/ppp/secret',
+                {c.pppoe_username for c in clients if c.connection_type == 'pppoe' and c.pppoe_username},
+            )
+            addr_api = self.api.get_resource('/ip/firewall/address-list')
+            suspended_ids: Dict[str, List[str]] = {}
+            if any(c.ip_address for c in clients if not (c.connection_type == 'pppoe' and c.pppoe_username)):
+                for item in addr_api.get(list='suspended'):
+                    suspended_ids.setdefault(item.get('address'), []).append(item['.id'])
+            secret_api = self.api.get_resource('/ppp/secret')
+        except Exception as e:
+            logger.error(f"Activate clients failed: {e}")
+            return {client.id: False for client in clients}
+
+        results: Dict[int, bool] = {}
+        for client in clients:
+            try:
+                if client.connection_type == 'pppoe' and client.pppoe_username:
+                    secret_id = secret_ids.get(client.pppoe_username)
+                    if secret_id:
+                        secret_api.set(id=secret_id, disabled='no', comment=f"Cliente {client.full_name}")
+                elif client.ip_address:
+                    for item_id in suspended_ids.get(client.ip_address, []):
+                        addr_api.remove(id=item_id)
+                results[client.id] = True
+            except Exception as e:
+                logger.error(f"Activate client {client.id} failed: {e}")
+                results[client.id] = False
+        return results
+
     def change_speed(self, client: Client, plan: Plan) -> bool:
         """Ajustar velocidad según plan."""
         if not self.api:
@@ -1,8 +1,30 @@
+import threading
+
 from influxdb_client import InfluxDBClient, Point
 from influxdb_client.client.write_api import SYNCHRONOUS
 from influxdb_client.client.exceptions import InfluxDBError
 from flask import current_app
 
+_client_lock = threading.Lock()
+
+
+def _shared_influx_client(url: str, token: str, org: str) -> InfluxDBClient:
+    """
+    Return the app-wide InfluxDB client, creating it on first use.
+    The client keeps a pooled HTTP connection, so reusing it avoids a new
+    handshake for every MonitoringService built inside a request.
+    """
+    extensions = current_app.extensions
+    client = extensions.get('influxdb_client')
+    if client is None:
+        with _client_lock:
+            client = extensions.get('influxdb_client')
+            if client is None:
+                client = InfluxDBClient(url=url, token=token, org=org)
+                extensions['influxdb_client'] = client
+    return client
+
+
 class MonitoringService:
     def __init__(self):
         self.influx_url = current_app.config['INFLUXDB_URL']
@@ -10,7 +32,7 @@ class MonitoringService:
         self.influx_org = current_app.config['INFLUXDB_ORG']
         self.influx_bucket = current_app.config['INFLUXDB_BUCKET']
         
-        self.client = InfluxDBClient(url=self.influx_url, token=self.influx_token, org=self.influx_org)
+        self.client = _shared_influx_client(self.influx_url, self.influx_token, self.influx_org)
         self.write_api = self.client.write_api(write_options=SYNCHRONOUS)
         self.query_api = self.client.query_api()
 
@@ -6,18 +6,20 @@ import json
 from typing import Any, Dict, List, Optional, Tuple
 
 import redis
+from celery.signals import worker_ready
 from flask import current_app
 import os
 import subprocess
 
 from app import celery, db
-from app.models import MikroTikRouter, Subscription, Client
+from app.models import AuditLog, MikroTikRouter, Subscription, Client, Tenant
 from app.services.analytics_service import analytics_service
 from app.services.mikrotik_service import MikroTikService
 from app.services.monitoring_service import MonitoringService
 from app.services.noc_automation_service import noc_automation_service
 from app.services.olt_script_service import OLTScriptService
 from app.services.backup_service import run_backups
+from app.services.incident_service import send_client_notification, send_incident_notification
 
 
 def _get_redis_client() -> Optional[redis.Redis]:
@@ -300,3 +302,85 @@ def run_backups() -> Dict[str, Any]:
     # Delegamos la logica a backup_service para mantener una sola fuente.
     from app.services.backup_service import run_backups as run_full_backups
     return run_full_backups()
+
+
+@celery.task(name='app.tasks.write_audit_logs', ignore_result=True)
+def write_audit_logs(rows: List[Dict[str, Any]]) -> int:
+    """Persist a batch of audit rows captured on the request path."""
+    if not rows:
+        return 0
+    try:
+        db.session.bulk_insert_mappings(AuditLog, rows)
+        db.session.commit()
+        return len(rows)
+    except Exception:
+        db.session.rollback()
+
+    # Batches merge rows from many requests; retry one by one so a bad row only loses itself.
+    written = 0
+    for row in rows:
+        try:
+            db.session.bulk_insert_mappings(AuditLog, [row])
+            db.session.commit()
+            written += 1
+        except Exception:
+            db.session.rollback()
+            current_app.logger.warning('Failed to persist audit row for action %s', row.get('action'))
+    return written
+
+
+@celery.task(name='app.tasks.notify_incident', ignore_result=True)
+def notify_incident(message: str, severity: str = 'info') -> None:
+    send_incident_notification(message, severity)
+
+
+@celery.task(name='app.tasks.notify_client', ignore_result=True)
+def notify_client(email: Optional[str], subject: str, body: str) -> None:
+    send_client_notification(email, subject, body)
+
+
+@celery.task(
+    name='app.tasks.apply_webhook_payment',
+    ignore_result=True,
+    autoretry_for=(Exception,),
+    retry_backoff=True,
+    retry_kwargs={'max_retries': 5},
+)
+def apply_webhook_payment(ctx: Dict[str, Any]) -> None:
+    """Apply a verified Stripe webhook event after the HTTP request has acked it."""
+    from app.routes.main_routes import _apply_webhook_payment
+
+    try:
+        _apply_webhook_payment(ctx)
+    except Exception:
+        db.session.rollback()
+        raise
+
+
+@celery.task(name='app.tasks.prewarm_admin_caches', ignore_result=True)
+def prewarm_admin_caches() -> Dict[str, Any]:
+    """Seed each tenant's extra-services catalog so first admin GETs skip the cold path."""
+    from app.routes.main_routes import _cache_is_shared, prewarm_catalog_caches
+
+    # A per-process cache warmed inside the worker is never seen by the web app.
+    if not _cache_is_shared():
+        current_app.logger.info('Skipping cache prewarm: CACHE_TYPE is not a shared Redis cache.')
+        return {'tenants_warmed': 0, 'failed': 0, 'skipped': True}
+
+    warmed = 0
+    failed = 0
+    for (tenant_id,) in Tenant.query.filter_by(is_active=True).with_entities(Tenant.id).all():
+        try:
+            prewarm_catalog_caches(tenant_id)
+            warmed += 1
+        except Exception:
+            db.session.rollback()
+            failed += 1
+            current_app.logger.warning('Cache prewarm failed for tenant %s', tenant_id)
+    return {'tenants_warmed': warmed, 'failed': failed}
+
+
+@worker_ready.connect
+def _prewarm_on_worker_ready(sender=None, **kwargs) -> None:
+    if celery.conf.get('CACHE_PREWARM'):
+        prewarm_admin_caches.delay()
@@ -0,0 +1,30 @@
+"""processed_webhook_events
+
+Revision ID: a9d4e6f2c8b3
+Revises: f3c8d2a5e9b1
+Create Date: 2026-10-17 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a9d4e6f2c8b3'
+down_revision = 'f3c8d2a5e9b1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'processed_webhook_events',
+        sa.Column('event_id', sa.String(length=255), nullable=False),
+        sa.Column('event_type', sa.String(length=120), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('event_id')
+    )
+
+
+def downgrade():
+    op.drop_table('processed_webhook_events')
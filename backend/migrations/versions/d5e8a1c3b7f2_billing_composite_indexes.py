@@ -0,0 +1,47 @@
+"""billing_composite_indexes
+
+Revision ID: d5e8a1c3b7f2
+Revises: c12b0a6f4e9d
+Create Date: 2026-10-17 09:30:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'd5e8a1c3b7f2'
+down_revision = 'c12b0a6f4e9d'
+branch_labels = None
+depends_on = None
+
+
+INDEXES = (
+    ('ix_subscriptions_tenant_status', 'subscriptions', ['tenant_id', 'status']),
+    ('ix_invoices_status_due_date', 'invoices', ['status', 'due_date']),
+    ('ix_payments_status_created_at', 'payments', ['status', 'created_at']),
+)
+
+
+def _is_postgresql() -> bool:
+    return op.get_bind().dialect.name == 'postgresql'
+
+
+def upgrade():
+    if _is_postgresql():
+        # CONCURRENTLY cannot run inside the migration transaction.
+        with op.get_context().autocommit_block():
+            for name, table, columns in INDEXES:
+                op.create_index(name, table, columns, unique=False, postgresql_concurrently=True)
+        return
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, unique=False)
+
+
+def downgrade():
+    if _is_postgresql():
+        with op.get_context().autocommit_block():
+            for name, table, _ in reversed(INDEXES):
+                op.drop_index(name, table_name=table, postgresql_concurrently=True)
+        return
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,39 @@
+"""staff_meta_table
+
+Revision ID: e7b2c9d4f1a6
+Revises: d5e8a1c3b7f2
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7b2c9d4f1a6'
+down_revision = 'd5e8a1c3b7f2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'staff_meta',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('tenant_id', sa.Integer(), nullable=True),
+        sa.Column('zone', sa.String(length=120), nullable=False),
+        sa.Column('phone', sa.String(length=40), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('shift', sa.String(length=20), nullable=False),
+        sa.Column('last_seen_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['tenant_id'], ['tenants.id'], ),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_id')
+    )
+    op.create_index(op.f('ix_staff_meta_tenant_id'), 'staff_meta', ['tenant_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_staff_meta_tenant_id'), table_name='staff_meta')
+    op.drop_table('staff_meta')
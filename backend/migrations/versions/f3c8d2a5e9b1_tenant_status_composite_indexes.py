@@ -0,0 +1,54 @@
+"""tenant_status_composite_indexes
+
+Revision ID: f3c8d2a5e9b1
+Revises: e7b2c9d4f1a6
+Create Date: 2026-10-17 12:15:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3c8d2a5e9b1'
+down_revision = 'e7b2c9d4f1a6'
+branch_labels = None
+depends_on = None
+
+
+# The subscription index supersedes ix_subscriptions_tenant_status: the
+# reminder/enforcement UPDATEs range over next_charge within a status.
+INDEXES = (
+    ('ix_subscriptions_tenant_status_next_charge', 'subscriptions', ['tenant_id', 'status', 'next_charge']),
+    ('ix_routers_tenant_active', 'mikrotik_routers', ['tenant_id', 'is_active']),
+)
+REPLACED = ('ix_subscriptions_tenant_status', 'subscriptions', ['tenant_id', 'status'])
+
+
+def _is_postgresql() -> bool:
+    return op.get_bind().dialect.name == 'postgresql'
+
+
+def upgrade():
+    if _is_postgresql():
+        # CONCURRENTLY cannot run inside the migration transaction.
+        with op.get_context().autocommit_block():
+            for name, table, columns in INDEXES:
+                op.create_index(name, table, columns, unique=False, postgresql_concurrently=True)
+            op.drop_index(REPLACED[0], table_name=REPLACED[1], postgresql_concurrently=True)
+        return
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, unique=False)
+    op.drop_index(REPLACED[0], table_name=REPLACED[1])
+
+
+def downgrade():
+    name, table, columns = REPLACED
+    if _is_postgresql():
+        with op.get_context().autocommit_block():
+            op.create_index(name, table, columns, unique=False, postgresql_concurrently=True)
+            for index_name, index_table, _ in reversed(INDEXES):
+                op.drop_index(index_name, table_name=index_table, postgresql_concurrently=True)
+        return
+    op.create_index(name, table, columns, unique=False)
+    for index_name, index_table, _ in reversed(INDEXES):
+        op.drop_index(index_name, table_name=index_table)
@@ -3,7 +3,7 @@ from datetime import date, timedelta
 from flask_jwt_extended import create_access_token
 
 from app import db
-from app.models import Subscription, User
+from app.models import AuditLog, Client, Plan, Subscription, User
 
 
 def _create_admin(app, email: str, name: str) -> tuple[int, str]:
@@ -76,6 +76,7 @@ def test_extra_service_and_hotspot_creation_include_actor_metadata(client, app):
     )
     assert vouchers_response.status_code == 201
     item = vouchers_response.get_json()['items'][0]
+    assert item['code'].startswith('BAS-')
     assert item['created_by'] == admin_id
     assert item['updated_by'] == admin_id
     assert item['created_by_name'] == 'Admin Comercial'
@@ -170,3 +171,259 @@ def test_enforce_billing_job_respects_auto_suspend_setting(client, app):
         updated = db.session.get(Subscription, subscription_id)
         assert updated is not None
         assert updated.status == 'past_due'
+
+
+def test_notifications_send_filters_audience_by_subscription_status(client, app):
+    _, token = _create_admin(app, 'admin-notify-audience@test.local', 'Admin Notify')
+
+    with app.app_context():
+        plan = Plan(name='Fibra 100', download_speed=100, upload_speed=20, price=25.0)
+        db.session.add(plan)
+        db.session.flush()
+        for index, status in enumerate(('active', 'past_due', 'past_due', 'suspended')):
+            client_row = Client(full_name=f'Cliente Aviso {index}', plan_id=plan.id)
+            db.session.add(client_row)
+            db.session.flush()
+            db.session.add(
+                Subscription(
+                    customer=client_row.full_name,
+                    email=f'aviso{index}@test.local',
+                    plan='Mensual',
+                    cycle_months=1,
+                    amount=25.0,
+                    status=status,
+                    currency='USD',
+                    next_charge=date.today(),
+                    method='manual',
+                    client_id=client_row.id,
+                )
+            )
+        db.session.commit()
+
+    response = client.post(
+        '/api/admin/notifications/send',
+        json={'title': 'Aviso', 'message': 'Regulariza tu pago', 'audience': 'overdue', 'plan': 'fibra 100'},
+        headers=_auth(token),
+    )
+    assert response.status_code == 201
+    notification = response.get_json()['notification']
+    assert notification['target_count'] == 2
+
+    history = client.get('/api/admin/notifications/history', headers=_auth(token))
+    assert history.status_code == 200
+    assert history.get_json()['items'][0]['id'] == notification['id']
+
+    with app.app_context():
+        audit = AuditLog.query.filter_by(action='notification_send').one()
+        assert audit.entity_id == notification['id']
+
+
+def test_audit_rows_are_written_by_background_thread(client, app):
+    from app.routes import main_routes
+
+    _, token = _create_admin(app, 'admin-audit-thread@test.local', 'Admin Thread')
+    app.config['SIDE_EFFECTS_DISPATCH'] = 'thread'
+
+    response = client.post(
+        '/api/admin/notifications/send',
+        json={'title': 'Aviso', 'message': 'Mantenimiento', 'audience': 'all'},
+        headers=_auth(token),
+    )
+    assert response.status_code == 201
+    main_routes._background_jobs().join()
+
+    with app.app_context():
+        assert AuditLog.query.filter_by(action='notification_send').count() == 1
+
+
+def test_audit_rows_are_written_inline_when_background_queue_is_full(client, app, monkeypatch):
+    import queue
+
+    from app.routes import main_routes
+
+    _, token = _create_admin(app, 'admin-audit-full@test.local', 'Admin Full Queue')
+    app.config['SIDE_EFFECTS_DISPATCH'] = 'thread'
+    full = queue.Queue(maxsize=1)
+    full.put_nowait(None)
+    monkeypatch.setattr(main_routes, '_background_jobs', lambda: full)
+
+    response = client.post(
+        '/api/admin/notifications/send',
+        json={'title': 'Aviso', 'message': 'Corte programado', 'audience': 'all'},
+        headers=_auth(token),
+    )
+    assert response.status_code == 201
+
+    with app.app_context():
+        assert AuditLog.query.filter_by(action='notification_send').count() == 1
+
+
+def test_background_queue_merges_audit_batches(app):
+    from app.routes import main_routes
+    from app.tasks import notify_incident, write_audit_logs
+
+    pending = [
+        (app, write_audit_logs, ([{'action': 'a'}],)),
+        (app, notify_incident, ('aviso', 'info')),
+        (app, write_audit_logs, ([{'action': 'b'}, {'action': 'c'}],)),
+    ]
+
+    merged = main_routes._merge_background_jobs(pending)
+
+    assert [task.name for _, task, _ in merged] == ['app.tasks.write_audit_logs', 'app.tasks.notify_incident']
+    assert merged[0][2] == ([{'action': 'a'}, {'action': 'b'}, {'action': 'c'}],)
+
+
+def test_write_audit_logs_keeps_good_rows_when_one_fails(app):
+    from app.tasks import write_audit_logs
+
+    rows = [{'action': 'batch_ok_a'}, {'action': None}, {'action': 'batch_ok_b'}]
+
+    with app.app_context():
+        assert write_audit_logs.run(rows) == 2
+        assert {log.action for log in AuditLog.query.filter(AuditLog.action.like('batch_ok_%'))} == {
+            'batch_ok_a',
+            'batch_ok_b',
+        }
+
+
+def test_subscription_reminders_and_enforce_update_in_bulk(client, app):
+    _, token = _create_admin(app, 'admin-reminders@test.local', 'Admin Reminders')
+    today = date.today()
+    seeds = [
+        ('al-dia', 'active', today + timedelta(days=5)),
+        ('vencida', 'active', today - timedelta(days=3)),
+        ('muy-vencida', 'active', today - timedelta(days=12)),
+        ('mora-larga', 'past_due', today - timedelta(days=15)),
+        ('pagada', 'suspended', today + timedelta(days=20)),
+    ]
+    with app.app_context():
+        ids = {}
+        for name, status, next_charge in seeds:
+            subscription = Subscription(
+                customer=f'Cliente {name}',
+                email=f'{name}@test.local',
+                plan='Basico',
+                cycle_months=1,
+                amount=20.0,
+                status=status,
+                currency='USD',
+                next_charge=next_charge,
+                method='manual',
+            )
+            db.session.add(subscription)
+            db.session.flush()
+            ids[name] = subscription.id
+        db.session.commit()
+
+    reminders = client.post('/api/subscriptions/run-reminders', headers=_auth(token))
+    assert reminders.status_code == 200
+    changes = [(row['id'], row['status']) for row in reminders.get_json()['updated']]
+    assert changes == [
+        (ids['vencida'], 'past_due'),
+        (ids['muy-vencida'], 'past_due'),
+        (ids['muy-vencida'], 'suspended'),
+        (ids['mora-larga'], 'suspended'),
+    ]
+
+    enforce = client.post('/api/subscriptions/auto-enforce', headers=_auth(token))
+    assert enforce.status_code == 200
+    assert enforce.get_json()['suspended'] == 0
+    assert enforce.get_json()['reactivated'] == 1
+
+    with app.app_context():
+        statuses = {name: db.session.get(Subscription, sub_id).status for name, sub_id in ids.items()}
+    assert statuses == {
+        'al-dia': 'active',
+        'vencida': 'past_due',
+        'muy-vencida': 'suspended',
+        'mora-larga': 'suspended',
+        'pagada': 'active',
+    }
+
+
+def test_subscription_charge_reactivates_linked_client_on_router(client, app, monkeypatch):
+    from app.models import MikroTikRouter
+    from app.routes import main_routes
+
+    _, token = _create_admin(app, 'admin-charge@test.local', 'Admin Charge')
+    today = date.today()
+    with app.app_context():
+        router = MikroTikRouter(name='Router Cobro', ip_address='10.7.0.1', username='admin')
+        router.password = 'Secret#Router01'
+        db.session.add(router)
+        db.session.flush()
+        customer = Client(full_name='Cliente Cobro', connection_type='pppoe', router_id=router.id)
+        db.session.add(customer)
+        db.session.flush()
+        subscription = Subscription(
+            customer=customer.full_name,
+            email='cobro@test.local',
+            plan='Basico',
+            cycle_months=1,
+            amount=20.0,
+            status='suspended',
+            currency='USD',
+            next_charge=today,
+            method='manual',
+            client_id=customer.id,
+        )
+        db.session.add(subscription)
+        db.session.commit()
+        subscription_id = subscription.id
+        router_id = router.id
+
+    activated = []
+
+    class FakeMikroTikService:
+        def __init__(self, router_id=None):
+            self.router_id = router_id
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def activate_client(self, target):
+            activated.append((self.router_id, target.full_name))
+
+    monkeypatch.setattr(main_routes, 'MikroTikService', FakeMikroTikService)
+
+    response = client.post(f'/api/subscriptions/{subscription_id}/charge', headers=_auth(token))
+    assert response.status_code == 200
+    payload = response.get_json()['subscription']
+    assert payload['status'] == 'active'
+    assert payload['next_charge'] == (today + timedelta(days=30)).isoformat()
+    assert activated == [(router_id, 'Cliente Cobro')]
+
+
+def test_incident_notification_does_not_wait_for_providers(app, monkeypatch):
+    import threading
+    import time
+
+    from app.services import incident_service
+
+    release = threading.Event()
+    posted = []
+
+    def _slow_post(url, **kwargs):
+        release.wait(5)
+        posted.append(url)
+
+    monkeypatch.setattr(incident_service._http_session, 'post', _slow_post)
+    app.config.update(PAGERDUTY_ROUTING_KEY='pd-key', TELEGRAM_BOT_TOKEN='tg-token', TELEGRAM_CHAT_ID='42')
+
+    with app.app_context():
+        incident_service.send_incident_notification('Router caido', 'critical')
+    assert posted == []
+
+    release.set()
+    for _ in range(50):
+        if len(posted) == 2:
+            break
+        time.sleep(0.05)
+    assert sorted(posted) == [
+        'https://api.telegram.org/bottg-token/sendMessage',
+        'https://events.pagerduty.com/v2/enqueue',
+    ]
@@ -546,3 +546,83 @@ def test_admin_bulk_update_clients_apply_partial_success(client, app):
         assert reset_client is not None
         assert reset_client.user is not None
         assert reset_client.user.check_password('ResetPass#999') is True
+
+
+def test_create_client_keeps_record_when_router_provisioning_fails(client, app, monkeypatch):
+    admin_id, plan_id = _admin_and_plan(app, email_prefix='admin-clients-provision')
+    token = _token_for_user(app, admin_id)
+    with app.app_context():
+        router = MikroTikRouter(name='Router Provision', ip_address='10.0.0.9', username='admin')
+        router.password = 'Secret#Router01'
+        db.session.add(router)
+        db.session.commit()
+        router_id = router.id
+
+    class UnreachableMikroTikService:
+        def __init__(self, router_id):
+            raise ConnectionError('router offline')
+
+    monkeypatch.setattr(main_routes, 'MikroTikService', UnreachableMikroTikService)
+
+    response = client.post(
+        '/api/clients',
+        json={
+            'name': 'Cliente Provision',
+            'email': 'cliente.provision@test.local',
+            'connection_type': 'dhcp',
+            'plan_id': plan_id,
+            'router_id': router_id,
+            'provision': True,
+        },
+        headers={'Authorization': f'Bearer {token}'},
+    )
+    assert response.status_code == 201
+    payload = response.get_json()
+    assert payload['provision']['success'] is False
+    with app.app_context():
+        created = Client.query.filter_by(full_name='Cliente Provision').one()
+        assert created.user.email == 'cliente.provision@test.local'
+        assert created.plan_id == plan_id
+
+
+def test_reboot_cpe_allows_owner_and_admin_only(client, app, monkeypatch):
+    admin_id, _ = _admin_and_plan(app, email_prefix='admin-clients-reboot')
+    with app.app_context():
+        router = MikroTikRouter(name='Router Reboot', ip_address='10.0.0.7', username='admin')
+        router.password = 'Secret#Router01'
+        owner = User(email='owner-reboot@test.local', role='client', name='Owner')
+        owner.set_password('clientpass123')
+        stranger = User(email='stranger-reboot@test.local', role='client', name='Stranger')
+        stranger.set_password('clientpass123')
+        db.session.add_all([router, owner, stranger])
+        db.session.flush()
+        customer = Client(full_name='Cliente Reboot', user_id=owner.id, router_id=router.id, connection_type='dhcp')
+        db.session.add(customer)
+        db.session.commit()
+        owner_id, stranger_id, customer_id = owner.id, stranger.id, customer.id
+
+    rebooted = []
+
+    class FakeMikroTikService:
+        def __init__(self, router_id):
+            self.router_id = router_id
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, exc_type, exc, tb):
+            return False
+
+        def reboot_client_cpe(self, target):
+            rebooted.append(target.id)
+            return True, 'Reinicio enviado'
+
+    monkeypatch.setattr(main_routes, 'MikroTikService', FakeMikroTikService)
+    url = f'/api/clients/{customer_id}/reboot-cpe'
+
+    denied = client.post(url, headers={'Authorization': f'Bearer {_token_for_user(app, stranger_id)}'})
+    assert denied.status_code == 403
+    for user_id in (owner_id, admin_id):
+        allowed = client.post(url, headers={'Authorization': f'Bearer {_token_for_user(app, user_id)}'})
+        assert allowed.status_code == 200
+    assert rebooted == [customer_id, customer_id]
@@ -0,0 +1,156 @@
+from datetime import date, datetime, timedelta
+
+from flask_jwt_extended import create_access_token
+
+from app import db
+from app.models import Invoice, PaymentRecord, Subscription, User
+
+
+def _admin_token(app) -> str:
+    with app.app_context():
+        user = User(email='admin-finance@test.local', role='admin', name='Admin Finance')
+        user.set_password('pass123456')
+        db.session.add(user)
+        db.session.commit()
+        return create_access_token(identity=str(user.id))
+
+
+def _auth(token: str) -> dict:
+    return {'Authorization': f'Bearer {token}'}
+
+
+def _seed_subscription_with_invoices(app, due_offsets: list[tuple[int, float, str]]) -> None:
+    today = date.today()
+    with app.app_context():
+        subscription = Subscription(
+            customer='Cliente Finanzas',
+            email='cliente.finanzas@test.local',
+            plan='Mensual',
+            cycle_months=1,
+            amount=40.0,
+            status='past_due',
+            currency='USD',
+            next_charge=today,
+            method='manual',
+        )
+        db.session.add(subscription)
+        db.session.flush()
+        for days_overdue, total, status in due_offsets:
+            db.session.add(
+                Invoice(
+                    subscription_id=subscription.id,
+                    amount=total,
+                    currency='USD',
+                    tax_percent=0,
+                    total_amount=total,
+                    status=status,
+                    due_date=today - timedelta(days=days_overdue),
+                )
+            )
+        db.session.commit()
+
+
+def test_finance_summary_aging_buckets(client, app):
+    token = _admin_token(app)
+    _seed_subscription_with_invoices(
+        app,
+        [
+            (-5, 10.0, 'pending'),
+            (0, 5.0, 'pending'),
+            (1, 20.0, 'pending'),
+            (30, 7.5, 'pending'),
+            (31, 30.0, 'pending'),
+            (75, 40.0, 'pending'),
+            (120, 50.0, 'pending'),
+            (120, 99.0, 'paid'),
+        ],
+    )
+
+    response = client.get('/api/admin/finance/summary', headers=_auth(token))
+    assert response.status_code == 200
+    payload = response.get_json()
+
+    assert payload['aging'] == {
+        'current': 15.0,
+        'days_1_30': 27.5,
+        'days_31_60': 30.0,
+        'days_61_90': 40.0,
+        'days_90_plus': 50.0,
+    }
+    assert payload['summary']['pending_balance'] == 162.5
+    assert payload['summary']['overdue_balance'] == 147.5
+    assert payload['summary']['invoices_total'] == 8
+    assert len(payload['recent_invoices']) == 8
+    assert {row['customer'] for row in payload['recent_invoices']} == {'Cliente Finanzas'}
+    assert payload['top_debtors'][0]['customer'] == 'Cliente Finanzas'
+
+
+def test_finance_summary_cashflow_groups_by_month(client, app):
+    token = _admin_token(app)
+    _seed_subscription_with_invoices(app, [(0, 12.0, 'pending'), (200, 30.0, 'pending'), (0, 25.0, 'paid')])
+    now = datetime.utcnow()
+    with app.app_context():
+        paid_invoice = Invoice.query.filter_by(status='paid').one()
+        db.session.add_all(
+            [
+                PaymentRecord(invoice_id=paid_invoice.id, amount=25.0, status='paid', created_at=now),
+                PaymentRecord(invoice_id=paid_invoice.id, amount=5.0, status='failed', created_at=now),
+                PaymentRecord(invoice_id=paid_invoice.id, amount=8.0, status='paid', created_at=now - timedelta(days=400)),
+            ]
+        )
+        db.session.commit()
+
+    response = client.get('/api/admin/finance/summary', headers=_auth(token))
+    assert response.status_code == 200
+    payload = response.get_json()
+
+    assert len(payload['cashflow']) == 6
+    assert payload['cashflow'][-1] == {'label': now.strftime('%b %Y'), 'paid': 25.0, 'pending': 12.0}
+    assert sum(row['paid'] for row in payload['cashflow']) == 25.0
+    assert sum(row['pending'] for row in payload['cashflow']) == 12.0
+    assert payload['summary']['paid_this_month'] == 25.0
+    assert payload['summary']['pending_this_month'] == 12.0
+    assert payload['summary']['collection_rate'] == round(25.0 / 37.0 * 100, 2)
+
+
+def test_subscriptions_list_matches_model_payload(client, app):
+    token = _admin_token(app)
+    _seed_subscription_with_invoices(app, [])
+
+    response = client.get('/api/subscriptions', headers=_auth(token))
+    assert response.status_code == 200
+    payload = response.get_json()
+
+    with app.app_context():
+        expected = [subscription.to_dict() for subscription in Subscription.query.all()]
+    assert payload['count'] == 1
+    assert payload['items'] == expected
+
+
+def test_billing_summary_lists_subscription_charges(client, app):
+    token = _admin_token(app)
+    _seed_subscription_with_invoices(app, [])
+    with app.app_context():
+        subscription = Subscription.query.one()
+        subscription.tax_percent = 18
+        db.session.commit()
+        subscription_id = subscription.id
+        next_charge = subscription.next_charge.isoformat()
+
+    response = client.get('/api/billing', headers=_auth(token))
+    assert response.status_code == 200
+    payload = response.get_json()
+
+    assert payload['count'] == 1
+    assert payload['invoices'] == [
+        {
+            'id': f'SUB-{subscription_id}',
+            'amount': 40.0,
+            'tax_percent': 18.0,
+            'total': 47.2,
+            'currency': 'USD',
+            'due': next_charge,
+            'status': 'overdue',
+            'method': 'manual',
+        }
+    ]
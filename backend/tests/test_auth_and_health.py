@@ -1,4 +1,4 @@
-from datetime import date
+from datetime import date, timedelta
 import hashlib
 import hmac
 import json
@@ -37,6 +37,43 @@ def test_versioned_api_health_endpoint(client):
     assert payload == {'status': 'healthy', 'service': 'ispmax-backend-api'}
 
 
+def test_json_provider_keeps_stdlib_wire_format(app):
+    from datetime import datetime
+    from decimal import Decimal
+
+    from flask.json.provider import DefaultJSONProvider
+
+    payload = {2: 'b', 10: [Decimal('1.50'), datetime(2026, 1, 2, 3, 4, 5), date(2026, 1, 2)]}
+    stdlib = DefaultJSONProvider(app)
+    assert json.loads(app.json.dumps(payload)) == json.loads(stdlib.dumps(payload))
+
+    with app.test_request_context():
+        response = app.json.response(items=[payload[10]])
+    assert response.mimetype == 'application/json'
+    assert response.get_data(as_text=True).endswith('\n')
+    assert json.loads(response.get_data()) == {'items': json.loads(stdlib.dumps([payload[10]]))}
+
+
+def test_json_sort_keys_follows_config(app):
+    from app.json_provider import init_json_provider
+
+    assert app.json.dumps({'b': 1, 'a': 2}).replace(' ', '') == '{"b":1,"a":2}'
+    app.config['JSON_SORT_KEYS'] = True
+    init_json_provider(app)
+    assert app.json.dumps({'b': 1, 'a': 2}).replace(' ', '') == '{"a":2,"b":1}'
+
+
+def test_json_compact_config_skips_debug_indent(app):
+    from app.json_provider import init_json_provider
+
+    app.debug = True
+    with app.test_request_context():
+        assert '\n  ' in app.json.response(a=1).get_data(as_text=True)
+        app.config['JSON_COMPACT'] = True
+        init_json_provider(app)
+        assert app.json.response(a=1).get_data(as_text=True) == '{"a":1}\n'
+
+
 def test_login_success_returns_token_and_user(client, app):
     with app.app_context():
         tenant = Tenant(slug='isp-a', name='ISP A')
@@ -81,6 +118,31 @@ def test_v1_login_alias_works(client, app):
     assert 'token' in payload
 
 
+def test_login_with_mfa_enabled_verifies_totp_code(client, app):
+    import pyotp
+
+    secret = pyotp.random_base32()
+    with app.app_context():
+        user = User(email='mfa@test.local', role='admin', name='MFA Admin', mfa_enabled=True, mfa_secret=secret)
+        user.set_password('supersecret')
+        db.session.add(user)
+        db.session.commit()
+
+    credentials = {'email': 'mfa@test.local', 'password': 'supersecret'}
+    missing = client.post('/api/auth/login', json=credentials)
+    assert missing.status_code == 401
+    assert missing.get_json()['mfa_required'] is True
+
+    for _ in range(2):
+        response = client.post('/api/auth/login', json={**credentials, 'mfa_code': pyotp.TOTP(secret).now()})
+        assert response.status_code == 200
+        assert 'token' in response.get_json()
+
+    invalid_code = str((int(pyotp.TOTP(secret).now()) + 500000) % 1000000).zfill(6)
+    rejected = client.post('/api/auth/login', json={**credentials, 'mfa_code': invalid_code})
+    assert rejected.status_code == 401
+
+
 def test_login_rejects_invalid_credentials(client):
     response = client.post(
         '/api/auth/login',
@@ -372,6 +434,20 @@ def test_payments_webhook_rejects_invalid_signature(client, app):
     assert 'invalida' in response.get_json()['error']
 
 
+def test_payments_webhook_rejects_signed_non_json_payload(client, app):
+    secret = 'whsec_bad_json'
+    app.config['STRIPE_WEBHOOK_SECRET'] = secret
+    payload = '{"id": "evt_truncated"'
+    response = client.post(
+        '/api/payments/webhook',
+        data=payload,
+        content_type='application/json',
+        headers={'Stripe-Signature': _stripe_signature(payload, secret)},
+    )
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'Payload JSON invalido'
+
+
 def test_payments_webhook_marks_invoice_paid_idempotently(client, app):
     secret = 'whsec_live_test'
     app.config['STRIPE_WEBHOOK_SECRET'] = secret
@@ -404,6 +480,7 @@ def test_payments_webhook_marks_invoice_paid_idempotently(client, app):
         db.session.commit()
         invoice_id = invoice.id
         subscription_id = subscription.id
+        original_next_charge = subscription.next_charge
 
     event = {
         "id": "evt_checkout_paid",
@@ -447,5 +524,113 @@ def test_payments_webhook_marks_invoice_paid_idempotently(client, app):
         assert updated_invoice.status == 'paid'
         assert updated_subscription is not None
         assert updated_subscription.status == 'active'
+        assert updated_subscription.next_charge == original_next_charge + timedelta(days=30)
         assert len(payment_records) == 1
+    assert second.get_json()['duplicate'] is True
+
 
+def test_payments_webhook_acks_before_worker_applies_payment(client, app, monkeypatch):
+    import app.tasks as tasks
+
+    secret = 'whsec_queue_test'
+    app.config['STRIPE_WEBHOOK_SECRET'] = secret
+    app.config['PAYMENT_WEBHOOK_DISPATCH'] = 'celery'
+    queued = []
+    monkeypatch.setattr(tasks.apply_webhook_payment, 'apply_async', lambda args, **kwargs: queued.append(args))
+
+    event = {
+        "id": "evt_queued",
+        "type": "payment_intent.succeeded",
+        "data": {"object": {"id": "pi_queued", "metadata": {"invoice_id": "1"}}},
+    }
+    payload = json.dumps(event, separators=(',', ':'))
+    response = client.post(
+        '/api/payments/webhook',
+        data=payload,
+        content_type='application/json',
+        headers={'Stripe-Signature': _stripe_signature(payload, secret)},
+    )
+
+    assert response.status_code == 200
+    assert response.get_json()['queued'] is True
+    assert len(queued) == 1
+    assert queued[0][0]['event_id'] == 'evt_queued'
+    assert queued[0][0]['normalized_status'] == 'paid'
+
+
+def test_payments_webhook_redelivery_applies_event_lost_by_worker(client, app, monkeypatch):
+    import app.tasks as tasks
+
+    secret = 'whsec_redelivery_test'
+    app.config['STRIPE_WEBHOOK_SECRET'] = secret
+    app.config['PAYMENT_WEBHOOK_DISPATCH'] = 'celery'
+    # The worker never applies the event, as if it exhausted its retries.
+    monkeypatch.setattr(tasks.apply_webhook_payment, 'apply_async', lambda args, **kwargs: None)
+
+    event = {
+        "id": "evt_lost",
+        "type": "payment_intent.succeeded",
+        "data": {"object": {"id": "pi_lost", "metadata": {}}},
+    }
+    payload = json.dumps(event, separators=(',', ':'))
+    headers = {'Stripe-Signature': _stripe_signature(payload, secret)}
+    first = client.post('/api/payments/webhook', data=payload, content_type='application/json', headers=headers)
+    assert first.get_json()['queued'] is True
+
+    app.config['PAYMENT_WEBHOOK_DISPATCH'] = 'sync'
+    second = client.post('/api/payments/webhook', data=payload, content_type='application/json', headers=headers)
+    third = client.post('/api/payments/webhook', data=payload, content_type='application/json', headers=headers)
+
+    assert second.status_code == 200
+    assert 'duplicate' not in second.get_json()
+    assert third.get_json()['duplicate'] is True
+
+
+
+def test_clients_map_data_reads_each_router_once(client, app, monkeypatch):
+    import app.routes.main_routes as main_routes
+    from app.models import MikroTikRouter
+
+    with app.app_context():
+        admin = User(email='map-admin@test.local', role='admin', name='Map Admin')
+        admin.set_password('adminpass123')
+        db.session.add(admin)
+        routers = []
+        for index in range(2):
+            router = MikroTikRouter(name=f'Router Mapa {index}', ip_address=f'10.9.0.{index + 1}', username='admin')
+            router.password = 'Secret#Router01'
+            routers.append(router)
+        db.session.add_all(routers)
+        db.session.flush()
+        for index, (router, ip) in enumerate([(routers[0], '10.1.0.2'), (routers[0], '10.1.0.3'), (routers[1], '10.2.0.2')]):
+            db.session.add(
+                Client(
+                    full_name=f'Cliente Mapa {index}',
+                    ip_address=ip,
+                    router_id=router.id,
+                    latitude=-12.0,
+                    longitude=-77.0,
+                )
+            )
+        db.session.add(Client(full_name='Cliente Sin Mapa', ip_address='10.1.0.9', router_id=routers[0].id))
+        db.session.commit()
+        token = _token_for_user(app, admin.id)
+        sessions = {routers[0].id: {'10.1.0.2'}, routers[1].id: {'10.2.0.2'}}
+
+    calls = []
+
+    def fake_active_addresses(_app, router_id):
+        calls.append(router_id)
+        return sessions[router_id]
+
+    monkeypatch.setattr(main_routes, '_router_active_addresses', fake_active_addresses)
+
+    response = client.get('/api/clients/map-data', headers={'Authorization': f'Bearer {token}'})
+    assert response.status_code == 200
+    items = response.get_json()
+    statuses = {item['ip_address']: item['status'] for item in items}
+    assert {tuple(sorted(item)) for item in items} == {
+        ('connection_type', 'id', 'ip_address', 'lat', 'lng', 'mac_address', 'name', 'plan_name', 'status', 'tenant_id')
+    }
+    assert statuses == {'10.1.0.2': 'active', '10.1.0.3': 'offline', '10.2.0.2': 'active'}
+    assert sorted(calls) == sorted(sessions)
@@ -103,6 +103,9 @@ def test_usage_history_fallback_returns_zeroes(client, app, monkeypatch):
     assert len(dataset) == 7
     assert all(value == 0.0 for value in dataset)
 
+    response = client.get("/api/clients/usage-history?range=1y", headers=_auth_headers(app, user_id))
+    assert len(response.get_json()["labels"]) == 30
+
 
 def test_client_diagnostics_reports_down_session_without_router(client, app):
     with app.app_context():
@@ -159,3 +162,239 @@ def test_client_history_returns_operational_timeline(client, app):
     assert isinstance(payload, list)
     assert payload
     assert all("message" in item and "timestamp" in item for item in payload)
+
+
+def test_client_history_is_newest_first_across_sources(client, app):
+    from datetime import datetime
+
+    from app.models import Ticket
+
+    now = datetime.utcnow()
+    with app.app_context():
+        admin = User(email="history-order@test.local", role="admin", name="History Order")
+        admin.set_password("supersecret")
+        db.session.add(admin)
+        db.session.flush()
+
+        customer = Client(full_name="Cliente Orden", connection_type="dhcp")
+        db.session.add(customer)
+        db.session.flush()
+        subscription = Subscription(
+            customer=customer.full_name,
+            email="orden@test.local",
+            plan="Mensual",
+            cycle_months=1,
+            amount=20.0,
+            status="active",
+            currency="USD",
+            next_charge=date.today(),
+            method="manual",
+            client_id=customer.id,
+        )
+        db.session.add(subscription)
+        db.session.flush()
+        db.session.add_all(
+            [
+                Ticket(client_id=customer.id, subject="Viejo", description="d", updated_at=now - timedelta(days=3)),
+                Invoice(
+                    subscription_id=subscription.id,
+                    amount=20.0,
+                    currency="USD",
+                    tax_percent=0,
+                    total_amount=20.0,
+                    status="pending",
+                    due_date=date.today(),
+                    updated_at=now - timedelta(days=1),
+                ),
+                Ticket(client_id=customer.id, subject="Nuevo", description="d", updated_at=now),
+            ]
+        )
+        db.session.commit()
+        admin_id = admin.id
+        client_id = customer.id
+
+    response = client.get(f"/api/clients/{client_id}/history", headers=_auth_headers(app, admin_id))
+    assert response.status_code == 200
+
+    timestamps = [item["timestamp"] for item in response.get_json()]
+    assert len(timestamps) == 3
+    assert timestamps == sorted(timestamps, reverse=True)
+
+
+def test_client_portal_overview_includes_plan_router_and_invoices(client, app):
+    with app.app_context():
+        user = User(email="client-portal@test.local", role="client", name="Client Portal")
+        user.set_password("supersecret")
+        db.session.add(user)
+        db.session.flush()
+
+        plan = Plan(name="Fibra 300", download_speed=300, upload_speed=50, price=69.0)
+        db.session.add(plan)
+        db.session.flush()
+
+        customer = Client(full_name="Cliente Portal", user_id=user.id, plan_id=plan.id, connection_type="dhcp")
+        db.session.add(customer)
+        db.session.flush()
+
+        sub = Subscription(
+            customer=customer.full_name,
+            email=user.email,
+            plan="Mensual",
+            cycle_months=1,
+            amount=69.0,
+            status="active",
+            currency="USD",
+            next_charge=date.today() + timedelta(days=10),
+            method="manual",
+            client_id=customer.id,
+        )
+        db.session.add(sub)
+        db.session.flush()
+        db.session.add(
+            Invoice(
+                subscription_id=sub.id,
+                amount=69.0,
+                currency="USD",
+                tax_percent=0,
+                total_amount=69.0,
+                status="pending",
+                due_date=date.today() + timedelta(days=10),
+            )
+        )
+        db.session.commit()
+
+        user_id = user.id
+
+    response = client.get("/api/client/portal", headers=_auth_headers(app, user_id))
+    assert response.status_code == 200
+
+    payload = response.get_json()
+    assert payload["plan"] == "Fibra 300"
+    assert payload["router"] is None
+    assert [invoice["total"] for invoice in payload["invoices"]] == [69.0]
+
+
+def test_client_invoices_keep_model_payload_and_aliases(client, app):
+    with app.app_context():
+        user = User(email="client-invoices@test.local", role="client", name="Client Invoices")
+        user.set_password("supersecret")
+        db.session.add(user)
+        db.session.flush()
+
+        sub = Subscription(
+            customer="Cliente Facturas",
+            email=user.email,
+            plan="Mensual",
+            cycle_months=1,
+            amount=30.0,
+            status="active",
+            currency="USD",
+            next_charge=date.today(),
+            method="manual",
+        )
+        db.session.add(sub)
+        db.session.flush()
+        for days in (0, 30):
+            db.session.add(
+                Invoice(
+                    subscription_id=sub.id,
+                    amount=30.0,
+                    currency="USD",
+                    tax_percent=10.0,
+                    total_amount=33.0,
+                    status="pending",
+                    due_date=date.today() - timedelta(days=days),
+                )
+            )
+        db.session.commit()
+
+        user_id = user.id
+        expected = {invoice.id: invoice.to_dict() for invoice in Invoice.query.all()}
+
+    response = client.get("/api/client/invoices", headers=_auth_headers(app, user_id))
+    assert response.status_code == 200
+    payload = response.get_json()
+    assert payload["count"] == 2
+    for item in payload["items"]:
+        assert item["due"] == item["due_date"]
+        assert item["total"] == item["total_amount"] == 33.0
+        assert {key: value for key, value in item.items() if key not in ("due", "total")} == expected[item["id"]]
+
+
+def test_usage_history_sums_projected_traffic_per_day(client, app, monkeypatch):
+    from datetime import datetime
+
+    calls = []
+    today = datetime.utcnow().replace(hour=1, minute=0, second=0, microsecond=0)
+
+    class FakeMonitoringService:
+        def query_metrics(self, measurement, time_range='-1h', tags=None, fields=None):
+            calls.append((measurement, time_range, tags, fields))
+            gib = 1024 ** 3
+            return [
+                {"_time": today.isoformat(), "rx_bytes": gib, "tx_bytes": gib},
+                {"_time": today.isoformat(), "rx_bytes": gib / 2, "tx_bytes": 0},
+                {"_time": (today - timedelta(days=1)).isoformat(), "rx_bytes": gib, "tx_bytes": None},
+            ]
+
+    monkeypatch.setattr(main_routes, "MonitoringService", FakeMonitoringService)
+
+    with app.app_context():
+        user = User(email="client-traffic@test.local", role="client", name="Client Traffic")
+        user.set_password("supersecret")
+        db.session.add(user)
+        db.session.flush()
+        db.session.add(Client(full_name="Cliente Trafico", user_id=user.id, connection_type="dhcp"))
+        db.session.commit()
+        user_id = user.id
+
+    response = client.get("/api/clients/usage-history?range=7d", headers=_auth_headers(app, user_id))
+    assert response.status_code == 200
+
+    dataset = response.get_json()["datasets"][0]["data"]
+    assert calls == [("interface_traffic", "-7d", None, ["rx_bytes", "tx_bytes"])]
+    assert dataset[-2:] == [1.0, 2.5]
+    assert sum(dataset[:-2]) == 0.0
+
+
+def test_client_ticket_create_links_client_and_lists_tickets(client, app):
+    with app.app_context():
+        user = User(email="client-tickets@test.local", role="client", name="Client Tickets")
+        user.set_password("supersecret")
+        db.session.add(user)
+        db.session.flush()
+
+        customer = Client(full_name="Cliente Tickets", user_id=user.id, connection_type="dhcp")
+        db.session.add(customer)
+        db.session.commit()
+
+        user_id = user.id
+        client_id = customer.id
+
+    headers = _auth_headers(app, user_id)
+    for subject in ("Sin servicio", "Lentitud"):
+        response = client.post(
+            "/api/client/tickets",
+            json={"subject": subject, "description": "Detalle", "priority": "high"},
+            headers=headers,
+        )
+        assert response.status_code == 201
+        assert response.get_json()["ticket"]["client_id"] == client_id
+
+    response = client.get("/api/client/tickets", headers=headers)
+    assert response.status_code == 200
+    payload = response.get_json()
+    assert payload["count"] == 2
+    assert {item["subject"] for item in payload["items"]} == {"Sin servicio", "Lentitud"}
+
+
+def test_usage_history_requires_client_profile(client, app):
+    with app.app_context():
+        user = User(email="client-noprofile@test.local", role="client", name="Sin Perfil")
+        user.set_password("supersecret")
+        db.session.add(user)
+        db.session.commit()
+        user_id = user.id
+
+    response = client.get("/api/clients/usage-history", headers=_auth_headers(app, user_id))
+    assert response.status_code == 404
@@ -3,7 +3,18 @@ from datetime import date, datetime, timedelta
 from flask_jwt_extended import create_access_token
 
 from app import db
-from app.models import AdminInstallation, AdminSystemSetting, BillingPromise, Invoice, MikroTikRouter, Subscription, User
+from app.models import (
+    AdminInstallation,
+    AdminSystemSetting,
+    BillingPromise,
+    Client,
+    Invoice,
+    MikroTikRouter,
+    Plan,
+    StaffMeta,
+    Subscription,
+    User,
+)
 
 
 def _create_user(app, email: str, role: str, name: str = 'User') -> tuple[User, str]:
@@ -189,3 +200,444 @@ def test_maintenance_windows_can_silence_router_alerts(client, app):
     muted_payload = muted.get_json()
     assert muted_payload['alerts'][0]['severity'] == 'info'
     assert 'mantenimiento' in muted_payload['alerts'][0]['message'].lower()
+
+
+def test_installations_list_filters_and_summary(client, app):
+    _, token = _create_user(app, 'admin-install-filter@test.local', 'admin', 'Admin Filter')
+
+    for name, status, technician in (
+        ('Cliente Uno', 'scheduled', 'Ana.Tech@test.local'),
+        ('Cliente Dos', 'completed', 'ana.tech@test.local'),
+        ('Cliente Tres', 'scheduled', 'luis.tech@test.local'),
+    ):
+        response = client.post(
+            '/api/admin/installations',
+            json={'client_name': name, 'status': status, 'technician': technician},
+            headers=_auth(token),
+        )
+        assert response.status_code == 201
+
+    by_technician = client.get('/api/admin/installations?technician=ANA.tech', headers=_auth(token))
+    assert by_technician.status_code == 200
+    payload = by_technician.get_json()
+    assert payload['count'] == 2
+    assert payload['summary']['scheduled'] == 1
+    assert payload['summary']['completed'] == 1
+    assert payload['summary']['pending'] == 0
+
+    by_status = client.get('/api/admin/installations?status=scheduled', headers=_auth(token))
+    assert by_status.status_code == 200
+    status_payload = by_status.get_json()
+    assert {item['client_name'] for item in status_payload['items']} == {'Cliente Uno', 'Cliente Tres'}
+    assert status_payload['summary']['scheduled'] == 2
+    assert status_payload['summary']['completed'] == 0
+
+
+def test_inventory_summary_plan_distribution(client, app):
+    _, token = _create_user(app, 'admin-inventory@test.local', 'admin', 'Admin Inventory')
+
+    with app.app_context():
+        basic = Plan(name='Basico', download_speed=20, upload_speed=5, price=15.0)
+        fiber = Plan(name='Fibra', download_speed=100, upload_speed=20, price=30.0)
+        db.session.add_all([basic, fiber])
+        db.session.flush()
+        plan_ids = [fiber.id, fiber.id, fiber.id, basic.id, None]
+        db.session.add_all(
+            [Client(full_name=f'Cliente Inventario {index}', plan_id=plan_id) for index, plan_id in enumerate(plan_ids)]
+        )
+        db.session.commit()
+
+    response = client.get('/api/admin/inventory/summary', headers=_auth(token))
+    assert response.status_code == 200
+    payload = response.get_json()
+    assert payload['summary']['clients_total'] == 5
+    assert payload['plan_distribution'] == [
+        {'plan': 'Fibra', 'clients': 3},
+        {'plan': 'Basico', 'clients': 1},
+        {'plan': 'Sin plan', 'clients': 1},
+    ]
+
+
+def test_installation_rejects_unknown_status(client, app):
+    _, token = _create_user(app, 'admin-install-status@test.local', 'admin', 'Admin Status')
+
+    response = client.post(
+        '/api/admin/installations',
+        json={'client_name': 'Cliente Estado', 'status': 'Unknown'},
+        headers=_auth(token),
+    )
+    assert response.status_code == 400
+    assert response.get_json()['error'] == (
+        'status invalido. permitidos: cancelled, completed, in_progress, pending, scheduled'
+    )
+
+
+def test_staff_metadata_is_persisted_per_user(client, app):
+    _, token = _create_user(app, 'admin-staff-meta@test.local', 'admin', 'Admin Staff')
+
+    response = client.post(
+        '/api/admin/staff',
+        json={
+            'name': 'Tecnico Norte',
+            'email': 'tecnico.norte@test.local',
+            'role': 'tech',
+            'zone': 'Norte',
+            'password': 'Tecnico#Norte2026',
+        },
+        headers=_auth(token),
+    )
+    assert response.status_code == 201
+    staff_id = response.get_json()['staff']['id']
+
+    response = client.patch(
+        f'/api/admin/staff/{staff_id}',
+        json={'status': 'on_leave', 'shift': 'night', 'phone': '+51999000111'},
+        headers=_auth(token),
+    )
+    assert response.status_code == 200
+    staff = response.get_json()['staff']
+    assert (staff['zone'], staff['status'], staff['shift']) == ('Norte', 'on_leave', 'night')
+
+    with app.app_context():
+        meta = db.session.get(StaffMeta, staff_id)
+        assert meta.phone == '+51999000111'
+        assert meta.status == 'on_leave'
+
+    listing = client.get('/api/admin/staff?status=on_leave', headers=_auth(token))
+    assert listing.status_code == 200
+    assert [item['id'] for item in listing.get_json()['items']] == [staff_id]
+
+
+def test_staff_update_rejected_for_bad_status_keeps_earlier_fields(client, app):
+    _, token = _create_user(app, 'admin-staff-atomic@test.local', 'admin', 'Admin Atomic')
+    staff, _ = _create_user(app, 'tecnico.atomic@test.local', 'tech', 'Tecnico Atomico')
+
+    response = client.patch(
+        f'/api/admin/staff/{staff.id}',
+        json={'name': 'Renombrado', 'mfa_enabled': True, 'status': 'vacaciones'},
+        headers=_auth(token),
+    )
+    assert response.status_code == 400
+
+    with app.app_context():
+        user = db.session.get(User, staff.id)
+        assert user.name == 'Tecnico Atomico'
+        assert not user.mfa_enabled
+        assert user.mfa_secret is None
+
+
+def test_legacy_staff_metadata_is_imported_by_cli_command(client, app):
+    from app import cache
+
+    user, token = _create_user(app, 'admin-staff-legacy@test.local', 'admin', 'Admin Legacy')
+    with app.app_context():
+        cache.set('admin_staff_meta:global', {str(user.id): {'zone': 'Sur', 'status': 'inactive'}})
+
+    # Reads never run the migration.
+    before = client.get('/api/admin/staff', headers=_auth(token)).get_json()['items'][0]
+    assert before['zone'] == 'general'
+
+    result = app.test_cli_runner().invoke(args=['import-legacy-staff-meta'])
+    assert result.exit_code == 0
+    assert 'Imported 1 staff_meta rows.' in result.output
+
+    listing = client.get('/api/admin/staff', headers=_auth(token))
+    assert listing.status_code == 200
+    item = listing.get_json()['items'][0]
+    assert (item['zone'], item['status']) == ('Sur', 'inactive')
+
+    with app.app_context():
+        assert db.session.get(StaffMeta, user.id).zone == 'Sur'
+        assert cache.get('admin_staff_meta:global') is None
+
+
+def test_hotspot_voucher_summary_refreshes_after_writes(client, app):
+    _, token = _create_user(app, 'admin-vouchers@test.local', 'admin', 'Admin Vouchers')
+
+    created = client.post(
+        '/api/admin/hotspot/vouchers',
+        json={'quantity': 3, 'profile': 'basic', 'price': 2.5},
+        headers=_auth(token),
+    )
+    assert created.status_code == 201
+    voucher_id = created.get_json()['items'][0]['id']
+
+    listing = client.get('/api/admin/hotspot/vouchers', headers=_auth(token)).get_json()
+    assert listing['summary']['generated'] == 3
+    assert listing['revenue_estimated'] == 0.0
+
+    updated = client.patch(f'/api/admin/hotspot/vouchers/{voucher_id}', json={'status': 'sold'}, headers=_auth(token))
+    assert updated.status_code == 200
+
+    listing = client.get('/api/admin/hotspot/vouchers', headers=_auth(token)).get_json()
+    assert (listing['summary']['generated'], listing['summary']['sold']) == (2, 1)
+    assert listing['revenue_estimated'] == 2.5
+
+    filtered = client.get('/api/admin/hotspot/vouchers?status=sold', headers=_auth(token)).get_json()
+    assert filtered['count'] == 1
+    assert filtered['summary']['sold'] == 1
+    assert filtered['summary']['generated'] == 0
+
+
+def test_extra_services_status_filter_does_not_reseed_catalog(client, app):
+    _, token = _create_user(app, 'admin-extra-filter@test.local', 'admin', 'Admin Extra Filter')
+
+    created = client.post(
+        '/api/admin/extra-services',
+        json={'name': 'IP Publica', 'monthly_price': 5.0, 'subscribers': 3, 'status': 'active'},
+        headers=_auth(token),
+    )
+    assert created.status_code == 201
+
+    disabled = client.get('/api/admin/extra-services?status=disabled', headers=_auth(token)).get_json()
+    assert disabled['count'] == 0
+    assert disabled['summary']['services_total'] == 0
+
+    active = client.get('/api/admin/extra-services?status=active', headers=_auth(token)).get_json()
+    assert [item['name'] for item in active['items']] == ['IP Publica']
+    assert active['summary']['mrr_estimated'] == 15.0
+
+
+def test_prewarm_admin_caches_skips_process_local_cache(app):
+    from app.models import AdminExtraService, Tenant
+    from app.tasks import prewarm_admin_caches
+
+    with app.app_context():
+        tenant = Tenant(slug='prewarm-local', name='Prewarm Local ISP')
+        db.session.add(tenant)
+        db.session.commit()
+
+        result = prewarm_admin_caches.run()
+
+        assert result == {'tenants_warmed': 0, 'failed': 0, 'skipped': True}
+        assert AdminExtraService.query.filter_by(tenant_id=tenant.id).count() == 0
+
+
+def test_prewarm_admin_caches_seeds_tenant_catalog(app, monkeypatch):
+    from app.models import AdminExtraService, Tenant
+    from app.tasks import prewarm_admin_caches
+
+    # Prewarm only runs against a shared backend; the test cache stands in for Redis.
+    monkeypatch.setitem(app.config, 'CACHE_TYPE', 'RedisCache')
+    with app.app_context():
+        tenant = Tenant(slug='prewarm', name='Prewarm ISP')
+        db.session.add(tenant)
+        db.session.commit()
+
+        result = prewarm_admin_caches.run()
+
+        assert result == {'tenants_warmed': 1, 'failed': 0}
+        assert AdminExtraService.query.filter_by(tenant_id=tenant.id).count() == 4
+
+
+def test_dashboard_overview_aggregates_in_sql(client, app):
+    _, token = _create_user(app, 'admin-dashboard@test.local', 'admin', 'Admin Dashboard')
+
+    with app.app_context():
+        for index, active in enumerate((True, False)):
+            router = MikroTikRouter(name=f'RTR-DASH-{index}', ip_address=f'10.8.0.{index + 1}', username='admin', is_active=active)
+            router.password = 'RouterPass#123'
+            db.session.add(router)
+        db.session.add_all(
+            [
+                Client(full_name='Cliente Dash Uno', connection_type='dhcp'),
+                Client(full_name='Cliente Dash Dos', connection_type='dhcp'),
+            ]
+        )
+        for status, amount in (('active', 30.0), ('active', 20.0), ('past_due', 15.0), ('trial', 5.0), ('cancelled', 99.0)):
+            db.session.add(
+                Subscription(
+                    customer=f'Cliente {status}',
+                    email=f'{status}-{amount}@dash.local',
+                    plan='Mensual',
+                    cycle_months=1,
+                    amount=amount,
+                    status=status,
+                    currency='USD',
+                    next_charge=date.today(),
+                    method='manual',
+                )
+            )
+        db.session.commit()
+
+    response = client.get('/api/dashboard', headers=_auth(token))
+    assert response.status_code == 200
+    payload = response.get_json()
+    assert payload['clients'] == 2
+    assert payload['routers'] == {'ok': 1, 'down': 1}
+    assert payload['finance'] == {'paid_today': 50.0, 'pending': 20.0}
+
+
+def test_connections_summary_marks_clients_on_inactive_routers_offline(client, app):
+    _, token = _create_user(app, 'admin-connections@test.local', 'admin', 'Admin Connections')
+
+    with app.app_context():
+        down_router = MikroTikRouter(name='RTR-CONN-DOWN', ip_address='10.7.0.1', username='admin', is_active=False)
+        down_router.password = 'RouterPass#123'
+        db.session.add(down_router)
+        db.session.flush()
+        offline = Client(full_name='Cliente Offline', connection_type='pppoe', router_id=down_router.id, ip_address='10.7.1.1')
+        idle = Client(full_name='Cliente Idle', connection_type='dhcp', mac_address='AA:BB:CC:DD:EE:FF')
+        db.session.add_all([offline, idle])
+        db.session.commit()
+        offline_id, idle_id = offline.id, idle.id
+
+    response = client.get('/api/connections', headers=_auth(token))
+    assert response.status_code == 200
+    items = {item['id']: item for item in response.get_json()['items']}
+    assert items[str(offline_id)] == {'id': str(offline_id), 'ip': '10.7.1.1', 'mac': '', 'status': 'offline'}
+    assert items[str(idle_id)]['status'] == 'idle'
+    assert items[str(idle_id)]['mac'] == 'AA:BB:CC:DD:EE:FF'
+
+
+def test_network_health_averages_projected_telemetry(client, app, monkeypatch):
+    import app.routes.main_routes as main_routes
+
+    requested_fields = []
+
+    class FakeMonitoringService:
+        def query_metrics(self, measurement, time_range='-1h', tags=None, fields=None):
+            requested_fields.append(fields)
+            return [
+                {'cpu_load': '80%', 'free_memory': 25, 'total_memory': 100},
+                {'cpu_load': 90, 'free_memory': 15, 'total_memory': 100},
+                {'cpu_load': 'n/a', 'free_memory': 10, 'total_memory': 0},
+            ]
+
+    monkeypatch.setattr(main_routes, 'MonitoringService', FakeMonitoringService)
+    _, token = _create_user(app, 'noc-health@test.local', 'noc', 'NOC Health')
+
+    response = client.get('/api/network/health', headers=_auth(token))
+    assert response.status_code == 200
+    payload = response.get_json()
+    assert requested_fields == [['cpu_load', 'free_memory', 'total_memory']]
+    assert payload['source'] == 'influxdb'
+    assert payload['cpu_avg'] == 85.0
+    assert payload['memory_avg'] == 80.0
+    assert payload['score'] == 92.0
+
+
+def test_polled_endpoints_answer_matching_etag_with_not_modified(client, app):
+    _, token = _create_user(app, 'noc-etag@test.local', 'noc', 'NOC ETag')
+
+    first = client.get('/api/network/alerts', headers=_auth(token))
+    assert first.status_code == 200
+    etag = first.headers['ETag']
+    assert 'private' in first.headers['Cache-Control']
+    assert 'max-age=30' in first.headers['Cache-Control']
+
+    repeat = client.get('/api/network/alerts', headers={**_auth(token), 'If-None-Match': etag})
+    assert repeat.status_code == 304
+    assert repeat.data == b''
+
+    stale = client.get('/api/network/alerts', headers={**_auth(token), 'If-None-Match': '"otro"'})
+    assert stale.status_code == 200
+    assert stale.get_json()['count'] == first.get_json()['count']
+
+
+def test_prometheus_metrics_reuse_cached_snapshots(client, app, monkeypatch):
+    import app.routes.main_routes as main_routes
+
+    calls = []
+    real_build = main_routes._build_network_alert_items
+
+    def counting_build(tenant_id):
+        calls.append(tenant_id)
+        return real_build(tenant_id)
+
+    monkeypatch.setattr(main_routes, '_build_network_alert_items', counting_build)
+
+    first = client.get('/api/prometheus/metrics')
+    second = client.get('/api/prometheus/metrics')
+    assert first.status_code == second.status_code == 200
+    assert first.headers['Content-Type'] == 'text/plain; version=0.0.4; charset=utf-8'
+    lines = first.get_data(as_text=True).splitlines()
+    assert len(lines) == 6
+    assert lines[2].startswith('ispfast_network_health_score ')
+    assert lines[5] == 'ispfast_alerts_total 1'
+    assert first.get_data(as_text=True).endswith('\n')
+    assert calls == [None]
+
+
+def test_runbooks_serve_prebuilt_catalog(client, app):
+    _, token = _create_user(app, 'noc-runbooks@test.local', 'noc', 'NOC Runbooks')
+
+    response = client.get('/api/runbooks', headers=_auth(token))
+    assert response.status_code == 200
+    assert response.mimetype == 'application/json'
+    payload = response.get_json()
+    assert payload['count'] == 2
+    assert [book['id'] for book in payload['items']] == ['RB-001', 'RB-002']
+
+    etag = response.headers['ETag']
+    assert 'max-age=3600' in response.headers['Cache-Control']
+    cached = client.get('/api/runbooks', headers={**_auth(token), 'If-None-Match': etag})
+    assert cached.status_code == 304
+
+
+def test_dashboard_cache_is_dropped_after_subscription_writes(client, app):
+    _, token = _create_user(app, 'admin-dash-cache@test.local', 'admin', 'Admin Dash Cache')
+
+    assert client.get('/api/dashboard', headers=_auth(token)).get_json()['finance']['paid_today'] == 0.0
+
+    created = client.post(
+        '/api/subscriptions',
+        json={
+            'customer': 'Cliente Cache',
+            'email': 'cache@dash.local',
+            'plan': 'Mensual',
+            'cycle_months': 1,
+            'amount': 25,
+            'next_charge': date.today().isoformat(),
+            'method': 'manual',
+        },
+        headers=_auth(token),
+    )
+    assert created.status_code == 201
+    assert client.get('/api/dashboard', headers=_auth(token)).get_json()['finance']['paid_today'] == 25.0
+
+    subscription_id = created.get_json()['subscription']['id']
+    updated = client.patch(f'/api/subscriptions/{subscription_id}', json={'status': 'past_due'}, headers=_auth(token))
+    assert updated.status_code == 200
+    assert client.get('/api/dashboard', headers=_auth(token)).get_json()['finance'] == {'paid_today': 0.0, 'pending': 25.0}
+
+
+def test_connections_summary_reads_clients_and_routers_in_one_query(client, app):
+    from sqlalchemy import event
+
+    _, token = _create_user(app, 'admin-connections-n1@test.local', 'admin', 'Admin Connections N1')
+
+    with app.app_context():
+        routers = []
+        for index in range(5):
+            router = MikroTikRouter(name=f'RTR-N1-{index}', ip_address=f'10.6.0.{index + 1}', username='admin')
+            router.password = 'RouterPass#123'
+            routers.append(router)
+        db.session.add_all(routers)
+        db.session.flush()
+        db.session.add_all(
+            [
+                Client(full_name=f'Cliente N1 {index}', connection_type='pppoe', router_id=routers[index % 5].id)
+                for index in range(100)
+            ]
+        )
+        db.session.commit()
+        engine = db.engine
+
+    statements = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, 'before_cursor_execute', _record)
+    try:
+        response = client.get('/api/connections', headers=_auth(token))
+    finally:
+        event.remove(engine, 'before_cursor_execute', _record)
+
+    assert response.status_code == 200
+    assert response.get_json()['count'] == 100
+    client_reads = [sql for sql in statements if 'FROM clients' in sql]
+    router_reads = [sql for sql in statements if 'FROM mikrotik_routers' in sql or 'JOIN mikrotik_routers' in sql]
+    assert len(client_reads) == 1
+    assert router_reads == client_reads
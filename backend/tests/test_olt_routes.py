@@ -285,3 +285,15 @@ def test_service_templates_allow_custom_create_and_delete(client, app):
     assert list_after_delete.status_code == 200
     templates_after = list_after_delete.get_json()["templates"]
     assert all(item["id"] != "zte-custom-qa" for item in templates_after)
+
+
+def test_service_templates_generate_distinct_ids_within_same_second(client, app):
+    headers = _admin_headers(client, app)
+    body = {"vendor": "zte", "label": "ZTE Auto", "line_profile": "LINE-A", "srv_profile": "SRV-A"}
+
+    first = client.post("/api/olt/service-templates", json=body, headers=headers)
+    second = client.post("/api/olt/service-templates", json=body, headers=headers)
+
+    assert first.status_code == 201
+    assert second.status_code == 201
+    assert first.get_json()["template"]["id"] != second.get_json()["template"]["id"]
@@ -101,3 +101,38 @@ def test_platform_admin_can_use_staff_routes_when_tenant_selected(client, app):
 
     assert response.status_code == 200
     assert response.get_json()['count'] == 1
+
+
+def test_plans_list_cache_is_refreshed_after_plan_create(client, app):
+    with app.app_context():
+        tenant = Tenant(slug='isp-plans-cache', name='ISP Plans Cache')
+        db.session.add(tenant)
+        db.session.flush()
+        db.session.add(Plan(name='Plan Base', download_speed=50, upload_speed=10, price=20.0, tenant_id=tenant.id))
+
+        root = User(email='platform-plans@test.local', role='platform_admin', name='Platform Plans')
+        root.set_password('supersecret')
+        db.session.add(root)
+        db.session.commit()
+
+        root_id = root.id
+        tenant_id = tenant.id
+
+    headers = {'Authorization': f'Bearer {_platform_token(app, root_id)}', 'X-Tenant-ID': str(tenant_id)}
+    assert client.get('/api/plans', headers=headers).get_json()['count'] == 1
+
+    with app.app_context():
+        db.session.add(Plan(name='Plan Oculto', download_speed=80, upload_speed=20, price=30.0, tenant_id=tenant_id))
+        db.session.commit()
+    # Writes outside the API are only picked up once the cached list expires.
+    assert client.get('/api/plans', headers=headers).get_json()['count'] == 1
+
+    created = client.post(
+        '/api/plans',
+        json={'name': 'Plan Nuevo', 'download_speed': 100, 'upload_speed': 20, 'price': 40},
+        headers=headers,
+    )
+    assert created.status_code == 201
+
+    names = [item['name'] for item in client.get('/api/plans', headers=headers).get_json()['items']]
+    assert names == ['Plan Base', 'Plan Nuevo', 'Plan Oculto']
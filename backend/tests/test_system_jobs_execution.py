@@ -3,7 +3,7 @@ from datetime import date, timedelta
 from flask_jwt_extended import create_access_token
 
 from app import db
-from app.models import Invoice, MikroTikRouter, PaymentRecord, Subscription, Tenant, User
+from app.models import Client, Invoice, MikroTikRouter, PaymentRecord, Subscription, Tenant, User
 
 
 def _admin_token(app, email: str) -> str:
@@ -75,6 +75,58 @@ def test_system_job_recalc_balances_updates_invoice_status(client, app):
         assert updated_invoice.status == 'paid'
 
 
+def test_system_job_recalc_balances_reopens_underpaid_and_skips_cancelled(client, app):
+    token = _admin_token(app, 'jobs-admin-recalc@test.local')
+
+    with app.app_context():
+        subscription = Subscription(
+            customer='Underpaid Customer',
+            email='underpaid@test.local',
+            plan='Mensual',
+            cycle_months=1,
+            amount=30.0,
+            status='active',
+            currency='USD',
+            next_charge=date.today(),
+            method='manual',
+        )
+        db.session.add(subscription)
+        db.session.flush()
+        invoices = {}
+        for status in ('paid', 'cancelled'):
+            invoice = Invoice(
+                subscription_id=subscription.id,
+                amount=30.0,
+                currency='USD',
+                tax_percent=0,
+                total_amount=30.0,
+                status=status,
+                due_date=date.today(),
+            )
+            db.session.add(invoice)
+            db.session.flush()
+            invoices[status] = invoice.id
+        db.session.add_all(
+            [
+                PaymentRecord(invoice_id=invoices['paid'], amount=10.0, currency='USD', status='paid'),
+                PaymentRecord(invoice_id=invoices['paid'], amount=25.0, currency='USD', status='failed'),
+            ]
+        )
+        db.session.commit()
+
+    response = client.post(
+        '/api/admin/system/jobs/run',
+        json={'job': 'recalc_balances'},
+        headers={'Authorization': f'Bearer {token}'},
+    )
+    assert response.status_code == 200
+    assert response.get_json()['job']['result']['scanned'] == 1
+
+    with app.app_context():
+        assert db.session.get(Invoice, invoices['paid']).status == 'pending'
+        assert db.session.get(Invoice, invoices['cancelled']).status == 'cancelled'
+
+
 def test_ops_run_job_rotate_passwords_returns_skipped_status(client, app):
     token = _admin_token(app, 'jobs-admin-2@test.local')
 
@@ -175,6 +227,65 @@ def test_rotate_passwords_updates_router_credentials(client, app, monkeypatch):
         assert updated.password == 'NewRouterPass#456'
 
 
+def test_rotate_passwords_keeps_router_order_and_partial_failures(client, app, monkeypatch):
+    token = _admin_token(app, 'jobs-admin-rotate-many@test.local')
+
+    with app.app_context():
+        routers = []
+        for index in range(3):
+            router = MikroTikRouter(
+                name=f'RTR-ROTATE-MANY-{index}',
+                ip_address=f'10.20.31.{index + 1}',
+                username='admin',
+                is_active=True,
+            )
+            router.password = 'OldRouterPass#123'
+            routers.append(router)
+        db.session.add_all(routers)
+        db.session.commit()
+        router_ids = [router.id for router in routers]
+
+    app.config['ROTATE_PASSWORDS_DRY_RUN'] = False
+    monkeypatch.setattr(
+        'app.routes.main_routes._generate_router_password',
+        lambda _length=None: 'NewRouterPass#456',
+    )
+
+    class _FakeMikroTikService:
+        def __init__(self, rid):
+            self.rid = rid
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, exc_type, exc, tb):
+            return False
+
+        def rotate_api_password(self, username, new_password):
+            if self.rid == router_ids[1]:
+                return {"success": False, "error": "timeout"}
+            return {"success": True, "username": username}
+
+    monkeypatch.setattr('app.routes.main_routes.MikroTikService', _FakeMikroTikService)
+
+    response = client.post(
+        '/api/admin/system/jobs/run',
+        json={'job': 'rotate_passwords'},
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == 200
+    result = response.get_json()['job']['result']
+    assert result['rotated'] == 2
+    assert result['failed'] == 1
+    assert [item['router_id'] for item in result['items']] == router_ids
+    assert [item['status'] for item in result['items']] == ['rotated', 'failed', 'rotated']
+
+    with app.app_context():
+        passwords = [db.session.get(MikroTikRouter, rid).password for rid in router_ids]
+        assert passwords == ['NewRouterPass#456', 'OldRouterPass#123', 'NewRouterPass#456']
+
+
 def test_rotate_passwords_dry_run_does_not_change_password(client, app, monkeypatch):
     token = _admin_token(app, 'jobs-admin-dryrun@test.local')
 
@@ -325,3 +436,163 @@ def test_cleanup_leases_job_is_scoped_to_current_tenant(client, app):
         assert updated_b is not None
         assert updated_a.status == 'past_due'
         assert updated_b.status == 'active'
+
+
+def test_cleanup_leases_batches_router_commands(client, app, monkeypatch):
+    token = _admin_token(app, 'jobs-admin-cleanup-batch@test.local')
+
+    with app.app_context():
+        router = MikroTikRouter(name='RTR-CLEANUP-1', ip_address='10.20.30.41', username='admin', is_active=True)
+        router.password = 'RouterPass#123'
+        db.session.add(router)
+        db.session.flush()
+
+        overdue_client = Client(full_name='Cliente Moroso', connection_type='dhcp', router_id=router.id)
+        current_client = Client(full_name='Cliente Al Dia', connection_type='dhcp', router_id=router.id)
+        db.session.add_all([overdue_client, current_client])
+        db.session.flush()
+
+        overdue_sub = Subscription(
+            customer='Cliente Moroso',
+            email='moroso@example.com',
+            plan='Mensual',
+            cycle_months=1,
+            amount=30.0,
+            status='past_due',
+            currency='USD',
+            next_charge=date.today() - timedelta(days=3),
+            method='manual',
+            client_id=overdue_client.id,
+        )
+        current_sub = Subscription(
+            customer='Cliente Al Dia',
+            email='aldia@example.com',
+            plan='Mensual',
+            cycle_months=1,
+            amount=30.0,
+            status='active',
+            currency='USD',
+            next_charge=date.today() + timedelta(days=10),
+            method='manual',
+            client_id=current_client.id,
+        )
+        db.session.add_all([overdue_sub, current_sub])
+        db.session.commit()
+        router_id = router.id
+        overdue_client_id = overdue_client.id
+        current_client_id = current_client.id
+        overdue_sub_id = overdue_sub.id
+
+    sessions = []
+    calls = []
+
+    class _FakeMikroTikService:
+        def __init__(self, rid):
+            sessions.append(rid)
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, exc_type, exc, tb):
+            return False
+
+        def suspend_clients(self, clients):
+            calls.append(('suspend', [c.id for c in clients]))
+            return {c.id: True for c in clients}
+
+        def activate_clients(self, clients):
+            calls.append(('activate', [c.id for c in clients]))
+            return {c.id: True for c in clients}
+
+    monkeypatch.setattr('app.routes.main_routes.MikroTikService', _FakeMikroTikService)
+
+    response = client.post(
+        '/api/admin/system/jobs/run',
+        json={'job': 'cleanup_leases'},
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == 200
+    result = response.get_json()['job']['result']
+    assert result['failed'] == 0
+    assert sessions == [router_id]
+    assert calls == [('suspend', [overdue_client_id]), ('activate', [current_client_id])]
+    assert {'subscription_id': overdue_sub_id, 'from': 'past_due', 'to': 'suspended'} in result['changes']
+
+    with app.app_context():
+        assert db.session.get(Subscription, overdue_sub_id).status == 'suspended'
+
+
+def test_cleanup_leases_counts_router_command_failures(client, app, monkeypatch):
+    token = _admin_token(app, 'jobs-admin-cleanup-failures@test.local')
+
+    with app.app_context():
+        router = MikroTikRouter(name='RTR-CLEANUP-2', ip_address='10.20.30.42', username='admin', is_active=True)
+        router.password = 'RouterPass#123'
+        db.session.add(router)
+        db.session.flush()
+
+        overdue_client = Client(full_name='Cliente Moroso Fallido', connection_type='dhcp', router_id=router.id)
+        current_client = Client(full_name='Cliente Al Dia Fallido', connection_type='dhcp', router_id=router.id)
+        db.session.add_all([overdue_client, current_client])
+        db.session.flush()
+
+        overdue_sub = Subscription(
+            customer='Cliente Moroso Fallido',
+            email='moroso-fallido@example.com',
+            plan='Mensual',
+            cycle_months=1,
+            amount=30.0,
+            status='past_due',
+            currency='USD',
+            next_charge=date.today() - timedelta(days=3),
+            method='manual',
+            client_id=overdue_client.id,
+        )
+        current_sub = Subscription(
+            customer='Cliente Al Dia Fallido',
+            email='aldia-fallido@example.com',
+            plan='Mensual',
+            cycle_months=1,
+            amount=30.0,
+            status='active',
+            currency='USD',
+            next_charge=date.today() + timedelta(days=10),
+            method='manual',
+            client_id=current_client.id,
+        )
+        db.session.add_all([overdue_sub, current_sub])
+        db.session.commit()
+        overdue_sub_id = overdue_sub.id
+
+    class _FailingMikroTikService:
+        def __init__(self, rid):
+            pass
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, exc_type, exc, tb):
+            return False
+
+        def suspend_clients(self, clients):
+            return {c.id: False for c in clients}
+
+        def activate_clients(self, clients):
+            return {c.id: False for c in clients}
+
+    monkeypatch.setattr('app.routes.main_routes.MikroTikService', _FailingMikroTikService)
+
+    response = client.post(
+        '/api/admin/system/jobs/run',
+        json={'job': 'cleanup_leases'},
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == 200
+    result = response.get_json()['job']['result']
+    assert result['failed'] == 2
+    assert not any(change['subscription_id'] == overdue_sub_id for change in result['changes'])
+
+    with app.app_context():
+        assert db.session.get(Subscription, overdue_sub_id).status == 'past_due'
@@ -1,7 +1,7 @@
 from flask_jwt_extended import create_access_token
 
 from app import db
-from app.models import User
+from app.models import MikroTikRouter, User
 
 
 def _admin_token(app, email: str) -> str:
@@ -78,3 +78,20 @@ def test_system_settings_update_rejects_invalid_ticket_priority(client, app):
     assert response.status_code == 400
     assert 'default_ticket_priority' in response.get_json()['error']
 
+
+
+def test_system_settings_get_reports_router_health_counts(client, app):
+    token = _admin_token(app, 'settings-admin-health@test.local')
+
+    with app.app_context():
+        for index, active in enumerate((True, True, False)):
+            router = MikroTikRouter(name=f'RTR-HEALTH-{index}', ip_address=f'10.9.0.{index + 1}', username='admin', is_active=active)
+            router.password = 'RouterPass#123'
+            db.session.add(router)
+        db.session.commit()
+
+    response = client.get('/api/admin/system/settings', headers={'Authorization': f'Bearer {token}'})
+
+    assert response.status_code == 200
+    health = response.get_json()['health']
+    assert (health['routers_up'], health['routers_down']) == (2, 1)